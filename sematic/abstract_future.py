@@ -22,6 +22,8 @@ class FutureState(enum.Enum):
     RESOLVED = "RESOLVED"
     # The future has executed and returned a nested future
     RAN = "RAN"
+    # The future is waiting for capacity to be submitted for execution
+    QUEUED = "QUEUED"
     # The future was scheduled to execute
     SCHEDULED = "SCHEDULED"
     FAILED = "FAILED"
@@ -77,6 +79,8 @@ class FutureProperties:
     name: str
     tags: List[str]
     resource_requirements: Optional[ResourceRequirements] = None
+    cache: bool = False
+    max_concurrency: Optional[int] = None
 
 
 class AbstractFuture(abc.ABC):
@@ -106,6 +110,8 @@ class AbstractFuture(abc.ABC):
         kwargs: Dict[str, Any],
         inline: bool,
         resource_requirements: Optional[ResourceRequirements] = None,
+        cache: bool = False,
+        max_concurrency: Optional[int] = None,
     ):
         self.id: str = uuid.uuid4().hex
         self.calculator = calculator
@@ -125,6 +131,8 @@ class AbstractFuture(abc.ABC):
             resource_requirements=resource_requirements,
             name=calculator.__name__,
             tags=[],
+            cache=cache,
+            max_concurrency=max_concurrency,
         )
 
     @property
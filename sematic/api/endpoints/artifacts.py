@@ -17,7 +17,7 @@ from sematic.api.endpoints.request_parameters import (
 from sematic.db.db import db
 from sematic.db.models.artifact import Artifact
 from sematic.db.models.user import User
-from sematic.db.queries import get_artifact
+from sematic.db.queries import get_artifact, populate_type_serializations
 
 
 @sematic_api.route("/api/v1/artifacts", methods=["GET"])
@@ -35,6 +35,8 @@ def list_artifacts_endpoint(user: Optional[User] = None) -> flask.Response:
 
         artifacts: List[Artifact] = query.limit(limit).all()
 
+    populate_type_serializations(artifacts)
+
     payload = dict(content=[artifacts.to_json_encodable() for artifacts in artifacts])
 
     return flask.jsonify(payload)
@@ -16,7 +16,15 @@ from sematic.api.endpoints.auth import authenticate
 from sematic.api.endpoints.request_parameters import jsonify_error
 from sematic.db.models.resolution import InvalidResolution, Resolution
 from sematic.db.models.user import User
-from sematic.db.queries import get_resolution, get_run, save_resolution
+from sematic.db.queries import (
+    claim_queued_run,
+    enqueue_run,
+    get_completed_queued_run_ids,
+    get_resolution,
+    get_run,
+    renew_queued_run_claim,
+    save_resolution,
+)
 
 
 @sematic_api.route("/api/v1/resolutions/<resolution_id>", methods=["GET"])
@@ -92,3 +100,84 @@ def put_resolution_endpoint(user: Optional[User], resolution_id: str) -> flask.R
     save_resolution(resolution)
 
     return flask.jsonify({})
+
+
+@sematic_api.route(
+    "/api/v1/resolutions/<resolution_id>/queue/<run_id>", methods=["PUT"]
+)
+@authenticate
+def enqueue_run_endpoint(
+    user: Optional[User], resolution_id: str, run_id: str
+) -> flask.Response:
+    """
+    Queue a run for the worker pool of the resolution.
+    """
+    try:
+        run = get_run(run_id)
+    except NoResultFound:
+        return jsonify_error(
+            "No runs with id {}".format(repr(run_id)), HTTPStatus.NOT_FOUND
+        )
+
+    if run.root_id != resolution_id:
+        return jsonify_error(
+            f"Run {run_id} is not part of resolution {resolution_id}",
+            HTTPStatus.BAD_REQUEST,
+        )
+
+    enqueue_run(run_id, resolution_id)
+
+    return flask.jsonify({})
+
+
+@sematic_api.route("/api/v1/resolutions/<resolution_id>/queue/claim", methods=["POST"])
+@authenticate
+def claim_queued_run_endpoint(
+    user: Optional[User], resolution_id: str
+) -> flask.Response:
+    """
+    Claim the oldest queued run of the resolution that no worker claimed yet.
+
+    Response
+    --------
+    content: Optional[str]
+        The ID of the claimed run, `null` if there is none.
+    """
+    return flask.jsonify(dict(content=claim_queued_run(resolution_id)))
+
+
+@sematic_api.route(
+    "/api/v1/resolutions/<resolution_id>/queue/<run_id>/claim", methods=["PUT"]
+)
+@authenticate
+def renew_queued_run_claim_endpoint(
+    user: Optional[User], resolution_id: str, run_id: str
+) -> flask.Response:
+    """
+    Renew the claim of a queued run by the worker executing it. Claims which
+    are not renewed expire, and the run is claimed again by another worker.
+
+    Response
+    --------
+    content: bool
+        Whether the run is claimed.
+    """
+    return flask.jsonify(dict(content=renew_queued_run_claim(run_id)))
+
+
+@sematic_api.route(
+    "/api/v1/resolutions/<resolution_id>/queue/completed", methods=["GET"]
+)
+@authenticate
+def get_completed_queued_runs_endpoint(
+    user: Optional[User], resolution_id: str
+) -> flask.Response:
+    """
+    List the queued runs of the resolution that are done executing.
+
+    Response
+    --------
+    content: List[str]
+        IDs of the runs.
+    """
+    return flask.jsonify(dict(content=get_completed_queued_run_ids(resolution_id)))
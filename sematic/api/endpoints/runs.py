@@ -26,7 +26,13 @@ from sematic.db.models.artifact import Artifact
 from sematic.db.models.edge import Edge
 from sematic.db.models.run import Run
 from sematic.db.models.user import User
-from sematic.db.queries import get_root_graph, get_run, get_run_graph, save_graph
+from sematic.db.queries import (
+    get_cached_output_artifact,
+    get_root_graph,
+    get_run,
+    get_run_graph,
+    save_graph,
+)
 
 
 @sematic_api.route("/api/v1/runs", methods=["GET"])
@@ -214,6 +220,28 @@ def get_run_graph_endpoint(user: Optional[User], run_id: str) -> flask.Response:
     return flask.jsonify(payload)
 
 
+@sematic_api.route("/api/v1/runs/cache/<cache_key>/output", methods=["GET"])
+@authenticate
+def get_cached_output_artifact_endpoint(
+    user: Optional[User], cache_key: str
+) -> flask.Response:
+    """
+    Retrieve the output artifact of the latest resolved run with `cache_key`.
+
+    Response
+    --------
+    content: Optional[Artifact]
+        The output artifact, `null` if no run with `cache_key` has resolved.
+    """
+    artifact = get_cached_output_artifact(cache_key)
+
+    payload = dict(
+        content=artifact.to_json_encodable() if artifact is not None else None,
+    )
+
+    return flask.jsonify(payload)
+
+
 @sematic_api.route("/api/v1/events/<namespace>/<event>", methods=["POST"])
 @authenticate
 def events(user: Optional[User], namespace: str, event: str) -> flask.Response:
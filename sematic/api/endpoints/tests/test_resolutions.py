@@ -5,6 +5,7 @@ import typing
 import flask.testing
 
 # Sematic
+from sematic.abstract_future import FutureState
 from sematic.api.tests.fixtures import (  # noqa: F401
     make_auth_test,
     mock_no_auth,
@@ -12,8 +13,11 @@ from sematic.api.tests.fixtures import (  # noqa: F401
     test_client,
 )
 from sematic.db.models.resolution import Resolution
+from sematic.db.models.run import Run
+from sematic.db.queries import save_run
 from sematic.db.tests.fixtures import (  # noqa: F401
     make_resolution,
+    make_run,
     persisted_resolution,
     persisted_run,
     pg_mock,
@@ -24,6 +28,18 @@ from sematic.db.tests.fixtures import (  # noqa: F401
 
 test_get_resolution_auth = make_auth_test("/api/v1/resolutions/123")
 test_put_resolution_auth = make_auth_test("/api/v1/resolutions/123", method="PUT")
+test_enqueue_run_auth = make_auth_test(
+    "/api/v1/resolutions/123/queue/456", method="PUT"
+)
+test_claim_queued_run_auth = make_auth_test(
+    "/api/v1/resolutions/123/queue/claim", method="POST"
+)
+test_renew_queued_run_claim_auth = make_auth_test(
+    "/api/v1/resolutions/123/queue/456/claim", method="PUT"
+)
+test_get_completed_queued_runs_auth = make_auth_test(
+    "/api/v1/resolutions/123/queue/completed"
+)
 
 
 @mock_no_auth
@@ -51,3 +67,55 @@ def test_get_resolution_404(test_client: flask.testing.FlaskClient):  # noqa: F8
     payload = typing.cast(typing.Dict[str, typing.Any], payload)
 
     assert payload == dict(error="No resolutions with id 'unknownid'")
+
+
+@mock_no_auth
+def test_queue_endpoints(
+    persisted_run: Run,  # noqa: F811
+    test_client: flask.testing.FlaskClient,  # noqa: F811
+):
+    root_id = persisted_run.id
+    queued_run = save_run(make_run(root_id=root_id))
+
+    response = test_client.put(
+        "/api/v1/resolutions/{}/queue/{}".format(root_id, queued_run.id)
+    )
+    assert response.status_code == 200
+
+    response = test_client.post("/api/v1/resolutions/{}/queue/claim".format(root_id))
+    assert response.json == dict(content=queued_run.id)
+
+    response = test_client.post("/api/v1/resolutions/{}/queue/claim".format(root_id))
+    assert response.json == dict(content=None)
+
+    response = test_client.put(
+        "/api/v1/resolutions/{}/queue/{}/claim".format(root_id, queued_run.id)
+    )
+    assert response.json == dict(content=True)
+
+    response = test_client.get("/api/v1/resolutions/{}/queue/completed".format(root_id))
+    assert response.json == dict(content=[])
+
+    queued_run.future_state = FutureState.RESOLVED
+    save_run(queued_run)
+
+    response = test_client.get("/api/v1/resolutions/{}/queue/completed".format(root_id))
+    assert response.json == dict(content=[queued_run.id])
+
+
+@mock_no_auth
+def test_enqueue_run_invalid(
+    persisted_run: Run,  # noqa: F811
+    test_client: flask.testing.FlaskClient,  # noqa: F811
+):
+    response = test_client.put(
+        "/api/v1/resolutions/{}/queue/unknownid".format(persisted_run.id)
+    )
+    assert response.status_code == 404
+
+    # The run is not part of the resolution
+    other_run = save_run(make_run())
+    response = test_client.put(
+        "/api/v1/resolutions/{}/queue/{}".format(persisted_run.id, other_run.id)
+    )
+    assert response.status_code == 400
@@ -24,11 +24,12 @@ from sematic.db.tests.fixtures import (  # noqa: F401
     run,
     test_db,
 )
-from sematic.tests.fixtures import valid_client_version  # noqa: F401
+from sematic.tests.fixtures import test_storage, valid_client_version  # noqa: F401
 
 test_list_runs_auth = make_auth_test("/api/v1/runs")
 test_get_run_auth = make_auth_test("/api/v1/runs/123")
 test_get_run_graph_auth = make_auth_test("/api/v1/runs/123/graph")
+test_get_cached_output_auth = make_auth_test("/api/v1/runs/cache/abc/output")
 test_put_run_graph_auth = make_auth_test("/api/v1/graph", method="PUT")
 test_post_events_auth = make_auth_test("/api/v1/events/namespace/event", method="POST")
 
@@ -158,6 +159,16 @@ def test_get_run_404(test_client: flask.testing.FlaskClient):  # noqa: F811
     assert payload == dict(error="No runs with id 'unknownid'")
 
 
+@mock_no_auth
+def test_get_cached_output_artifact_endpoint_miss(
+    test_client: flask.testing.FlaskClient,  # noqa: F811
+):
+    response = test_client.get("/api/v1/runs/cache/unknownkey/output")
+
+    assert response.status_code == 200
+    assert response.json == dict(content=None)
+
+
 @func
 def add(a: float, b: float) -> float:
     return a + b
@@ -180,6 +191,7 @@ def test_get_run_graph_endpoint(
     test_client: flask.testing.FlaskClient,  # noqa: F811
     mock_requests,  # noqa: F811
     valid_client_version,  # noqa: F811
+    test_storage,  # noqa: F811
 ):
     future = pipeline(1, 2)
     future.resolve()
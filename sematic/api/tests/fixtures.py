@@ -54,7 +54,10 @@ def mock_requests(test_client):
         if "Content-Length" in request.headers:
             environ["CONTENT_LENGTH"] = request.headers["Content-Length"]
 
-        response = test_client.open(environ)
+        # Requests can come from the resolvers' background threads. A client
+        # entered in a `with` block preserves request contexts which can only be
+        # popped from the thread that pushed them, so we use a new client.
+        response = test_client.application.test_client().open(environ)
 
         return response.status_code, dict(response.headers), response.data
 
@@ -64,7 +67,9 @@ def mock_requests(test_client):
             path_to_match = re.sub(
                 pattern=r"<\w+>", repl="\\\w+", string=rule.rule  # noqa: W605
             )
-            pattern = urljoin(api_url, path_to_match)
+            # Anchored so that routes do not match requests to their sub-routes,
+            # otherwise responses discards one of the matching mocks.
+            pattern = urljoin(api_url, path_to_match) + r"(\?.*)?$"
             url = re.compile(pattern)
             for method in rule.methods:
                 request_mock.add_callback(
@@ -71,6 +71,18 @@ def _get_artifact(artifact_id: str) -> Artifact:
     return Artifact.from_json_encodable(response["content"])
 
 
+def get_cached_output_artifact(cache_key: str) -> Optional[Artifact]:
+    """
+    Get the output artifact of the latest resolved run with `cache_key`, if any.
+    """
+    response = _get("/runs/cache/{}/output".format(cache_key))
+
+    if response["content"] is None:
+        return None
+
+    return Artifact.from_json_encodable(response["content"])
+
+
 def get_run(run_id: str) -> Run:
     """
     Get run
@@ -86,13 +98,24 @@ def save_graph(
     """
     Persist a graph.
     """
-    payload = {
-        "graph": {
-            "runs": [run.to_json_encodable() for run in runs],
-            "artifacts": [artifact.to_json_encodable() for artifact in artifacts],
-            "edges": [edge.to_json_encodable() for edge in edges],
-        }
-    }
+    save_encoded_graph(
+        root_id,
+        runs=[run.to_json_encodable() for run in runs],
+        artifacts=[artifact.to_json_encodable() for artifact in artifacts],
+        edges=[edge.to_json_encodable() for edge in edges],
+    )
+
+
+def save_encoded_graph(
+    root_id: str,
+    runs: List[Dict[str, Any]],
+    artifacts: List[Dict[str, Any]],
+    edges: List[Dict[str, Any]],
+):
+    """
+    Persist a graph whose runs, artifacts and edges are already JSON-encoded.
+    """
+    payload = {"graph": {"runs": runs, "artifacts": artifacts, "edges": edges}}
 
     _put("/graph", payload)
     notify_graph_update(root_id)
@@ -132,6 +155,41 @@ def get_resolution(root_id: str) -> Resolution:
     return Resolution.from_json_encodable(response["content"])
 
 
+def enqueue_run(root_id: str, run_id: str):
+    """
+    Queue a run for the worker pool of its resolution.
+    """
+    _put("/resolutions/{}/queue/{}".format(root_id, run_id), {})
+
+
+def claim_queued_run(root_id: str) -> Optional[str]:
+    """
+    Claim the next queued run of a resolution, `None` if there is none.
+    """
+    response = _post("/resolutions/{}/queue/claim".format(root_id), {})
+
+    return response["content"]
+
+
+def renew_queued_run_claim(root_id: str, run_id: str) -> bool:
+    """
+    Renew the claim of a queued run by the worker executing it. Returns whether
+    the run is claimed.
+    """
+    response = _put("/resolutions/{}/queue/{}/claim".format(root_id, run_id), {})
+
+    return response["content"]
+
+
+def get_completed_queued_run_ids(root_id: str) -> List[str]:
+    """
+    Get the IDs of the queued runs of a resolution that are done executing.
+    """
+    response = _get("/resolutions/{}/queue/completed".format(root_id))
+
+    return response["content"]
+
+
 def notify_pipeline_update(calculator_path: str):
     _notify_event("pipeline", "update", {"calculator_path": calculator_path})
 
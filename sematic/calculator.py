@@ -19,6 +19,7 @@ from typing import (
 # Sematic
 from sematic.abstract_calculator import AbstractCalculator, CalculatorError
 from sematic.future import Future
+from sematic.resolvers.lazy_inputs import get_lazy_value
 from sematic.resolvers.resource_requirements import ResourceRequirements
 from sematic.types.casting import can_cast_type, safe_cast
 from sematic.types.type import is_type
@@ -39,6 +40,9 @@ class Calculator(AbstractCalculator):
         output_type: type,
         resource_requirements: Optional[ResourceRequirements] = None,
         inline: bool = True,
+        cache: bool = False,
+        lazy_inputs: bool = False,
+        max_concurrency: Optional[int] = None,
     ) -> None:
         if not inspect.isfunction(func):
             raise ValueError("{} is not a function".format(func))
@@ -50,6 +54,9 @@ class Calculator(AbstractCalculator):
 
         self._inline = inline
         self._resource_requirements = resource_requirements
+        self._cache = cache
+        self._lazy_inputs = lazy_inputs
+        self._max_concurrency = max_concurrency
 
         self.__doc__ = func.__doc__
         self.__module__ = func.__module__
@@ -76,6 +83,10 @@ class Calculator(AbstractCalculator):
     def input_types(self) -> Dict[str, type]:
         return self._input_types
 
+    @property
+    def lazy_inputs(self) -> bool:
+        return self._lazy_inputs
+
     # Returns typing.Any instead of Future to ensure
     # calculator algebra is valid from a mypy perspective
     def __call__(self, *args: Any, **kwargs: Any) -> Any:
@@ -98,6 +109,8 @@ class Calculator(AbstractCalculator):
             cast_arguments,
             inline=self._inline,
             resource_requirements=self._resource_requirements,
+            cache=self._cache,
+            max_concurrency=self._max_concurrency,
         )
 
     def __signature__(self) -> inspect.Signature:
@@ -167,6 +180,10 @@ class Calculator(AbstractCalculator):
         """
         Attempts to cast a value to the passed type.
         """
+        # Casting picks its plan from the exact type of the value, which is not
+        # the value's for lazy values.
+        value = get_lazy_value(value)
+
         if isinstance(value, Future):
             can_cast, error = can_cast_type(value.calculator.output_type, type_)
             if not can_cast:
@@ -197,10 +214,42 @@ def func(
     func: Callable = None,
     inline: bool = True,
     resource_requirements: Optional[ResourceRequirements] = None,
+    cache: bool = False,
+    lazy_inputs: bool = False,
+    max_concurrency: Optional[int] = None,
 ) -> Union[Callable, Calculator]:
     """
     Sematic Function decorator.
+
+    Parameters
+    ----------
+    inline: bool
+        Defaults to `True`. Whether the function should run within the resolver,
+        or in its own job (`CloudResolver`) or pool worker (`LocalResolver` with
+        `max_parallelism`).
+    resource_requirements: Optional[ResourceRequirements]
+        Resources to request for the function's job, when not inline.
+    cache: bool
+        Defaults to `False`. When `True`, if a previous run of the function with
+        the same source code and the same input values has resolved, its output
+        is reused and the function is not executed.
+    lazy_inputs: bool
+        Defaults to `False`. When `True` and the function runs in its own job,
+        input values are only read from storage when first accessed, and are
+        prefetched in the background meanwhile. Inputs are passed as transparent
+        proxies, see `sematic.resolvers.lazy_inputs.LazyValue`. Returning an
+        input as-is does not read it.
+    max_concurrency: Optional[int]
+        Defaults to `None`. When set and the function runs in its own job
+        (`CloudResolver`), at most this many runs of the function execute at
+        once in a resolution. Other runs are queued.
     """
+    if max_concurrency is not None and max_concurrency < 1:
+        raise ValueError(
+            "max_concurrency must be a positive integer, got: {}".format(
+                repr(max_concurrency)
+            )
+        )
 
     def _wrapper(func_):
 
@@ -234,6 +283,9 @@ def func(
             output_type=output_type,
             inline=inline,
             resource_requirements=resource_requirements,
+            cache=cache,
+            lazy_inputs=lazy_inputs,
+            max_concurrency=max_concurrency,
         )
 
     if func is None:
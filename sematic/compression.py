@@ -0,0 +1,465 @@
+"""
+Compression of stored payloads.
+
+Compressed payloads start with a header recording the codec they were compressed
+with, so that they can be decompressed without knowing how they were written.
+Payloads without a header are returned as-is, which keeps payloads stored
+uncompressed readable.
+
+`"zlib"` and `"gzip"` are always available, `"zstd"` and `"lz4"` require the
+`zstandard` and `lz4` packages.
+
+Payloads are compressed with `"zlib"` by default, since every process reading
+them can decompress it. `"zstd"` and `"lz4"` are faster, but must be selected
+explicitly once all images reading the payloads have their package installed.
+"""
+# Standard Library
+import abc
+import io
+import zlib
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+
+try:
+    # Third-party
+    import zstandard  # type: ignore
+except ImportError:
+    zstandard = None
+
+try:
+    # Third-party
+    import lz4.frame  # type: ignore
+except ImportError:
+    lz4 = None
+
+
+_Binary = Union[bytes, bytearray, memoryview]
+
+_HEADER_MAGIC = b"\x00SEMATICZ"
+
+# Payloads smaller than this are not worth compressing
+DEFAULT_MIN_SIZE_BYTES = 4096
+
+DEFAULT_CODEC_NAME = "zlib"
+
+_BUFFER_SIZE = 1024 * 1024
+
+# Large payloads are only compressed if a sample of this size compresses to less
+# than _MAX_PROBE_RATIO of its size, which skips e.g. images or compressed files.
+_PROBE_SIZE = 256 * 1024
+_MAX_PROBE_RATIO = 0.9
+
+
+class Compressor(abc.ABC):
+    """
+    Incremental compression of a payload.
+    """
+
+    @abc.abstractmethod
+    def compress(self, data: _Binary) -> bytes:
+        pass
+
+    @abc.abstractmethod
+    def flush(self) -> bytes:
+        """
+        Compress remaining data, no data can be compressed afterwards.
+        """
+        pass
+
+
+class Decompressor(abc.ABC):
+    """
+    Incremental decompression of a payload.
+    """
+
+    @abc.abstractmethod
+    def decompress(self, data: _Binary) -> bytes:
+        pass
+
+
+class Codec(abc.ABC):
+    """
+    Abstract base class for compression codecs.
+
+    Parameters
+    ----------
+    name: str
+        Name under which the codec is registered, and recorded in the header of
+        compressed payloads.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    @abc.abstractmethod
+    def make_compressor(self) -> Compressor:
+        pass
+
+    @abc.abstractmethod
+    def make_decompressor(self) -> Decompressor:
+        pass
+
+
+class _ObjCompressor(Compressor):
+    """
+    Wraps the `compressobj()` objects of `zlib` and `zstandard`.
+    """
+
+    def __init__(self, compressobj: Any):
+        self._compressobj = compressobj
+
+    def compress(self, data: _Binary) -> bytes:
+        return self._compressobj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressobj.flush()
+
+
+class _ObjDecompressor(Decompressor):
+    """
+    Wraps the `decompressobj()` objects of `zlib` and `zstandard`.
+    """
+
+    def __init__(self, decompressobj: Any):
+        self._decompressobj = decompressobj
+
+    def decompress(self, data: _Binary) -> bytes:
+        return self._decompressobj.decompress(data)
+
+
+class ZlibCodec(Codec):
+    """
+    Codec of the standard library's `zlib` module.
+
+    Parameters
+    ----------
+    name: str
+        Name of the codec.
+    wbits: int
+        Window size and format, see `zlib.compressobj`. Use `31` for the gzip
+        format.
+    level: int
+        Defaults to `1`. Compression level between `1` (fastest) and `9` (highest
+        ratio). On artifact payloads, higher levels are several times slower for
+        a marginally better ratio.
+    """
+
+    def __init__(self, name: str, wbits: int = zlib.MAX_WBITS, level: int = 1):
+        super().__init__(name)
+        self._wbits = wbits
+        self._level = level
+
+    def make_compressor(self) -> Compressor:
+        return _ObjCompressor(zlib.compressobj(self._level, zlib.DEFLATED, self._wbits))
+
+    def make_decompressor(self) -> Decompressor:
+        return _ObjDecompressor(zlib.decompressobj(self._wbits))
+
+
+class ZstdCodec(Codec):
+    """
+    Zstandard codec, requires the `zstandard` package.
+
+    Parameters
+    ----------
+    level: int
+        Defaults to `3`. Compression level between `1` (fastest) and `22`
+        (highest ratio).
+    """
+
+    def __init__(self, level: int = 3):
+        super().__init__("zstd")
+        self._level = level
+
+    def make_compressor(self) -> Compressor:
+        return _ObjCompressor(zstandard.ZstdCompressor(level=self._level).compressobj())
+
+    def make_decompressor(self) -> Decompressor:
+        return _ObjDecompressor(zstandard.ZstdDecompressor().decompressobj())
+
+
+class _LZ4Compressor(Compressor):
+    def __init__(self):
+        self._compressor = lz4.frame.LZ4FrameCompressor()
+        self._frame_header: Optional[bytes] = self._compressor.begin()
+
+    def compress(self, data: _Binary) -> bytes:
+        return self._pop_frame_header() + self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._pop_frame_header() + self._compressor.flush()
+
+    def _pop_frame_header(self) -> bytes:
+        frame_header, self._frame_header = self._frame_header, None
+        return frame_header or b""
+
+
+class _LZ4Decompressor(Decompressor):
+    def __init__(self):
+        self._decompressor = lz4.frame.LZ4FrameDecompressor()
+
+    def decompress(self, data: _Binary) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+class LZ4Codec(Codec):
+    """
+    LZ4 frame codec, requires the `lz4` package.
+    """
+
+    def __init__(self):
+        super().__init__("lz4")
+
+    def make_compressor(self) -> Compressor:
+        return _LZ4Compressor()
+
+    def make_decompressor(self) -> Decompressor:
+        return _LZ4Decompressor()
+
+
+_CODECS: Dict[str, Codec] = {}
+
+
+def register_codec(codec: Codec) -> None:
+    """
+    Register a codec under its name, replacing any codec of the same name.
+    """
+    if len(codec.name.encode("ascii")) > 255:
+        raise ValueError("Codec name is too long: {}".format(repr(codec.name)))
+
+    _CODECS[codec.name] = codec
+
+
+def get_codec(name: str) -> Codec:
+    """
+    Get a registered codec by name.
+    """
+    try:
+        return _CODECS[name]
+    except KeyError:
+        raise ValueError(
+            "Unknown compression codec {}, expected one of: {}".format(
+                repr(name), ", ".join(map(repr, _CODECS))
+            )
+        )
+
+
+register_codec(ZlibCodec("zlib"))
+register_codec(ZlibCodec("gzip", wbits=16 + zlib.MAX_WBITS))
+
+if zstandard is not None:
+    register_codec(ZstdCodec())
+
+if lz4 is not None:
+    register_codec(LZ4Codec())
+
+
+def _make_header(codec: Codec) -> bytes:
+    name = codec.name.encode("ascii")
+    return _HEADER_MAGIC + bytes([len(name)]) + name
+
+
+def is_compressed(payload: bytes) -> bool:
+    return payload.startswith(_HEADER_MAGIC)
+
+
+def compress(
+    payload: bytes, codec_name: str, min_size_bytes: int = DEFAULT_MIN_SIZE_BYTES
+) -> bytes:
+    """
+    Compress a payload with a header recording the codec.
+
+    Payloads smaller than `min_size_bytes`, or which do not get smaller when
+    compressed, are returned as-is.
+    """
+    if len(payload) < min_size_bytes:
+        return payload
+
+    codec = get_codec(codec_name)
+
+    if len(payload) > 2 * _PROBE_SIZE and not _is_compressible(codec, payload):
+        return payload
+
+    compressor = codec.make_compressor()
+
+    compressed = b"".join(
+        [_make_header(codec), compressor.compress(payload), compressor.flush()]
+    )
+
+    if len(compressed) >= len(payload):
+        return payload
+
+    return compressed
+
+
+def _is_compressible(codec: Codec, payload: bytes) -> bool:
+    compressor = codec.make_compressor()
+    sample = memoryview(payload)[:_PROBE_SIZE]
+    compressed_size = len(compressor.compress(sample)) + len(compressor.flush())
+
+    return compressed_size < _MAX_PROBE_RATIO * _PROBE_SIZE
+
+
+def decompress(payload: bytes) -> bytes:
+    """
+    Decompress a payload compressed with `compress` or a `CompressingWriter`.
+
+    Uncompressed payloads are returned as-is.
+    """
+    if not is_compressed(payload):
+        return payload
+
+    codec, offset = _read_header(payload)
+
+    view = memoryview(payload)[offset:]
+
+    return codec.make_decompressor().decompress(view)
+
+
+def _read_header(payload: bytes) -> Tuple[Codec, int]:
+    """
+    Get the codec of a compressed payload and the offset of the compressed data.
+    """
+    name_start = len(_HEADER_MAGIC) + 1
+
+    if len(payload) < name_start:
+        raise ValueError("Truncated compression header")
+
+    name_end = name_start + payload[name_start - 1]
+    name = bytes(payload[name_start:name_end]).decode("ascii")
+
+    return get_codec(name), name_end
+
+
+class CompressingWriter(io.RawIOBase):
+    """
+    Writable stream compressing data into another stream.
+
+    Data is buffered until `min_size_bytes` have been written. Smaller payloads
+    are written uncompressed when the writer is closed.
+
+    Closing the writer does not close `writer`.
+    """
+
+    def __init__(
+        self,
+        writer: BinaryIO,
+        codec_name: str,
+        min_size_bytes: int = DEFAULT_MIN_SIZE_BYTES,
+    ):
+        super().__init__()
+        self._writer = writer
+        self._codec = get_codec(codec_name)
+        self._min_size_bytes = min_size_bytes
+        self._buffer: Optional[List[bytes]] = []
+        self._buffer_size = 0
+        self._compressor: Optional[Compressor] = None
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        size = memoryview(data).nbytes
+
+        if self._compressor is not None:
+            self._writer.write(self._compressor.compress(data))
+            return size
+
+        assert self._buffer is not None
+        self._buffer.append(bytes(data))
+        self._buffer_size += size
+
+        if self._buffer_size >= self._min_size_bytes:
+            self._start_compression()
+
+        return size
+
+    def close(self) -> None:
+        if self.closed:
+            return
+
+        try:
+            if self._compressor is not None:
+                self._writer.write(self._compressor.flush())
+            elif self._buffer is not None:
+                for data in self._buffer:
+                    self._writer.write(data)
+
+            self._buffer = None
+        finally:
+            super().close()
+
+    def _start_compression(self) -> None:
+        assert self._buffer is not None
+        self._compressor = self._codec.make_compressor()
+        self._writer.write(_make_header(self._codec))
+
+        for data in self._buffer:
+            self._writer.write(self._compressor.compress(data))
+
+        self._buffer = None
+
+
+class DecompressingReader(io.RawIOBase):
+    """
+    Readable stream decompressing data from another stream.
+
+    Data that is not compressed is read as-is. Closing the reader does not close
+    `reader`.
+    """
+
+    def __init__(self, reader: BinaryIO):
+        super().__init__()
+        self._reader = reader
+        self._decompressor: Optional[Decompressor] = None
+        # Memory views are sliced without copying the data
+        self._pending = memoryview(b"")
+        self._is_eof = False
+
+        prefix = self._read_exactly(len(_HEADER_MAGIC))
+
+        if prefix != _HEADER_MAGIC:
+            self._pending = memoryview(prefix)
+            return
+
+        name_size = self._read_exactly(1)
+        if len(name_size) == 0:
+            raise ValueError("Truncated compression header")
+
+        name = self._read_exactly(name_size[0]).decode("ascii")
+        self._decompressor = get_codec(name).make_decompressor()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        view = memoryview(buffer).cast("B")
+
+        while len(self._pending) == 0 and not self._is_eof:
+            data = self._reader.read(_BUFFER_SIZE)
+
+            if not data:
+                self._is_eof = True
+            elif self._decompressor is None:
+                self._pending = memoryview(data)
+            else:
+                self._pending = memoryview(self._decompressor.decompress(data))
+
+        size = min(len(view), len(self._pending))
+        view[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+
+        return size
+
+    def _read_exactly(self, size: int) -> bytes:
+        chunks = []
+
+        while size > 0:
+            chunk = self._reader.read(size)
+
+            if not chunk:
+                break
+
+            chunks.append(chunk)
+            size -= len(chunk)
+
+        return b"".join(chunks)
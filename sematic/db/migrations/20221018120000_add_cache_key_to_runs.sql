@@ -0,0 +1,9 @@
+-- migrate:up
+ALTER TABLE runs ADD COLUMN cache_key TEXT;
+
+CREATE INDEX runs_cache_key_idx ON runs(cache_key);
+
+-- migrate:down
+DROP INDEX runs_cache_key_idx;
+
+ALTER TABLE runs DROP COLUMN cache_key;
@@ -0,0 +1,17 @@
+-- migrate:up
+CREATE TABLE types (
+    -- sha1 hex digest are 40 characters
+    id character(40) NOT NULL,
+    type_serialization JSONB NOT NULL,
+    created_at timestamp NOT NULL,
+    updated_at timestamp NOT NULL,
+
+    PRIMARY KEY (id)
+);
+
+ALTER TABLE artifacts ADD COLUMN type_id character(40) REFERENCES types (id);
+
+-- migrate:down
+ALTER TABLE artifacts DROP COLUMN type_id;
+
+DROP TABLE types;
@@ -0,0 +1,18 @@
+-- migrate:up
+CREATE TABLE queued_runs (
+    run_id character(32) NOT NULL,
+    root_id character(32) NOT NULL,
+    claimed_at timestamp,
+    created_at timestamp NOT NULL,
+    updated_at timestamp NOT NULL,
+
+    PRIMARY KEY (run_id),
+    FOREIGN KEY (run_id) REFERENCES runs(id)
+);
+
+CREATE INDEX queued_runs_root_id_idx ON queued_runs(root_id);
+
+-- migrate:down
+DROP INDEX queued_runs_root_id_idx;
+
+DROP TABLE queued_runs;
@@ -1,8 +1,9 @@
 # Standard Library
 import datetime
+from typing import Optional
 
 # Third party
-from sqlalchemy import Column, types
+from sqlalchemy import Column, ForeignKey, types
 
 # Sematic
 from sematic.db.models.base import Base
@@ -15,8 +16,11 @@ class Artifact(Base, JSONEncodableMixin):
 
     id: str = Column(types.String(), primary_key=True)
     json_summary: str = Column(types.JSON(), nullable=False, info={JSON_KEY: True})
-    type_serialization: str = Column(
-        types.JSON(), nullable=False, info={JSON_KEY: True}
+    # Type serializations are stored once in the types table, and only set here
+    # when artifacts are read, or on artifacts persisted before the types table.
+    type_serialization: str = Column(types.JSON(), info={JSON_KEY: True})
+    type_id: Optional[str] = Column(
+        types.String(), ForeignKey("types.id"), nullable=True
     )
     created_at: datetime.datetime = Column(
         types.DateTime(), nullable=False, default=datetime.datetime.utcnow
@@ -3,9 +3,11 @@ Functions to generate models.
 """
 # Standard Library
 import datetime
+import functools
 import hashlib
 import json
 import secrets
+import struct
 import typing
 
 # Sematic
@@ -13,13 +15,15 @@ import sematic.storage as storage
 from sematic.abstract_future import AbstractFuture
 from sematic.db.models.artifact import Artifact
 from sematic.db.models.run import Run
+from sematic.db.models.type import Type
 from sematic.db.models.user import User
 from sematic.types.serialization import (
+    Binary,
     get_json_encodable_summary,
     type_from_json_encodable,
     type_to_json_encodable,
-    value_from_json_encodable,
-    value_to_json_encodable,
+    value_from_json_encodable_and_segments,
+    value_to_json_encodable_and_segments,
 )
 
 
@@ -47,76 +51,277 @@ def make_run_from_future(future: AbstractFuture) -> Run:
     return run
 
 
+def make_cache_key(
+    calculator_path: str,
+    source_code: str,
+    input_artifact_ids: typing.Dict[str, str],
+) -> str:
+    """
+    Make the key under which a run's output can be reused across resolutions.
+
+    Runs of the same calculator with the same source code and input artifacts
+    (which are content-addressed) share the same cache key.
+    """
+    payload = {
+        "calculator_path": calculator_path,
+        "source_code_digest": get_str_sha1_digest(source_code),
+        "input_artifact_ids": input_artifact_ids,
+    }
+
+    return get_str_sha1_digest(json.dumps(payload, sort_keys=True))
+
+
 def make_artifact(
-    value: typing.Any, type_: typing.Any, store: bool = False
+    value: typing.Any,
+    type_: typing.Any,
+    store: bool = False,
+    storage_backend: typing.Optional[storage.StorageBackend] = None,
 ) -> Artifact:
     """
     Create an Artifact model instance from a value and type.
 
-    `store` set to `True` will persist the artifact's serialization.
-    TODO: replace with modular storage engine.
+    `store` set to `True` will persist the artifact's serialization in
+    `storage_backend`, or in the storage backend selected by user settings if
+    `None`.
     """
     type_serialization = type_to_json_encodable(type_)
-    value_serialization = value_to_json_encodable(value, type_)
+    value_serialization, segments = value_to_json_encodable_and_segments(value, type_)
     json_summary = get_json_encodable_summary(value, type_)
 
+    # Values can be large, they are encoded only once, the same buffer is
+    # hashed and stored.
+    value_json = _encode_value_serialization(value_serialization, store)
+    value_payload = value_json.encode("utf-8")
+    type_json = json.dumps(type_serialization, sort_keys=True)
+    summary_json = _fix_nan_inf(json.dumps(json_summary, sort_keys=True, default=str))
+
     artifact = Artifact(
         id=_get_value_sha1_digest(
-            value_serialization, type_serialization, json_summary
-        ),
-        json_summary=_fix_nan_inf(
-            json.dumps(json_summary, sort_keys=True, default=str)
+            value_json, value_payload, type_json, summary_json, segments
         ),
-        type_serialization=json.dumps(type_serialization, sort_keys=True),
+        json_summary=summary_json,
+        type_serialization=type_json,
         created_at=datetime.datetime.utcnow(),
         updated_at=datetime.datetime.utcnow(),
     )
 
     if store:
-        storage.set(
-            _make_artifact_storage_key(artifact),
-            json.dumps(value_serialization, sort_keys=True).encode("utf-8"),
-        )
+        if storage_backend is None:
+            storage_backend = storage.get_storage()
+
+        storage_key = _make_artifact_storage_key(artifact)
+
+        if len(segments) == 0:
+            storage_backend.set(storage_key, value_payload)
+        else:
+            with storage_backend.open_writer(storage_key) as writer:
+                for part in _make_envelope_parts(value_payload, segments):
+                    writer.write(part)
 
     return artifact
 
 
-def get_artifact_value(artifact: Artifact) -> typing.Any:
+def _encode_value_serialization(value_serialization: typing.Any, store: bool) -> str:
+    try:
+        return json.dumps(value_serialization, sort_keys=True)
+    except TypeError:
+        if store:
+            raise
+
+        # Values that are not stored only need to be hashed
+        return json.dumps(value_serialization, sort_keys=True, default=str)
+
+
+def get_artifact_value(
+    artifact: Artifact,
+    storage_backend: typing.Optional[storage.StorageBackend] = None,
+) -> typing.Any:
     """
     Fetch artifact serialization from storage and deserialize.
+
+    Uses the storage backend selected by user settings if `storage_backend` is
+    `None`.
     """
-    payload = storage.get(_make_artifact_storage_key(artifact))
+    if storage_backend is None:
+        storage_backend = storage.get_storage()
 
-    value_serialization = json.loads(payload.decode("utf-8"))
-    type_serialization = json.loads(artifact.type_serialization)
+    # Values may be memory-mapped, binary segments are read lazily
+    payload = storage_backend.get_buffer(_make_artifact_storage_key(artifact))
 
-    type_ = type_from_json_encodable(type_serialization)
+    value_payload, segments = _read_envelope(payload)
 
-    value = value_from_json_encodable(value_serialization, type_)
+    value_serialization = json.loads(value_payload)
+
+    type_ = _type_from_serialization(artifact.type_serialization)
+
+    value = value_from_json_encodable_and_segments(value_serialization, type_, segments)
 
     return value
 
 
+def prefetch_artifact_value(
+    artifact: Artifact,
+    storage_backend: typing.Optional[storage.StorageBackend] = None,
+) -> None:
+    """
+    Make the value of an artifact faster to get later, see `StorageBackend.prefetch`.
+
+    Uses the storage backend selected by user settings if `storage_backend` is
+    `None`.
+    """
+    if storage_backend is None:
+        storage_backend = storage.get_storage()
+
+    storage_backend.prefetch(_make_artifact_storage_key(artifact))
+
+
+# Values with binary segments are stored in an envelope:
+# - _ENVELOPE_MAGIC, followed by the envelope version
+# - number of segments, 4 bytes
+# - size of the value's JSON serialization then of each segment, 8 bytes each
+# - the value's JSON serialization, then each segment
+# Since version 2, segments start at offsets aligned on _ENVELOPE_ALIGNMENT bytes
+# so that arrays can be read from them without copies.
+# Values without binary segments are stored as plain JSON, which can never
+# start with a null byte.
+_ENVELOPE_MAGIC = b"\x00SEMATIC"
+_ENVELOPE_VERSION = b"2"
+_ENVELOPE_ALIGNMENT = 64
+# Alignment of segments of each envelope version
+_ENVELOPE_ALIGNMENTS = {b"1": 1, b"2": _ENVELOPE_ALIGNMENT}
+_ENVELOPE_COUNT = struct.Struct(">I")
+_ENVELOPE_SIZE = struct.Struct(">Q")
+
+
+def _make_envelope_parts(
+    value_payload: bytes, segments: typing.Sequence[Binary]
+) -> typing.List[Binary]:
+    sizes = [len(value_payload)] + [memoryview(segment).nbytes for segment in segments]
+    header = b"".join(
+        [
+            _ENVELOPE_MAGIC,
+            _ENVELOPE_VERSION,
+            _ENVELOPE_COUNT.pack(len(segments)),
+            *(_ENVELOPE_SIZE.pack(size) for size in sizes),
+        ]
+    )
+
+    parts: typing.List[Binary] = [header, value_payload]
+    offset = len(header) + len(value_payload)
+
+    for segment, size in zip(segments, sizes[1:]):
+        padding = _get_padding(offset, _ENVELOPE_ALIGNMENT)
+        parts.extend([bytes(padding), segment])
+        offset += padding + size
+
+    return parts
+
+
+def _get_padding(offset: int, alignment: int) -> int:
+    return -offset % alignment
+
+
+def _read_envelope(payload: Binary) -> typing.Tuple[bytes, typing.List[Binary]]:
+    """
+    Split a stored payload into the value's JSON serialization and its binary
+    segments.
+
+    Segments are memory views of `payload`, they are not copied.
+    """
+    view = memoryview(payload)
+    magic_size = len(_ENVELOPE_MAGIC)
+    version_end = magic_size + len(_ENVELOPE_VERSION)
+    version = bytes(view[magic_size:version_end])
+
+    if view[:magic_size] != _ENVELOPE_MAGIC or version not in _ENVELOPE_ALIGNMENTS:
+        return bytes(view), []
+
+    alignment = _ENVELOPE_ALIGNMENTS[version]
+    offset = version_end
+
+    (segments_count,) = _ENVELOPE_COUNT.unpack_from(view, offset)
+    offset += _ENVELOPE_COUNT.size
+
+    sizes = []
+    for _ in range(segments_count + 1):
+        sizes.append(_ENVELOPE_SIZE.unpack_from(view, offset)[0])
+        offset += _ENVELOPE_SIZE.size
+
+    parts: typing.List[memoryview] = []
+    for index, size in enumerate(sizes):
+        # The value's JSON serialization is not aligned
+        if index > 0:
+            offset += _get_padding(offset, alignment)
+
+        end = offset + size
+
+        if end > len(view):
+            raise ValueError("Truncated artifact payload")
+
+        parts.append(view[offset:end])
+        offset = end
+
+    return bytes(parts[0]), list(parts[1:])
+
+
+@functools.lru_cache(maxsize=1024)
+def _type_from_serialization(type_serialization: str) -> typing.Any:
+    return type_from_json_encodable(json.loads(type_serialization))
+
+
+def make_type(type_serialization: str) -> Type:
+    """
+    Create a Type model instance from an artifact's type serialization.
+    """
+    return Type(
+        id=get_str_sha1_digest(type_serialization),
+        type_serialization=type_serialization,
+        created_at=datetime.datetime.utcnow(),
+        updated_at=datetime.datetime.utcnow(),
+    )
+
+
 def _make_artifact_storage_key(artifact: Artifact) -> str:
     return "artifacts/{}".format(artifact.id)
 
 
 def _get_value_sha1_digest(
-    value_serialization: typing.Any,
-    type_serialization: typing.Any,
-    json_summary: typing.Any,
+    value_json: str,
+    value_payload: bytes,
+    type_json: str,
+    summary_json: str,
+    segments: typing.Sequence[Binary] = (),
 ) -> str:
     """
     Get sha1 digest for artifact value
+
+    This is the digest of the JSON encoding of
+    `{"summary": ..., "type": ..., "value": ...}` with sorted keys, which is
+    streamed from the already encoded parts instead of being encoded again,
+    followed by the size and content of each binary segment, if any.
     """
-    payload = {
-        "value": value_serialization,
-        "type": type_serialization,
-        "summary": json_summary,
-        # Should there be some sort of type versioning concept here?
-    }
-    string = _fix_nan_inf(json.dumps(payload, sort_keys=True, default=str))
-    return get_str_sha1_digest(string)
+    # Should there be some sort of type versioning concept here?
+    if "NaN" in value_json or "Infinity" in value_json:
+        value_payload = _fix_nan_inf(value_json).encode("utf-8")
+
+    sha1_digest = hashlib.sha1()
+
+    for part in (
+        b'{"summary": ',
+        summary_json.encode("utf-8"),
+        b', "type": ',
+        type_json.encode("utf-8"),
+        b', "value": ',
+        value_payload,
+        b"}",
+    ):
+        sha1_digest.update(part)
+
+    for segment in segments:
+        sha1_digest.update(_ENVELOPE_SIZE.pack(memoryview(segment).nbytes))
+        sha1_digest.update(segment)
+
+    return sha1_digest.hexdigest()
 
 
 def get_str_sha1_digest(string: str) -> str:
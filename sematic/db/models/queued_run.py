@@ -0,0 +1,48 @@
+# Standard Library
+import datetime
+from typing import Optional
+
+# Third party
+from sqlalchemy import Column, ForeignKey, types
+
+# Sematic
+from sematic.db.models.base import Base
+from sematic.db.models.json_encodable_mixin import JSONEncodableMixin
+
+# Duration after which the claim of a run is expired if the worker executing it
+# did not renew it, e.g. because it died.
+CLAIM_LEASE_SECONDS = 60
+
+
+class QueuedRun(Base, JSONEncodableMixin):
+    """
+    A run waiting to be executed by the worker pool of its resolution.
+
+    Attributes
+    ----------
+    run_id:
+        The id of the queued run.
+    root_id:
+        The id of the root run of the resolution, whose worker pool executes the
+        run.
+    claimed_at:
+        When a worker claimed the run, `None` while it is waiting for one.
+    updated_at:
+        When the run was claimed, or its claim last renewed by the worker
+        executing it.
+    """
+
+    __tablename__ = "queued_runs"
+
+    run_id: str = Column(types.String(), ForeignKey("runs.id"), primary_key=True)
+    root_id: str = Column(types.String(), nullable=False)
+    claimed_at: Optional[datetime.datetime] = Column(types.DateTime(), nullable=True)
+    created_at: datetime.datetime = Column(
+        types.DateTime(), nullable=False, default=datetime.datetime.utcnow
+    )
+    updated_at: datetime.datetime = Column(
+        types.DateTime(),
+        nullable=False,
+        default=datetime.datetime.utcnow,
+        onupdate=datetime.datetime.utcnow,
+    )
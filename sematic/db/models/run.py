@@ -50,6 +50,9 @@ class Run(Base, JSONEncodableMixin):
         The calculator's source code.
     exception: Optional[str]
         The calculator's source code.
+    cache_key: Optional[str]
+        Key identifying the run's calculator source code and input artifacts, set
+        if the function's output can be reused across resolutions.
     created_at : datetime
         Time of creating of the run record in the DB.
     updated_at : datetime
@@ -84,6 +87,7 @@ class Run(Base, JSONEncodableMixin):
     source_code: str = Column(types.String(), nullable=False)
     exception: str = Column(types.String(), nullable=True)
     nested_future_id: str = Column(types.String(), nullable=True)
+    cache_key: Optional[str] = Column(types.String(), nullable=True)
 
     # Lifecycle timestamps
     created_at: datetime.datetime = Column(
@@ -1,7 +1,12 @@
 # Standard Library
+import dataclasses
 import hashlib
 import json
+import os
+from typing import Any, Callable, Dict, List, Tuple
+from unittest import mock
 
+import cloudpickle
 import pytest
 
 # Sematic
@@ -9,16 +14,30 @@ import sematic.storage as storage
 from sematic.abstract_future import FutureState
 from sematic.calculator import func
 from sematic.db.models.factories import (
+    _ENVELOPE_ALIGNMENT,
+    _ENVELOPE_COUNT,
+    _ENVELOPE_MAGIC,
+    _ENVELOPE_SIZE,
+    _fix_nan_inf,
     _make_artifact_storage_key,
+    _make_envelope_parts,
+    _read_envelope,
     get_artifact_value,
+    get_str_sha1_digest,
     make_artifact,
+    make_cache_key,
     make_run_from_future,
+    make_type,
 )
+from sematic.tests.benchmark import benchmark, measure_time
 from sematic.tests.fixtures import test_storage  # noqa: F401
 from sematic.types.serialization import (
+    binary_to_string,
     get_json_encodable_summary,
     type_to_json_encodable,
+    value_from_json_encodable,
     value_to_json_encodable,
+    value_to_json_encodable_and_segments,
 )
 
 
@@ -112,3 +131,303 @@ def test_get_artifact_value(test_storage):  # noqa: F811
 
     assert value == 42
     assert isinstance(value, int)
+
+
+def test_make_type():
+    artifact = make_artifact(42, int)
+
+    type_ = make_type(artifact.type_serialization)
+
+    assert type_.id == get_str_sha1_digest(artifact.type_serialization)
+    assert type_.type_serialization == artifact.type_serialization
+    assert make_type(make_artifact(43, int).type_serialization).id == type_.id
+
+
+def test_type_serialization_cached():
+    assert type_to_json_encodable(List[int]) is type_to_json_encodable(List[int])
+
+
+def test_make_cache_key():
+    cache_key = make_cache_key("path.to.f", "def f(): pass", {"a": "123"})
+
+    assert cache_key == make_cache_key("path.to.f", "def f(): pass", {"a": "123"})
+    assert cache_key != make_cache_key("path.to.g", "def f(): pass", {"a": "123"})
+    assert cache_key != make_cache_key("path.to.f", "def f(): 1", {"a": "123"})
+    assert cache_key != make_cache_key("path.to.f", "def f(): pass", {"a": "456"})
+
+
+@dataclasses.dataclass
+class Point:
+    x: float
+    y: float
+
+
+def _make_artifact_id_multi_pass(value: Any, type_: Any, store: bool) -> str:
+    """
+    Previous implementation of `make_artifact`, which encoded the value serialization
+    once to hash it and once more to store it.
+    """
+    type_serialization = type_to_json_encodable(type_)
+    value_serialization = value_to_json_encodable(value, type_)
+    json_summary = get_json_encodable_summary(value, type_)
+
+    payload = {
+        "value": value_serialization,
+        "type": type_serialization,
+        "summary": json_summary,
+    }
+    artifact_id = get_str_sha1_digest(
+        _fix_nan_inf(json.dumps(payload, sort_keys=True, default=str))
+    )
+
+    _fix_nan_inf(json.dumps(json_summary, sort_keys=True, default=str))
+    json.dumps(type_serialization, sort_keys=True)
+
+    if store:
+        storage.get_storage().set(
+            "artifacts/{}".format(artifact_id),
+            json.dumps(value_serialization, sort_keys=True).encode("utf-8"),
+        )
+
+    return artifact_id
+
+
+def _make_list() -> Tuple[Any, Any]:
+    return [float(i) for i in range(5000)], List[float]
+
+
+def _make_dict() -> Tuple[Any, Any]:
+    return {str(i): float(i) for i in range(5000)}, Dict[str, float]
+
+
+def _make_dataclasses() -> Tuple[Any, Any]:
+    return [Point(x=i, y=float("nan")) for i in range(2000)], List[Point]
+
+
+def _make_dataframe() -> Tuple[Any, Any]:
+    pandas = pytest.importorskip("pandas")
+
+    dataframe = pandas.DataFrame({str(i): list(range(1000)) for i in range(10)})
+
+    return dataframe, pandas.DataFrame
+
+
+def _make_tensor() -> Tuple[Any, Any]:
+    torch = pytest.importorskip("torch")
+
+    return torch.rand(1000, 100), torch.Tensor
+
+
+def _count_encoded_chars(make: Callable[[], Any]) -> int:
+    encoded_chars = 0
+
+    def _dumps(*args, **kwargs):
+        nonlocal encoded_chars
+        encoded = json_dumps(*args, **kwargs)
+        encoded_chars += len(encoded)
+        return encoded
+
+    json_dumps = json.dumps
+
+    with mock.patch("json.dumps", _dumps):
+        make()
+
+    return encoded_chars
+
+
+@pytest.mark.parametrize(
+    "make_value",
+    (_make_list, _make_dict, _make_dataclasses, _make_dataframe, _make_tensor),
+)
+def test_make_artifact_single_pass(make_value, test_storage):  # noqa: F811
+    """
+    Compare `make_artifact` with the previous multi-pass implementation.
+
+    Artifact IDs are unchanged, and values are JSON-encoded once instead of twice.
+    """
+    value, type_ = make_value()
+
+    def make_multi_pass():
+        return _make_artifact_id_multi_pass(value, type_, store=True)
+
+    def make_single_pass():
+        return make_artifact(value, type_, store=True).id
+
+    _, segments = value_to_json_encodable_and_segments(value, type_)
+
+    # IDs of values with binary data changed when they stopped being base64-encoded
+    if len(segments) == 0:
+        assert make_single_pass() == make_multi_pass()
+
+    multi_pass_chars = _count_encoded_chars(make_multi_pass)
+    single_pass_chars = _count_encoded_chars(make_single_pass)
+
+    value_chars = len(json.dumps(value_to_json_encodable(value, type_), sort_keys=True))
+
+    # The value is no longer encoded a second time to be hashed
+    assert multi_pass_chars - single_pass_chars >= value_chars
+
+
+@benchmark
+def test_make_artifact_single_pass_benchmark(test_storage):  # noqa: F811
+    """
+    Benchmark of `make_artifact` against the previous multi-pass implementation.
+
+    The speedup of each value depends on how much of the time is spent computing
+    its serialization and summary rather than encoding it, from a few percent for
+    lists of floats to about 20% for dataclasses. Their total is compared.
+    """
+    values = []
+
+    for make_value in (
+        _make_list,
+        _make_dict,
+        _make_dataclasses,
+        _make_dataframe,
+        _make_tensor,
+    ):
+        try:
+            values.append(make_value())
+        except pytest.skip.Exception:
+            # e.g. torch is not installed
+            pass
+
+    def make_multi_pass():
+        for value, type_ in values:
+            _make_artifact_id_multi_pass(value, type_, store=True)
+
+    def make_single_pass():
+        for value, type_ in values:
+            make_artifact(value, type_, store=True)
+
+    multi_pass_times, single_pass_times = [], []
+
+    # Interleaved, so that both are equally affected by the machine's load
+    for _ in range(30):
+        multi_pass_times.append(measure_time(make_multi_pass, repeat=1))
+        single_pass_times.append(measure_time(make_single_pass, repeat=1))
+
+    assert min(single_pass_times) < min(multi_pass_times)
+
+
+class Blob:
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def __eq__(self, other):
+        return isinstance(other, Blob) and other.data == self.data
+
+    def __repr__(self):
+        # The default repr, used in summaries, is not deterministic
+        return "Blob({} bytes)".format(len(self.data))
+
+
+def test_make_artifact_binary(test_storage):  # noqa: F811
+    value = Blob(b"\x00" * 1000)
+    artifact = make_artifact(value, Blob, store=True)
+
+    payload = storage.get(_make_artifact_storage_key(artifact))
+
+    assert payload.startswith(_ENVELOPE_MAGIC)
+    # Pickled bytes are stored raw, not base64-encoded
+    assert len(payload) < 1200
+    assert get_artifact_value(artifact) == value
+
+    assert make_artifact(Blob(b"\x00" * 1000), Blob).id == artifact.id
+    assert make_artifact(Blob(b"\x01" * 1000), Blob).id != artifact.id
+
+
+def test_envelope_alignment():
+    segments = [b"a", b"bc" * 100, b"ddd"]
+    payload = b"".join(_make_envelope_parts(b'{"x": 1}', segments))
+
+    value_payload, read_segments = _read_envelope(payload)
+
+    assert value_payload == b'{"x": 1}'
+    assert read_segments == segments
+
+    for segment in segments:
+        # Segments start at aligned offsets
+        assert payload.index(segment) % _ENVELOPE_ALIGNMENT == 0
+
+
+def test_read_envelope_version_1():
+    """
+    Envelopes written before segments were aligned can still be read.
+    """
+    payload = b"".join(
+        [
+            _ENVELOPE_MAGIC,
+            b"1",
+            _ENVELOPE_COUNT.pack(1),
+            _ENVELOPE_SIZE.pack(2),
+            _ENVELOPE_SIZE.pack(3),
+            b"{}",
+            b"abc",
+        ]
+    )
+
+    assert _read_envelope(payload) == (b"{}", [b"abc"])
+
+
+def test_get_artifact_value_base64(test_storage):  # noqa: F811
+    """
+    Values stored before binary envelopes can still be read.
+    """
+    value = Blob(b"\x00" * 1000)
+    artifact = make_artifact(value, Blob)
+    json_encodable = value_to_json_encodable(value, Blob)
+
+    assert json_encodable == {"pickle": binary_to_string(cloudpickle.dumps(value))}
+
+    storage.set(
+        _make_artifact_storage_key(artifact), json.dumps(json_encodable).encode("utf-8")
+    )
+
+    assert get_artifact_value(artifact) == value
+
+
+def _store_base64(value: Any, type_: Any) -> Any:
+    """
+    Previous storage of pickled values, base64-encoded in the JSON payload.
+    """
+    payload = json.dumps(value_to_json_encodable(value, type_), sort_keys=True)
+    storage.set("artifacts/base64", payload.encode("utf-8"))
+
+    return value_from_json_encodable(
+        json.loads(storage.get("artifacts/base64").decode("utf-8")), type_
+    )
+
+
+def test_make_artifact_binary_size(test_storage):  # noqa: F811
+    """
+    Binary envelopes are smaller than base64-encoded pickles in JSON.
+    """
+    value = Blob(os.urandom(1024 * 1024))
+
+    assert _store_base64(value, Blob) == value
+
+    base64_size = len(storage.get("artifacts/base64"))
+    envelope_size = len(
+        storage.get(_make_artifact_storage_key(make_artifact(value, Blob, store=True)))
+    )
+
+    assert envelope_size < 0.76 * base64_size
+
+
+@benchmark
+def test_make_artifact_binary_benchmark(test_storage):  # noqa: F811
+    """
+    Benchmark of binary envelopes against base64-encoded pickles in JSON.
+    """
+    value = Blob(os.urandom(20 * 1024 * 1024))
+
+    def _store_envelope():
+        return get_artifact_value(make_artifact(value, Blob, store=True))
+
+    assert _store_base64(value, Blob) == _store_envelope() == value
+
+    base64_time = measure_time(lambda: _store_base64(value, Blob), repeat=5)
+    envelope_time = measure_time(_store_envelope, repeat=5)
+
+    assert envelope_time < base64_time
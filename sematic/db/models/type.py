@@ -0,0 +1,33 @@
+# Standard Library
+import datetime
+
+# Third party
+from sqlalchemy import Column, types
+
+# Sematic
+from sematic.db.models.base import Base
+from sematic.db.models.json_encodable_mixin import JSON_KEY, JSONEncodableMixin
+
+
+class Type(Base, JSONEncodableMixin):
+    """
+    A type serialization, shared by all artifacts of this type.
+
+    Types are content-addressed: `id` is the SHA1 digest of `type_serialization`.
+    """
+
+    __tablename__ = "types"
+
+    id: str = Column(types.String(), primary_key=True)
+    type_serialization: str = Column(
+        types.JSON(), nullable=False, info={JSON_KEY: True}
+    )
+    created_at: datetime.datetime = Column(
+        types.DateTime(), nullable=False, default=datetime.datetime.utcnow
+    )
+    updated_at: datetime.datetime = Column(
+        types.DateTime(),
+        nullable=False,
+        default=datetime.datetime.utcnow,
+        onupdate=datetime.datetime.utcnow,
+    )
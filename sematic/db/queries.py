@@ -2,20 +2,27 @@
 Module holding common DB queries.
 """
 # Standard Library
-from typing import List, Set, Tuple
+import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 # Third-party
 import sqlalchemy
 import sqlalchemy.orm
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.sql.elements import ColumnElement
 
 # Sematic
+from sematic.abstract_future import FutureState
 from sematic.db.db import db
 from sematic.db.models.artifact import Artifact
 from sematic.db.models.edge import Edge
+from sematic.db.models.factories import make_type
 from sematic.db.models.note import Note
+from sematic.db.models.queued_run import CLAIM_LEASE_SECONDS, QueuedRun
 from sematic.db.models.resolution import Resolution
 from sematic.db.models.run import Run
+from sematic.db.models.type import Type
 from sematic.db.models.user import User
 
 
@@ -49,7 +56,45 @@ def get_artifact(artifact_id: str) -> Artifact:
         Fetched artifact
     """
     with db().get_session() as session:
-        return session.query(Artifact).filter(Artifact.id == artifact_id).one()
+        artifact = session.query(Artifact).filter(Artifact.id == artifact_id).one()
+
+    populate_type_serializations([artifact])
+
+    return artifact
+
+
+def populate_type_serializations(artifacts: Iterable[Artifact]) -> None:
+    """
+    Set the type serialization of artifacts read from the database.
+
+    Type serializations are stored once per type in the types table, instead of
+    on every artifact.
+
+    Parameters
+    ----------
+    artifacts : Iterable[Artifact]
+        Artifacts to populate, in place.
+    """
+    artifacts_by_type_id: Dict[str, List[Artifact]] = {}
+
+    for artifact in artifacts:
+        if artifact.type_serialization is None and artifact.type_id is not None:
+            artifacts_by_type_id.setdefault(artifact.type_id, []).append(artifact)
+
+    if len(artifacts_by_type_id) == 0:
+        return
+
+    with db().get_session() as session:
+        types: List[Type] = (
+            session.query(Type).filter(Type.id.in_(artifacts_by_type_id)).all()
+        )
+
+    for type_ in types:
+        for artifact in artifacts_by_type_id[type_.id]:
+            # Not marking the artifact as modified
+            set_committed_value(
+                artifact, "type_serialization", type_.type_serialization
+            )
 
 
 def get_run(run_id: str) -> Run:
@@ -129,6 +174,157 @@ def save_resolution(resolution: Resolution) -> Resolution:
     return resolution
 
 
+def enqueue_run(run_id: str, root_id: str) -> QueuedRun:
+    """
+    Queue a run for the worker pool of its resolution. Queuing a run again has no
+    effect.
+
+    Parameters
+    ----------
+    run_id:
+        ID of the run to queue.
+    root_id:
+        ID of the root run of the resolution.
+
+    Returns
+    -------
+    The queued run
+    """
+    with db().get_session() as session:
+        queued_run = session.get(QueuedRun, run_id)
+
+        if queued_run is None:
+            queued_run = QueuedRun(run_id=run_id, root_id=root_id)
+            session.add(queued_run)
+            session.commit()
+            session.refresh(queued_run)
+
+    return queued_run
+
+
+# Future states of runs that are done executing
+_COMPLETED_QUEUED_RUN_STATES = [
+    state.value
+    for state in FutureState
+    if state.is_terminal() or state == FutureState.RAN
+]
+
+
+def claim_queued_run(
+    root_id: str, max_attempts: int = 10, lease_seconds: float = CLAIM_LEASE_SECONDS
+) -> Optional[str]:
+    """
+    Claim the oldest run of a resolution that no worker claimed yet, or whose
+    claim expired.
+
+    Runs are claimed with a conditional update, so that concurrent workers never
+    claim the same run. Workers renew their claim with `renew_queued_run_claim`
+    while they execute the run: claims not renewed for `lease_seconds` are those
+    of workers that died, and their runs are claimed again unless they are done
+    executing.
+
+    Parameters
+    ----------
+    root_id:
+        ID of the root run of the resolution.
+    max_attempts:
+        Number of unclaimed runs to try to claim, in case other workers claim them
+        concurrently.
+    lease_seconds:
+        Duration after which claims that were not renewed expire.
+
+    Returns
+    -------
+    The ID of the claimed run, `None` if there is no unclaimed run.
+    """
+    expired_before = datetime.datetime.utcnow() - datetime.timedelta(
+        seconds=lease_seconds
+    )
+    is_claimable = sqlalchemy.or_(
+        QueuedRun.claimed_at.is_(None), QueuedRun.updated_at < expired_before
+    )
+
+    with db().get_session() as session:
+        run_ids: List[str] = [
+            run_id
+            for run_id, in session.query(QueuedRun.run_id)
+            .join(Run, Run.id == QueuedRun.run_id)
+            .filter(
+                QueuedRun.root_id == root_id,
+                is_claimable,
+                Run.future_state.notin_(_COMPLETED_QUEUED_RUN_STATES),
+            )
+            # Runs queued within the same clock tick are claimed in a stable order
+            .order_by(QueuedRun.created_at, QueuedRun.run_id).limit(max_attempts)
+        ]
+
+        for run_id in run_ids:
+            now = datetime.datetime.utcnow()
+            claimed_count = (
+                session.query(QueuedRun)
+                .filter(QueuedRun.run_id == run_id, is_claimable)
+                .update(
+                    {QueuedRun.claimed_at: now, QueuedRun.updated_at: now},
+                    synchronize_session=False,
+                )
+            )
+            session.commit()
+
+            if claimed_count == 1:
+                return run_id
+
+    return None
+
+
+def renew_queued_run_claim(run_id: str) -> bool:
+    """
+    Renew the claim of a queued run by the worker executing it.
+
+    Parameters
+    ----------
+    run_id:
+        ID of the claimed run.
+
+    Returns
+    -------
+    Whether the run is claimed.
+    """
+    with db().get_session() as session:
+        renewed_count = (
+            session.query(QueuedRun)
+            .filter(QueuedRun.run_id == run_id, QueuedRun.claimed_at.isnot(None))
+            .update(
+                {QueuedRun.updated_at: datetime.datetime.utcnow()},
+                synchronize_session=False,
+            )
+        )
+        session.commit()
+
+    return renewed_count == 1
+
+
+def get_completed_queued_run_ids(root_id: str) -> List[str]:
+    """
+    Get the IDs of the queued runs of a resolution that are done executing, i.e.
+    whose future state is terminal or `RAN`.
+
+    Parameters
+    ----------
+    root_id:
+        ID of the root run of the resolution.
+    """
+    with db().get_session() as session:
+        return [
+            run_id
+            for run_id, in session.query(QueuedRun.run_id)
+            .join(Run, Run.id == QueuedRun.run_id)
+            .filter(
+                QueuedRun.root_id == root_id,
+                Run.future_state.in_(_COMPLETED_QUEUED_RUN_STATES),
+            )
+        ]
+
+
 def save_graph(runs: List[Run], artifacts: List[Artifact], edges: List[Edge]):
     """
     Update a graph
@@ -137,8 +333,7 @@ def save_graph(runs: List[Run], artifacts: List[Artifact], edges: List[Edge]):
         for run in runs:
             session.merge(run)
 
-        for artifact in artifacts:
-            session.merge(artifact)
+        _merge_artifacts(session, artifacts)
 
         for edge in edges:
             session.merge(edge)
@@ -146,6 +341,88 @@ def save_graph(runs: List[Run], artifacts: List[Artifact], edges: List[Edge]):
         session.commit()
 
 
+def _merge_artifacts(session: sqlalchemy.orm.Session, artifacts: List[Artifact]):
+    """
+    Merge artifacts, storing their type serialization in the types table.
+    """
+    types_by_id: Dict[str, Type] = {}
+    artifact_type_ids: List[Optional[str]] = []
+
+    for artifact in artifacts:
+        if artifact.type_serialization is None:
+            artifact_type_ids.append(artifact.type_id)
+            continue
+
+        type_ = make_type(artifact.type_serialization)
+        types_by_id[type_.id] = type_
+        artifact_type_ids.append(type_.id)
+
+    _insert_types(session, list(types_by_id.values()))
+
+    for artifact, type_id in zip(artifacts, artifact_type_ids):
+        merged_artifact = session.merge(artifact)
+        merged_artifact.type_id = type_id
+        merged_artifact.type_serialization = None
+
+
+def _insert_types(session: sqlalchemy.orm.Session, types_: List[Type]):
+    """
+    Insert types, leaving existing ones untouched since they are content-addressed.
+
+    Concurrent graph saves can insert the same new type, conflicts are ignored
+    instead of checking for existing types first.
+    """
+    if len(types_) == 0:
+        return
+
+    if session.get_bind().dialect.name == "postgresql":
+        statement = postgresql.insert(Type.__table__)
+    else:
+        statement = sqlite.insert(Type.__table__)
+
+    session.execute(
+        statement.values(
+            [
+                dict(id=type_.id, type_serialization=type_.type_serialization)
+                for type_ in types_
+            ]
+        ).on_conflict_do_nothing(index_elements=["id"])
+    )
+
+
+def get_cached_output_artifact(cache_key: str) -> Optional[Artifact]:
+    """
+    Get the output artifact of the latest resolved run with `cache_key`.
+
+    Parameters
+    ----------
+    cache_key : str
+        Cache key of the run, see `sematic.db.models.factories.make_cache_key`.
+
+    Returns
+    -------
+    Optional[Artifact]
+        The output artifact, `None` if no run with `cache_key` has resolved.
+    """
+    with db().get_session() as session:
+        artifact = (
+            session.query(Artifact)
+            .join(Edge, Edge.artifact_id == Artifact.id)
+            .join(Run, Run.id == Edge.source_run_id)
+            .filter(
+                Run.cache_key == cache_key,
+                Run.future_state == FutureState.RESOLVED.value,
+            )
+            .order_by(sqlalchemy.desc(Run.resolved_at))
+            .first()
+        )
+
+    if artifact is not None:
+        populate_type_serializations([artifact])
+
+    return artifact
+
+
 Graph = Tuple[List[Run], List[Artifact], List[Edge]]
 
 
@@ -193,6 +470,8 @@ def _get_graph(run_predicate: ColumnElement) -> Graph:
             session.query(Artifact).filter(Artifact.id.in_(artifact_ids)).all()
         )
 
+    populate_type_serializations(artifacts)
+
     return runs, artifacts, edges
 
 
@@ -77,9 +77,11 @@ def test_db_empty():
 
 
 @pytest.fixture(scope="function")
-def test_db():
+def test_db(tmp_path):
     original_db = db._db_instance
-    temp_db = db.DB("sqlite://")
+    # In-memory SQLite databases are only visible to the thread that created them,
+    # whereas resolvers save graphs from a background thread.
+    temp_db = db.DB("sqlite:///{}".format(tmp_path / "db.sqlite3"))
 
     with open("sematic/db/schema.sql.sqlite", "r") as file:
         schema = file.read()
@@ -87,6 +89,8 @@ def test_db():
     connection = temp_db.get_engine().raw_connection()
     cursor = connection.cursor()
     cursor.executescript(schema)
+    connection.commit()
+    connection.close()
 
     db._db_instance = temp_db
 
@@ -1,23 +1,42 @@
+# Standard Library
+import threading
+import time
+import uuid
+from typing import List
+
 # Third-party
 import pytest
 
 # Sematic
+from sematic.abstract_future import FutureState
 from sematic.api.tests.fixtures import (  # noqa: F401
     mock_no_auth,
     mock_requests,
     test_client,
 )
 from sematic.calculator import func
+from sematic.db.db import db
 from sematic.db.models.artifact import Artifact
+from sematic.db.models.edge import Edge
+from sematic.db.models.factories import make_artifact
 from sematic.db.models.resolution import Resolution, ResolutionStatus
 from sematic.db.models.run import Run
+from sematic.db.models.type import Type
 from sematic.db.queries import (
+    _merge_artifacts,
+    claim_queued_run,
     count_runs,
+    enqueue_run,
     get_artifact,
+    get_cached_output_artifact,
+    get_completed_queued_run_ids,
     get_resolution,
     get_root_graph,
     get_run,
     get_run_graph,
+    populate_type_serializations,
+    renew_queued_run_claim,
+    save_graph,
     save_resolution,
     save_run,
 )
@@ -89,6 +108,197 @@ def test_get_artifact(test_db, persisted_artifact: Artifact):  # noqa: F811
     assert artifact.json_summary == artifact.json_summary
 
 
+def test_save_graph_types(test_db):  # noqa: F811
+    artifacts = [
+        make_artifact(1, int),
+        make_artifact(2, int),
+        make_artifact(3.0, float),
+    ]
+
+    save_graph(runs=[], artifacts=artifacts, edges=[])
+    # Saving existing types again is a no-op
+    save_graph(runs=[], artifacts=[make_artifact(4, int)], edges=[])
+
+    with db().get_session() as session:
+        types = session.query(Type).all()
+        artifact_rows = session.query(Artifact).all()
+
+    # Type serializations are stored once per type
+    assert {type_.type_serialization for type_ in types} == {
+        artifacts[0].type_serialization,
+        artifacts[2].type_serialization,
+    }
+    assert all(artifact.type_serialization is None for artifact in artifact_rows)
+    assert all(artifact.type_id is not None for artifact in artifact_rows)
+
+    # The saved artifacts are not modified
+    assert all(artifact.type_serialization is not None for artifact in artifacts)
+
+    for artifact in artifacts:
+        assert get_artifact(artifact.id).type_serialization == (
+            artifact.type_serialization
+        )
+
+
+def test_save_graph_types_concurrently(test_db):  # noqa: F811
+    artifact = make_artifact([1], List[int])
+    errors = []
+
+    def _save_in_other_session():
+        try:
+            with db().get_session() as session:
+                _merge_artifacts(session, [make_artifact([2], List[int])])
+                session.commit()
+        except Exception as e:
+            errors.append(e)
+
+    with db().get_session() as session:
+        # The type is not committed yet when the other session saves it too
+        _merge_artifacts(session, [artifact])
+
+        thread = threading.Thread(target=_save_in_other_session)
+        thread.start()
+        # Give the other session time to wait for this one's transaction
+        time.sleep(0.2)
+
+        session.commit()
+
+    thread.join()
+
+    assert errors == []
+
+    with db().get_session() as session:
+        types = session.query(Type).all()
+
+    assert [type_.type_serialization for type_ in types] == [
+        artifact.type_serialization
+    ]
+
+
+def test_populate_type_serializations_legacy(
+    test_db, persisted_artifact: Artifact  # noqa: F811
+):
+    # Artifacts persisted before the types table keep their type serialization
+    artifact = get_artifact(persisted_artifact.id)
+
+    assert artifact.type_id is None
+    assert artifact.type_serialization == persisted_artifact.type_serialization
+
+    populate_type_serializations([artifact])
+
+    assert artifact.type_serialization == persisted_artifact.type_serialization
+
+
+def test_get_cached_output_artifact(
+    test_db, persisted_artifact: Artifact  # noqa: F811
+):
+    assert get_cached_output_artifact("cache_key") is None
+
+    cached_run = make_run(cache_key="cache_key", future_state=FutureState.RESOLVED)
+    edge = Edge(
+        id=uuid.uuid4().hex,
+        source_run_id=cached_run.id,
+        artifact_id=persisted_artifact.id,
+    )
+    save_graph(runs=[cached_run], artifacts=[], edges=[edge])
+
+    artifact = get_cached_output_artifact("cache_key")
+
+    assert artifact is not None
+    assert artifact.id == persisted_artifact.id
+
+
+def test_get_cached_output_artifact_unresolved(
+    test_db, persisted_artifact: Artifact  # noqa: F811
+):
+    cached_run = make_run(cache_key="cache_key", future_state=FutureState.FAILED)
+    edge = Edge(
+        id=uuid.uuid4().hex,
+        source_run_id=cached_run.id,
+        artifact_id=persisted_artifact.id,
+    )
+    save_graph(runs=[cached_run], artifacts=[], edges=[edge])
+
+    assert get_cached_output_artifact("cache_key") is None
+
+
+def test_claim_queued_run(test_db):  # noqa: F811
+    root_run = save_run(make_run())
+    # Runs queued within the same clock tick are claimed in the order of their IDs
+    runs = [
+        save_run(
+            make_run(id="{}{}".format(index, uuid.uuid4().hex), root_id=root_run.id)
+        )
+        for index in range(2)
+    ]
+    other_run = save_run(make_run())
+
+    for queued_run in runs:
+        enqueue_run(queued_run.id, root_run.id)
+
+    enqueue_run(other_run.id, other_run.id)
+
+    # Runs are claimed once, in the order they were queued
+    assert claim_queued_run(root_run.id) == runs[0].id
+
+    # Queuing a claimed run again has no effect
+    enqueue_run(runs[0].id, root_run.id)
+
+    assert claim_queued_run(root_run.id) == runs[1].id
+    assert claim_queued_run(root_run.id) is None
+    assert claim_queued_run(other_run.id) == other_run.id
+
+
+def test_claim_queued_run_expired(test_db):  # noqa: F811
+    root_run = save_run(make_run())
+    queued_run = save_run(make_run(root_id=root_run.id))
+    enqueue_run(queued_run.id, root_run.id)
+
+    assert claim_queued_run(root_run.id) == queued_run.id
+    assert renew_queued_run_claim(queued_run.id)
+
+    # The claim was renewed within the lease
+    assert claim_queued_run(root_run.id) is None
+
+    # Runs of expired claims are claimed again
+    assert claim_queued_run(root_run.id, lease_seconds=-1) == queued_run.id
+
+    # Unless they are done executing
+    queued_run.future_state = FutureState.RESOLVED
+    save_run(queued_run)
+
+    assert claim_queued_run(root_run.id, lease_seconds=-1) is None
+
+
+def test_renew_queued_run_claim_unclaimed(test_db):  # noqa: F811
+    root_run = save_run(make_run())
+    queued_run = save_run(make_run(root_id=root_run.id))
+    enqueue_run(queued_run.id, root_run.id)
+
+    assert not renew_queued_run_claim(queued_run.id)
+    assert not renew_queued_run_claim("unknownid")
+
+
+def test_get_completed_queued_run_ids(test_db):  # noqa: F811
+    root_run = save_run(make_run())
+    runs = [
+        save_run(make_run(root_id=root_run.id, future_state=future_state))
+        for future_state in (
+            FutureState.SCHEDULED,
+            FutureState.RAN,
+            FutureState.RESOLVED,
+            FutureState.FAILED,
+        )
+    ]
+
+    for queued_run in runs:
+        enqueue_run(queued_run.id, root_run.id)
+
+    assert set(get_completed_queued_run_ids(root_run.id)) == {
+        queued_run.id for queued_run in runs[1:]
+    }
+
+
 @func
 def add(a: float, b: float) -> float:
     return a + b
@@ -111,6 +321,7 @@ def test_get_run_graph(
     edge_count: int,
     mock_requests,  # noqa: F811
     valid_client_version,  # noqa: F811
+    test_storage,  # noqa: F811
 ):
     future = pipeline(1, 2)
     future.resolve()
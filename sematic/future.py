@@ -50,13 +50,16 @@ class Future(AbstractFuture):
             The future's name. This will be used to name the run in the UI.
         tags: typing.List[str]
             A list of strings tags to attach to the resulting run.
+        cache: bool
+            Whether to reuse the output of a previous resolved run of the same
+            function, with the same source code and input values.
 
         Returns
         -------
         Future
             The current future. This enables chaining.
         """
-        mutable_fields = {"name", "inline", "tags", "resource_requirements"}
+        mutable_fields = {"name", "inline", "tags", "resource_requirements", "cache"}
         invalid_fields = set(kwargs) - mutable_fields
         if len(invalid_fields) > 0:
             raise ValueError("Cannot mutate fields: {}".format(invalid_fields))
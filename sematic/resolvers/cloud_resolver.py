@@ -1,7 +1,9 @@
 # Standard Library
+import collections
 import enum
 import logging
-from typing import Dict, List, Optional
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
 
 # Third-party
 import cloudpickle
@@ -9,21 +11,29 @@ import kubernetes
 
 # Sematic
 import sematic.api_client as api_client
-import sematic.storage as storage
 from sematic.abstract_future import AbstractFuture, FutureState
 from sematic.config import ON_WORKER_ENV_VAR
 from sematic.container_images import CONTAINER_IMAGE_ENV_VAR, get_image_uri
 from sematic.db.models.artifact import Artifact
 from sematic.db.models.edge import Edge
-from sematic.db.models.factories import get_artifact_value
 from sematic.db.models.resolution import ResolutionKind
 from sematic.db.models.run import Run
-from sematic.resolvers.local_resolver import LocalResolver, make_edge_key
+from sematic.resolvers.job_watcher import RUN_IDS_ANNOTATION, JobWatcher
+from sematic.resolvers.lazy_inputs import LazyValue, get_lazy_value
+from sematic.resolvers.local_resolver import LocalResolver
 from sematic.resolvers.resource_requirements import ResourceRequirements
+from sematic.resolvers.run_graph import RunGraph
+from sematic.storage import get_cached_storage
 from sematic.user_settings import SettingsVar, get_all_user_settings, get_user_settings
+from sematic.utils.rate_limit import TokenBucket
+from sematic.utils.retry import retry
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of runs executed by an indexed job, whose run IDs are listed in
+# its annotations and pod arguments.
+_MAX_INDEXED_JOB_SIZE = 1000
+
 
 class CloudResolver(LocalResolver):
     """
@@ -40,10 +50,30 @@ class CloudResolver(LocalResolver):
 
         When `False`, the driver job runs on the local machine. The shell prompt
         will return when the entire pipeline has completed.
+
+    When the `SEMATIC_WORKER_POOL_SIZE` user settings is set, functions with
+    `inline=False` are not executed in a job each, but queued for a pool of that
+    many long-lived worker pods, which keep imported modules and cached artifacts
+    across runs. The pool is restarted if all its pods exit while runs are in
+    flight, and the runs claimed by pods that died are executed again.
+
+    Otherwise, futures of the same function and resource requirements scheduled
+    together, e.g. a fan-out over shards, are executed by a single indexed job,
+    each completion index executing one run.
+
+    Futures are queued until they can be submitted: at most
+    `SEMATIC_MAX_IN_FLIGHT_RUNS` user settings runs execute at once, and at most
+    `max_concurrency` runs of each function declaring it. Requests creating jobs
+    are rate-limited to `KUBERNETES_API_QPS` per second, and retried when
+    throttled.
     """
 
+    # Interval at which the completion of queued runs is polled
+    _poll_interval_seconds: float = 1
+
     def __init__(self, detach: bool = True, is_running_remotely: bool = False):
-        super().__init__(detach=detach)
+        # Workers read and write artifacts in the storage selected by user settings
+        super().__init__(detach=detach, storage=get_cached_storage())
 
         try:
             kubernetes.config.load_kube_config()  # type: ignore
@@ -53,12 +83,21 @@ class CloudResolver(LocalResolver):
             except kubernetes.config.config_exception.ConfigException as e2:  # type: ignore # noqa: E501
                 raise RuntimeError("Unable to find kube config:\n{}\n{}".format(e1, e2))
 
-        # TODO: Replace this with a cloud storage engine
-        self._store_artifacts = True
-
-        self._output_artifacts_by_run_id: Dict[str, Artifact] = {}
         self._is_running_remotely = is_running_remotely
 
+        # Started when the first worker job is scheduled
+        self._job_watcher: Optional[JobWatcher] = None
+
+        # Futures waiting to be submitted, submitted together before waiting
+        self._queued_futures: List[AbstractFuture] = []
+        self._max_in_flight_runs = _get_max_in_flight_runs()
+
+        # Started when the first run is queued, if the worker pool is enabled
+        self._worker_pool_size = _get_worker_pool_size()
+        self._worker_pool_job_name: Optional[str] = None
+        self._worker_pool_restarts_count = 0
+        self._worker_pool_watcher: Optional[JobWatcher] = None
+
     def set_graph(self, runs: List[Run], artifacts: List[Artifact], edges: List[Edge]):
         """
         Set the graph to an existing graph.
@@ -69,9 +108,7 @@ class CloudResolver(LocalResolver):
         if len(self._runs) > 0:
             raise RuntimeError("Cannot override a graph")
 
-        self._runs = {run.id: run for run in runs}
-        self._artifacts = {artifact.id: artifact for artifact in artifacts}
-        self._edges = {make_edge_key(edge): edge for edge in edges}
+        self._graph = RunGraph(runs=runs, artifacts=artifacts, edges=edges)
 
     def _get_resolution_image(self) -> Optional[str]:
         return get_image_uri()
@@ -88,7 +125,7 @@ class CloudResolver(LocalResolver):
 
     def _detach_resolution(self, future: AbstractFuture) -> str:
         run = self._populate_run_and_artifacts(future)
-        self._save_graph()
+        self._close_graph_persister()
         self._create_resolution(future.id, detached=True)
         run.root_id = future.id
 
@@ -101,16 +138,145 @@ class CloudResolver(LocalResolver):
         return run.id
 
     def _schedule_future(self, future: AbstractFuture) -> None:
-        self._set_future_state(future, FutureState.SCHEDULED)
-        job_name = _make_job_name(future, JobType.worker)
-        _schedule_job(
-            future.id,
-            job_name,
-            resolve=False,
-            resource_requirements=future.props.resource_requirements,
+        self._set_future_state(future, FutureState.QUEUED)
+        self._update_run_state(future)
+        self._queued_futures.append(future)
+
+    def _update_run_state(self, future: AbstractFuture) -> None:
+        run = self._get_run(future.id)
+        run.future_state = future.state
+        self._add_run(run)
+
+    def _submit_queued_futures(self) -> None:
+        """
+        Submit the queued futures that fit within the limits of in-flight runs.
+        """
+        futures = self._dequeue_futures()
+
+        if len(futures) == 0:
+            return
+
+        for future in futures:
+            self._set_future_state(future, FutureState.SCHEDULED)
+            self._update_run_state(future)
+
+        # The worker jobs read their run and input edges from the DB
+        self._save_graph(wait=True)
+
+        if self._worker_pool_size > 0:
+            for future in futures:
+                self._queue_future(future)
+
+            return
+
+        # Started before the jobs are scheduled, although listing jobs when the
+        # watcher starts would also catch them.
+        self._start_job_watcher()
+
+        for batch in self._make_batches(futures):
+            if len(batch) == 1:
+                _schedule_job(
+                    batch[0].id,
+                    _make_job_name(batch[0], JobType.worker),
+                    resolve=False,
+                    resource_requirements=batch[0].props.resource_requirements,
+                    root_id=self._root_future.id,
+                )
+            else:
+                _schedule_indexed_job(
+                    [future.id for future in batch],
+                    _make_job_name(batch[0], JobType.worker),
+                    root_id=self._root_future.id,
+                    resource_requirements=batch[0].props.resource_requirements,
+                )
+
+    def _dequeue_futures(self) -> List[AbstractFuture]:
+        """
+        Dequeue futures in order, as long as the number of in-flight runs,
+        overall and of their function, is within limits.
+        """
+        in_flight_futures = self._get_in_flight_futures()
+        in_flight_counts = collections.Counter(
+            self._get_run(future.id).calculator_path for future in in_flight_futures
+        )
+        in_flight_count = len(in_flight_futures)
+
+        dequeued_futures: List[AbstractFuture] = []
+        queued_futures: List[AbstractFuture] = []
+
+        for future in self._queued_futures:
+            calculator_path = self._get_run(future.id).calculator_path
+            max_concurrency = future.props.max_concurrency
+
+            if (
+                self._max_in_flight_runs is not None
+                and in_flight_count >= self._max_in_flight_runs
+            ) or (
+                max_concurrency is not None
+                and in_flight_counts[calculator_path] >= max_concurrency
+            ):
+                queued_futures.append(future)
+                continue
+
+            dequeued_futures.append(future)
+            in_flight_counts[calculator_path] += 1
+            in_flight_count += 1
+
+        if len(queued_futures) > 0:
+            logger.info(
+                "%s runs in flight, %s runs queued",
+                in_flight_count,
+                len(queued_futures),
+            )
+
+        self._queued_futures = queued_futures
+
+        return dequeued_futures
+
+    def _get_in_flight_futures(self) -> List[AbstractFuture]:
+        return [
+            future
+            for future in self._get_futures_by_state(FutureState.SCHEDULED)
+            if not future.props.inline
+        ]
+
+    def _make_batches(
+        self, futures: List[AbstractFuture]
+    ) -> List[List[AbstractFuture]]:
+        """
+        Group futures of the same function and resource requirements, in
+        batches of at most `_MAX_INDEXED_JOB_SIZE`.
+        """
+        batches: List[List[AbstractFuture]] = []
+
+        for future in futures:
+            batch = next(
+                (
+                    batch
+                    for batch in batches
+                    if len(batch) < _MAX_INDEXED_JOB_SIZE
+                    and self._can_batch(batch[0], future)
+                ),
+                None,
+            )
+
+            if batch is None:
+                batches.append([future])
+            else:
+                batch.append(future)
+
+        return batches
+
+    def _can_batch(self, future: AbstractFuture, other: AbstractFuture) -> bool:
+        return (
+            self._get_run(future.id).calculator_path
+            == self._get_run(other.id).calculator_path
+            and future.props.resource_requirements == other.props.resource_requirements
         )
 
     def _wait_for_scheduled_run(self) -> None:
+        self._submit_queued_futures()
+
         run_id = self._wait_for_any_inline_run() or self._wait_for_any_remote_job()
 
         if run_id is None:
@@ -123,7 +289,7 @@ class CloudResolver(LocalResolver):
 
         run = self._get_run(run_id)
 
-        future = next(future for future in self._futures if future.id == run.id)
+        future = self._futures_by_id[run.id]
 
         if run.future_state not in {FutureState.RESOLVED.value, FutureState.RAN.value}:
             self._handle_future_failure(
@@ -131,21 +297,30 @@ class CloudResolver(LocalResolver):
             )
 
         if run.nested_future_id is not None:
-            pickled_nested_future = storage.get(
+            pickled_nested_future = self._storage.get(
                 make_nested_future_storage_key(run.nested_future_id)
             )
             value = cloudpickle.loads(pickled_nested_future)
 
+            self._update_future_with_value(future, value)
+
         else:
             output_edge = self._get_output_edges(run.id)[0]
             output_artifact = self._artifacts[output_edge.artifact_id]
             self._output_artifacts_by_run_id[run.id] = output_artifact
-            value = get_artifact_value(output_artifact)
 
-        self._update_future_with_value(future, value)
+            # The output is passed by reference, downstream remote runs read it
+            # from storage themselves. It was already cast by the worker.
+            future.value = LazyValue(output_artifact, self._storage)
+            self._set_future_state(future, FutureState.RESOLVED)
 
-    def _get_output_artifact(self, run_id: str) -> Optional[Artifact]:
-        return self._output_artifacts_by_run_id.get(run_id)
+    def _run_inline(self, future: AbstractFuture) -> None:
+        # Inline functions need the values of outputs passed by reference
+        future.resolved_kwargs = {
+            name: get_lazy_value(value)
+            for name, value in future.resolved_kwargs.items()
+        }
+        super()._run_inline(future)
 
     def _future_did_fail(self, failed_future: AbstractFuture) -> None:
         # Unlike LocalResolver._future_did_fail, we only care about
@@ -162,52 +337,220 @@ class CloudResolver(LocalResolver):
         runs, artifacts, edges = api_client.get_graph(run_id)
 
         for run in runs:
-            self._runs[run.id] = run
+            self._graph.add_run(run)
 
         for artifact in artifacts:
-            self._artifacts[artifact.id] = artifact
+            self._graph.add_artifact(artifact)
 
         for edge in edges:
-            self._edges[make_edge_key(edge)] = edge
+            self._graph.add_edge(edge)
 
     def _wait_for_any_inline_run(self) -> Optional[str]:
         return next(
             (
                 future.id
-                for future in self._futures
-                if future.props.inline and future.state == FutureState.SCHEDULED
+                for future in self._get_futures_by_state(FutureState.SCHEDULED)
+                if future.props.inline
             ),
             None,
         )
 
     def _wait_for_any_remote_job(self) -> Optional[str]:
-        job_names = [
-            _make_job_name(future, JobType.worker)
-            for future in self._futures
-            if not future.props.inline and future.state == FutureState.SCHEDULED
-        ]
+        run_ids = {future.id for future in self._get_in_flight_futures()}
 
-        if len(job_names) == 0:
+        if len(run_ids) == 0:
             return None
 
+        if self._worker_pool_size > 0:
+            return self._wait_for_any_queued_run(run_ids)
+
+        job_watcher = self._start_job_watcher()
+
         while True:
-            watch = kubernetes.watch.Watch()  # type: ignore
+            run_id = job_watcher.get_completed_run_id()
+
+            if run_id in run_ids:
+                return run_id
+
+            logger.debug("Ignoring completed job of run %s", run_id)
+
+    def _queue_future(self, future: AbstractFuture) -> None:
+        if future.props.resource_requirements is not None:
+            logger.warning(
+                "Resource requirements of %s are ignored by the worker pool",
+                future.calculator,
+            )
+
+        if self._worker_pool_job_name is None:
+            self._start_worker_pool()
+
+        api_client.enqueue_run(self._root_future.id, future.id)
+
+    def _start_worker_pool(self) -> None:
+        job_name = _make_worker_pool_job_name(
+            self._root_future, self._worker_pool_restarts_count
+        )
+
+        _schedule_job(
+            self._root_future.id,
+            job_name,
+            root_id=self._root_future.id,
+            worker_pool_size=self._worker_pool_size,
+        )
+
+        self._worker_pool_job_name = job_name
+        self._start_worker_pool_watcher()
+
+    def _wait_for_any_queued_run(self, run_ids: Set[str]) -> str:
+        while True:
+            completed_run_ids = api_client.get_completed_queued_run_ids(
+                self._root_future.id
+            )
+
+            for run_id in completed_run_ids:
+                if run_id in run_ids:
+                    return run_id
+
+            self._check_worker_pool()
 
-            for event in watch.stream(
-                kubernetes.client.BatchV1Api().list_namespaced_job,  # type: ignore
+            time.sleep(self._poll_interval_seconds)
+
+    def _check_worker_pool(self) -> None:
+        """
+        Restart the worker pool if its job is over, e.g. because one of its pods
+        failed. The claims of the runs its workers were executing expire, and
+        the workers of the new pool execute them again.
+
+        Raises if the pool was restarted `_MAX_WORKER_POOL_RESTARTS` times.
+        """
+        if self._worker_pool_job_name is None:
+            return
+
+        job_state = self._start_worker_pool_watcher().get_job_state(
+            self._worker_pool_job_name
+        )
+
+        # The job may not have been seen by the watcher yet
+        if job_state is None or not job_state.is_terminal():
+            return
+
+        if self._worker_pool_restarts_count >= _MAX_WORKER_POOL_RESTARTS:
+            raise RuntimeError(
+                "Worker pool job {} is {} with runs in flight, after {} restarts".format(
+                    self._worker_pool_job_name,
+                    job_state.value.lower(),
+                    self._worker_pool_restarts_count,
+                )
+            )
+
+        logger.warning(
+            "Worker pool job %s is %s with runs in flight, restarting it",
+            self._worker_pool_job_name,
+            job_state.value.lower(),
+        )
+
+        self._worker_pool_restarts_count += 1
+        self._start_worker_pool()
+
+    def _start_worker_pool_watcher(self) -> JobWatcher:
+        """
+        Start watching the worker pool jobs of the resolution, once.
+        """
+        if self._worker_pool_watcher is None:
+            self._worker_pool_watcher = JobWatcher(
                 namespace=get_user_settings(SettingsVar.KUBERNETES_NAMESPACE),
-                label_selector="job-name in ({0})".format(", ".join(job_names)),
-            ):
-                job = event["object"]
+                label_selector=_make_label_selector(
+                    self._root_future.id, JobType.worker_pool
+                ),
+                # Pools of the resolution are told apart by job name
+                get_run_id=lambda job_name: job_name,
+            )
+            self._worker_pool_watcher.start()
+
+        return self._worker_pool_watcher
 
-                if job.status.succeeded or job.status.failed:
-                    watch.stop()
-                    return _get_run_id_from_name(job.metadata.name)
+    def _start_job_watcher(self) -> JobWatcher:
+        """
+        Start watching the worker jobs of the resolution, once.
+        """
+        if self._job_watcher is None:
+            self._job_watcher = JobWatcher(
+                namespace=get_user_settings(SettingsVar.KUBERNETES_NAMESPACE),
+                label_selector=_make_label_selector(self._root_future.id),
+                get_run_id=_get_run_id_from_name,
+            )
+            self._job_watcher.start()
+
+        return self._job_watcher
+
+    def _stop_job_watcher(self) -> None:
+        if self._job_watcher is not None:
+            self._job_watcher.stop()
+            self._job_watcher = None
+
+        if self._worker_pool_watcher is not None:
+            self._worker_pool_watcher.stop()
+            self._worker_pool_watcher = None
+
+    def _resolution_did_succeed(self) -> None:
+        self._stop_job_watcher()
+        super()._resolution_did_succeed()
+
+    def _resolution_did_fail(self, error: Exception) -> None:
+        self._stop_job_watcher()
+        super()._resolution_did_fail(error)
 
 
 class JobType(enum.Enum):
     driver = "driver"
     worker = "worker"
+    worker_pool = "pool"
+
+
+def _get_worker_pool_size() -> int:
+    return _get_number_setting(SettingsVar.SEMATIC_WORKER_POOL_SIZE, "0", int)
+
+
+def _get_max_in_flight_runs() -> Optional[int]:
+    """
+    None if the number of in-flight runs is not limited.
+    """
+    max_in_flight_runs = _get_number_setting(
+        SettingsVar.SEMATIC_MAX_IN_FLIGHT_RUNS, "0", int
+    )
+
+    return max_in_flight_runs if max_in_flight_runs > 0 else None
+
+
+def _get_number_setting(var: SettingsVar, default: str, type_: Callable[[str], Any]):
+    value = get_user_settings(var, default)
+
+    try:
+        return type_(value)
+    except ValueError:
+        raise ValueError("{} must be a number, got: {}".format(var.value, repr(value)))
+
+
+# Number of times the worker pool is restarted before the resolution fails
+_MAX_WORKER_POOL_RESTARTS = 3
+
+# Rate limiter of requests creating jobs, made on first use
+_kubernetes_api_rate_limiter: Optional[TokenBucket] = None
+
+
+def _get_kubernetes_api_rate_limiter() -> TokenBucket:
+    """
+    Allows `KUBERNETES_API_QPS` requests per second, and bursts of twice as many.
+    """
+    global _kubernetes_api_rate_limiter
+
+    if _kubernetes_api_rate_limiter is None:
+        qps = _get_number_setting(SettingsVar.KUBERNETES_API_QPS, "5", float)
+        _kubernetes_api_rate_limiter = TokenBucket(
+            rate=qps, capacity=max(1, int(2 * qps))
+        )
+
+    return _kubernetes_api_rate_limiter
 
 
 def make_nested_future_storage_key(future_id: str) -> str:
@@ -224,6 +567,38 @@ def _make_job_name(future: AbstractFuture, job_type: JobType) -> str:
     return job_name
 
 
+_JOB_TYPE_LABEL = "sematic.ai/job-type"
+_ROOT_ID_LABEL = "sematic.ai/root-id"
+
+
+def _make_labels(root_id: str, job_type: JobType) -> Dict[str, str]:
+    return {_JOB_TYPE_LABEL: job_type.value, _ROOT_ID_LABEL: root_id}
+
+
+def _make_label_selector(root_id: str, job_type: JobType = JobType.worker) -> str:
+    """
+    Selector of the jobs of a type of a resolution, its worker jobs by default.
+    Unlike selecting jobs by name, its size does not depend on the number of jobs.
+    """
+    return ",".join(
+        "{}={}".format(name, value)
+        for name, value in _make_labels(root_id, job_type).items()
+    )
+
+
+def _make_worker_pool_job_name(future: AbstractFuture, restarts_count: int) -> str:
+    """
+    Make the job name of the worker pool of a resolution. Restarted pools get a
+    new name, which still ends with the ID of the root run.
+    """
+    if restarts_count == 0:
+        return _make_job_name(future, JobType.worker_pool)
+
+    return "-".join(
+        ("sematic", JobType.worker_pool.value, str(restarts_count), future.id)
+    )
+
+
 def _get_run_id_from_name(job_name: str) -> str:
     """
     Extract run ID from K8s job name.
@@ -238,13 +613,80 @@ def _schedule_job(
     name: str,
     resource_requirements: Optional[ResourceRequirements] = None,
     resolve: bool = False,
+    root_id: Optional[str] = None,
+    worker_pool_size: Optional[int] = None,
 ):
+    """
+    Schedule the job of a run. `root_id` is the ID of the resolution's root run,
+    defaults to `run_id`.
+
+    When `worker_pool_size` is set, the job runs that many worker pods executing
+    the queued runs of resolution `run_id` instead.
+    """
     logger.info("Scheduling job %s", name)
     args = ["--run_id", run_id]
 
     if resolve:
         args.append("--resolve")
 
+    job_type = JobType.driver if resolve else JobType.worker
+
+    if worker_pool_size is not None:
+        args.append("--worker_pool")
+        job_type = JobType.worker_pool
+
+    job = _make_job(
+        name,
+        args,
+        labels=_make_labels(root_id or run_id, job_type),
+        resource_requirements=resource_requirements,
+        parallelism=worker_pool_size,
+    )
+
+    _create_job(job)
+
+
+def _schedule_indexed_job(
+    run_ids: List[str],
+    name: str,
+    root_id: str,
+    resource_requirements: Optional[ResourceRequirements] = None,
+):
+    """
+    Schedule a single indexed job executing several runs, the run of each
+    completion index being the one at that index in `run_ids`.
+
+    As for other worker jobs, pods are not retried. When one fails, the job
+    fails and its other pods are terminated.
+    """
+    logger.info("Scheduling indexed job %s of %s runs", name, len(run_ids))
+
+    job = _make_job(
+        name,
+        ["--run_id", ",".join(run_ids), "--indexed"],
+        labels=_make_labels(root_id, JobType.worker),
+        resource_requirements=resource_requirements,
+        annotations={RUN_IDS_ANNOTATION: ",".join(run_ids)},
+        completion_mode="Indexed",
+        completions=len(run_ids),
+        parallelism=len(run_ids),
+    )
+
+    _create_job(job)
+
+
+def _make_job(
+    name: str,
+    args: List[str],
+    labels: Dict[str, str],
+    resource_requirements: Optional[ResourceRequirements] = None,
+    annotations: Optional[Dict[str, str]] = None,
+    **spec_kwargs: Any,
+):
+    """
+    Make the K8s job running the worker image with `args`. `spec_kwargs` are
+    passed to the job's spec.
+    """
     image = get_image_uri()
 
     node_selector = {}
@@ -258,7 +700,11 @@ def _schedule_job(
     job = kubernetes.client.V1Job(  # type: ignore
         api_version="batch/v1",
         kind="Job",
-        metadata=kubernetes.client.V1ObjectMeta(name=name),  # type: ignore
+        metadata=kubernetes.client.V1ObjectMeta(  # type: ignore
+            name=name,
+            labels=labels,
+            annotations=annotations,
+        ),
         spec=kubernetes.client.V1JobSpec(  # type: ignore
             template=kubernetes.client.V1PodTemplateSpec(  # type: ignore
                 spec=kubernetes.client.V1PodSpec(  # type: ignore
@@ -301,9 +747,51 @@ def _schedule_job(
             ),
             backoff_limit=0,
             ttl_seconds_after_finished=3600,
+            **spec_kwargs,
         ),
     )
 
-    kubernetes.client.BatchV1Api().create_namespaced_job(  # type: ignore
-        namespace=get_user_settings(SettingsVar.KUBERNETES_NAMESPACE), body=job
-    )
+    return job
+
+
+class _RetriableApiError(Exception):
+    """
+    Kubernetes API error worth retrying, e.g. throttling.
+    """
+
+    pass
+
+
+# Too Many Requests, and server errors
+_RETRIABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+@retry(
+    exceptions=_RetriableApiError,
+    tries=6,
+    delay=1,
+    max_delay=30,
+    backoff=2,
+    jitter=(0, 1),
+)
+def _create_job(job: Any) -> None:
+    _get_kubernetes_api_rate_limiter().acquire()
+
+    try:
+        kubernetes.client.BatchV1Api().create_namespaced_job(  # type: ignore
+            namespace=get_user_settings(SettingsVar.KUBERNETES_NAMESPACE), body=job
+        )
+    except kubernetes.client.rest.ApiException as e:  # type: ignore
+        if e.status == 409:
+            # Job names are unique, it was created by an attempt that seemed to fail
+            logger.warning("Job %s already exists", job.metadata.name)
+            return
+
+        if e.status in _RETRIABLE_STATUSES:
+            raise _RetriableApiError(
+                "Unable to create job {}: {} {}".format(
+                    job.metadata.name, e.status, e.reason
+                )
+            ) from e
+
+        raise
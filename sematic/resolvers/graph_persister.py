@@ -0,0 +1,232 @@
+"""
+Write-behind persistence of a resolution's graph.
+"""
+# Standard Library
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, cast
+
+# Sematic
+import sematic.api_client as api_client
+from sematic.db.models.artifact import Artifact
+from sematic.db.models.edge import Edge
+from sematic.db.models.run import Run
+from sematic.resolvers.run_graph import make_edge_key
+
+logger = logging.getLogger(__name__)
+
+
+_EncodedObjects = Dict[str, Dict[str, Any]]
+
+
+class GraphPersister:
+    """
+    Saves runs, artifacts and edges from a background thread.
+
+    Saved objects are JSON-encoded right away, so that callers can keep mutating
+    them, and coalesced with the objects still pending: only the latest version
+    of each run, artifact and edge is sent.
+
+    Pending objects are sent in a single batch once `flush_interval_seconds` have
+    elapsed since the previous batch, or as soon as `flush_size` objects are
+    pending. Batches are sent one at a time, in order.
+
+    Errors raised while sending a batch are raised by the next call to `save` or
+    `flush`.
+
+    Parameters
+    ----------
+    flush_interval_seconds: float
+        Defaults to `1`. Minimum time between two batches.
+    flush_size: int
+        Defaults to `1000`. Number of pending objects above which they are sent
+        without waiting for `flush_interval_seconds`.
+    """
+
+    def __init__(self, flush_interval_seconds: float = 1, flush_size: int = 1000):
+        if flush_interval_seconds < 0:
+            raise ValueError(
+                "flush_interval_seconds must be positive, got: {}".format(
+                    repr(flush_interval_seconds)
+                )
+            )
+
+        if flush_size < 1:
+            raise ValueError(
+                "flush_size must be a positive integer, got: {}".format(
+                    repr(flush_size)
+                )
+            )
+
+        self._flush_interval_seconds = flush_interval_seconds
+        self._flush_size = flush_size
+
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+        # All of the following are guarded by _condition
+        self._root_id: Optional[str] = None
+        self._runs: _EncodedObjects = {}
+        self._artifacts: _EncodedObjects = {}
+        self._edges: _EncodedObjects = {}
+        self._is_sending = False
+        self._is_flush_requested = False
+        self._is_closing = False
+        self._last_sent_at: Optional[float] = None
+        self._error: Optional[Exception] = None
+
+        # Number of batches sent, to measure coalescing
+        self.sent_batches_count = 0
+
+    def save(
+        self,
+        root_id: str,
+        runs: Iterable[Run],
+        artifacts: Iterable[Artifact],
+        edges: Iterable[Edge],
+    ) -> None:
+        """
+        Queue runs, artifacts and edges to be saved.
+        """
+        encoded_runs = {run.id: run.to_json_encodable() for run in runs}
+        encoded_artifacts = {
+            artifact.id: artifact.to_json_encodable() for artifact in artifacts
+        }
+        encoded_edges = {
+            make_edge_key(edge): edge.to_json_encodable() for edge in edges
+        }
+
+        with self._condition:
+            self._raise_error()
+
+            self._root_id = root_id
+            self._runs.update(encoded_runs)
+            self._artifacts.update(encoded_artifacts)
+            self._edges.update(encoded_edges)
+
+            self._start()
+            self._condition.notify_all()
+
+    def flush(self) -> None:
+        """
+        Send all pending objects and wait until they are saved.
+        """
+        with self._condition:
+            self._is_flush_requested = True
+            self._condition.notify_all()
+
+            while self._error is None and (
+                self._is_sending or self._get_pending_count() > 0
+            ):
+                self._condition.wait()
+
+            self._is_flush_requested = False
+            self._raise_error()
+
+    def close(self) -> None:
+        """
+        Flush pending objects and stop the background thread.
+        """
+        try:
+            self.flush()
+        finally:
+            with self._condition:
+                self._is_closing = True
+                self._condition.notify_all()
+
+            if self._thread is not None:
+                self._thread.join()
+                self._thread = None
+
+            self._is_closing = False
+
+    def _start(self) -> None:
+        if self._thread is not None:
+            return
+
+        # Daemon so that an unclosed persister does not prevent the interpreter
+        # from exiting.
+        self._thread = threading.Thread(
+            target=self._send_batches, name="sematic-graph-persister", daemon=True
+        )
+        self._thread.start()
+
+    def _get_pending_count(self) -> int:
+        return len(self._runs) + len(self._artifacts) + len(self._edges)
+
+    def _get_seconds_until_due(self) -> Optional[float]:
+        """
+        Seconds until pending objects should be sent. `None` if there are no
+        pending objects.
+        """
+        pending_count = self._get_pending_count()
+
+        if pending_count == 0:
+            return None
+
+        if (
+            self._is_flush_requested
+            or self._is_closing
+            or pending_count >= self._flush_size
+            or self._last_sent_at is None
+        ):
+            return 0
+
+        return max(
+            0, self._last_sent_at + self._flush_interval_seconds - time.monotonic()
+        )
+
+    def _send_batches(self) -> None:
+        while True:
+            with self._condition:
+                seconds_until_due = self._get_seconds_until_due()
+
+                while seconds_until_due is None or seconds_until_due > 0:
+                    if seconds_until_due is None and self._is_closing:
+                        return
+
+                    self._condition.wait(seconds_until_due)
+                    seconds_until_due = self._get_seconds_until_due()
+
+                root_id = self._root_id
+                runs, artifacts, edges = self._runs, self._artifacts, self._edges
+                self._runs, self._artifacts, self._edges = {}, {}, {}
+                self._is_sending = True
+
+            error: Optional[Exception] = None
+
+            try:
+                logger.debug(
+                    "Sending %s runs, %s artifacts, %s edges",
+                    len(runs),
+                    len(artifacts),
+                    len(edges),
+                )
+                api_client.save_encoded_graph(
+                    root_id=cast(str, root_id),
+                    runs=list(runs.values()),
+                    artifacts=list(artifacts.values()),
+                    edges=list(edges.values()),
+                )
+            except Exception as exception:
+                logger.exception("Unable to save graph")
+                error = exception
+
+            with self._condition:
+                self._is_sending = False
+                self._last_sent_at = time.monotonic()
+                self.sent_batches_count += 1
+
+                if error is not None and self._error is None:
+                    self._error = error
+
+                self._condition.notify_all()
+
+    def _raise_error(self) -> None:
+        if self._error is None:
+            return
+
+        error, self._error = self._error, None
+
+        raise error
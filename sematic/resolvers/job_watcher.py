@@ -0,0 +1,280 @@
+"""
+Long-lived watch of Kubernetes jobs.
+"""
+# Standard Library
+import enum
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set
+
+# Third-party
+import kubernetes
+
+logger = logging.getLogger(__name__)
+
+# Annotation of indexed jobs listing the ID of the run of each completion index
+RUN_IDS_ANNOTATION = "sematic.ai/run-ids"
+
+
+class JobState(enum.Enum):
+    ACTIVE = "ACTIVE"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+    def is_terminal(self) -> bool:
+        return self != JobState.ACTIVE
+
+
+class JobWatcher:
+    """
+    Watches the jobs matching a label selector from a background thread, in the
+    manner of Kubernetes informers.
+
+    Jobs are listed once, then watched from the `resourceVersion` of the list
+    or of the last event received, so that no event is missed between watches.
+    Jobs are listed again if that version has expired. The state of each job
+    is cached, by the run ID extracted from its name, and each job reaching a
+    terminal state is delivered once by `get_completed_run_id`.
+
+    Indexed jobs, annotated with `RUN_IDS_ANNOTATION`, execute one run per
+    completion index. The state of each of their runs is tracked separately.
+
+    Parameters
+    ----------
+    namespace: str
+        Namespace of the jobs.
+    label_selector: str
+        Selector of the jobs to watch.
+    get_run_id: Callable[[str], str]
+        Extracts the run ID from a job name.
+    batch_api: Optional[Any]
+        Defaults to a `kubernetes.client.BatchV1Api`. Client of the Kubernetes
+        batch API.
+    make_watch: Optional[Callable[[], Any]]
+        Defaults to `kubernetes.watch.Watch`. Factory of watches.
+    timeout_seconds: int
+        Defaults to `300`. Duration of each watch request, after which the
+        watch is resumed.
+    retry_delay_seconds: float
+        Defaults to `1`. Delay before watching again after an error.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        label_selector: str,
+        get_run_id: Callable[[str], str],
+        batch_api: Optional[Any] = None,
+        make_watch: Optional[Callable[[], Any]] = None,
+        timeout_seconds: int = 300,
+        retry_delay_seconds: float = 1,
+    ):
+        self._namespace = namespace
+        self._label_selector = label_selector
+        self._get_run_id = get_run_id
+        self._batch_api = batch_api
+        self._make_watch = make_watch or kubernetes.watch.Watch  # type: ignore
+        self._timeout_seconds = timeout_seconds
+        self._retry_delay_seconds = retry_delay_seconds
+
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._completed_run_ids: "queue.Queue[str]" = queue.Queue()
+
+        # All of the following are guarded by _lock
+        self._lock = threading.Lock()
+        self._job_states: Dict[str, JobState] = {}
+        self._delivered_run_ids: Set[str] = set()
+        self._watch: Optional[Any] = None
+
+        # Version the watch resumes from, None if jobs need to be listed
+        self.resource_version: Optional[str] = None
+        # Number of times jobs were listed, to measure relists
+        self.lists_count = 0
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        if self._batch_api is None:
+            self._batch_api = kubernetes.client.BatchV1Api()  # type: ignore
+
+        # Daemon since an ongoing watch request cannot be interrupted
+        self._thread = threading.Thread(
+            target=self._run, name="sematic-job-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop watching. Does not wait for the ongoing watch request to end.
+        """
+        self._stopped.set()
+
+        with self._lock:
+            if self._watch is not None:
+                self._watch.stop()
+
+    def get_job_state(self, run_id: str) -> Optional[JobState]:
+        """
+        Last known state of the job, or job index, of a run. None if it was
+        never seen.
+        """
+        with self._lock:
+            return self._job_states.get(run_id)
+
+    def get_completed_run_id(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Wait for a job to reach a terminal state, and return its run ID. Returns
+        None if no job did within `timeout` seconds.
+        """
+        try:
+            return self._completed_run_ids.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                if self.resource_version is None:
+                    self._list()
+
+                self._watch_events()
+            except kubernetes.client.rest.ApiException as e:  # type: ignore
+                if e.status == 410:
+                    logger.info("Job watch expired, listing jobs again")
+                    self.resource_version = None
+                    continue
+
+                self._handle_error()
+            except Exception:
+                self._handle_error()
+
+    def _handle_error(self) -> None:
+        logger.warning("Error watching jobs, retrying", exc_info=True)
+        self._stopped.wait(self._retry_delay_seconds)
+
+    def _list(self) -> None:
+        assert self._batch_api is not None
+        job_list = self._batch_api.list_namespaced_job(
+            namespace=self._namespace, label_selector=self._label_selector
+        )
+        self.lists_count += 1
+
+        for job in job_list.items:
+            self._update(job)
+
+        self.resource_version = job_list.metadata.resource_version
+
+    def _watch_events(self) -> None:
+        watch = self._make_watch()
+
+        with self._lock:
+            if self._stopped.is_set():
+                return
+
+            self._watch = watch
+
+        try:
+            for event in watch.stream(
+                self._batch_api.list_namespaced_job,  # type: ignore
+                namespace=self._namespace,
+                label_selector=self._label_selector,
+                resource_version=self.resource_version,
+                timeout_seconds=self._timeout_seconds,
+                allow_watch_bookmarks=True,
+            ):
+                self._handle_event(event)
+        finally:
+            with self._lock:
+                self._watch = None
+
+    def _handle_event(self, event: Dict[str, Any]) -> None:
+        if event["type"] == "ERROR":
+            raw_object = event.get("raw_object") or {}
+            raise kubernetes.client.rest.ApiException(  # type: ignore
+                status=raw_object.get("code"), reason=raw_object.get("message")
+            )
+
+        job = event["object"]
+
+        if event["type"] != "BOOKMARK":
+            self._update(job)
+
+        self.resource_version = job.metadata.resource_version
+
+    def _update(self, job: Any) -> None:
+        completed_run_ids: List[str] = []
+
+        with self._lock:
+            for run_id, state in _get_run_states(job, self._get_run_id).items():
+                self._job_states[run_id] = state
+
+                if not state.is_terminal() or run_id in self._delivered_run_ids:
+                    continue
+
+                self._delivered_run_ids.add(run_id)
+                completed_run_ids.append(run_id)
+
+        for run_id in completed_run_ids:
+            self._completed_run_ids.put(run_id)
+
+
+def _get_run_states(job: Any, get_run_id: Callable[[str], str]) -> Dict[str, JobState]:
+    annotations = job.metadata.annotations or {}
+
+    if RUN_IDS_ANNOTATION not in annotations:
+        return {get_run_id(job.metadata.name): _get_job_state(job)}
+
+    run_ids = annotations[RUN_IDS_ANNOTATION].split(",")
+
+    completed_indexes: Set[int] = set()
+    is_failed = False
+
+    if job.status is not None:
+        completed_indexes = _parse_indexes(job.status.completed_indexes)
+        # Indexed jobs have no retries, the other indexes are terminated when
+        # one fails.
+        is_failed = bool(job.status.failed)
+
+    run_states = {}
+
+    for index, run_id in enumerate(run_ids):
+        if index in completed_indexes:
+            run_states[run_id] = JobState.SUCCEEDED
+        elif is_failed:
+            run_states[run_id] = JobState.FAILED
+        else:
+            run_states[run_id] = JobState.ACTIVE
+
+    return run_states
+
+
+def _parse_indexes(indexes: Optional[str]) -> Set[int]:
+    """
+    Parse the completed indexes of an indexed job, e.g. `"1,3-5"`.
+    """
+    parsed_indexes: Set[int] = set()
+
+    if not indexes:
+        return parsed_indexes
+
+    for interval in indexes.split(","):
+        first, _, last = interval.partition("-")
+        parsed_indexes.update(range(int(first), int(last or first) + 1))
+
+    return parsed_indexes
+
+
+def _get_job_state(job: Any) -> JobState:
+    if job.status is None:
+        return JobState.ACTIVE
+
+    if job.status.succeeded:
+        return JobState.SUCCEEDED
+
+    if job.status.failed:
+        return JobState.FAILED
+
+    return JobState.ACTIVE
@@ -0,0 +1,346 @@
+"""
+Lazy input values of functions executed in workers.
+
+Functions decorated with `@sematic.func(lazy_inputs=True)` receive their inputs as
+`LazyValue` proxies, which get the artifact's value on first access. Meanwhile,
+artifacts are prefetched in the background, in the order of the inputs.
+
+The cloud resolver also passes the outputs of remote runs by reference, as lazy
+values, so that its driver does not read them unless they are needed.
+"""
+# Standard Library
+import concurrent.futures
+import contextlib
+import copy
+import dataclasses
+import json
+import logging
+import operator
+import os
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# Sematic
+from sematic.db.models.artifact import Artifact
+from sematic.db.models.factories import (
+    get_artifact_value,
+    make_artifact,
+    prefetch_artifact_value,
+)
+from sematic.storage import StorageBackend
+from sematic.types.serialization import type_to_json_encodable
+
+logger = logging.getLogger(__name__)
+
+
+class LazyValue:
+    """
+    Transparent proxy of an artifact's value, which gets the value on first
+    access.
+
+    Attributes, operators and `isinstance` are forwarded to the value. Use
+    `get_lazy_value` to get the value itself, e.g. to pass it to code checking
+    exact types.
+    """
+
+    __slots__ = (
+        "_sematic_artifact",
+        "_sematic_storage_backend",
+        "_sematic_prefetch",
+        "_sematic_lock",
+        "_sematic_value",
+        "_sematic_is_loaded",
+    )
+
+    def __init__(
+        self,
+        artifact: Artifact,
+        storage_backend: Optional[StorageBackend] = None,
+        prefetch: Optional[concurrent.futures.Future] = None,
+    ):
+        object.__setattr__(self, "_sematic_artifact", artifact)
+        object.__setattr__(self, "_sematic_storage_backend", storage_backend)
+        object.__setattr__(self, "_sematic_prefetch", prefetch)
+        object.__setattr__(self, "_sematic_lock", threading.Lock())
+        object.__setattr__(self, "_sematic_value", None)
+        object.__setattr__(self, "_sematic_is_loaded", False)
+
+    @property  # type: ignore
+    def __class__(self):
+        return type(get_lazy_value(self))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_lazy_value(self), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(get_lazy_value(self), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(get_lazy_value(self), name)
+
+    def __dir__(self):
+        return dir(get_lazy_value(self))
+
+    def __repr__(self) -> str:
+        return repr(get_lazy_value(self))
+
+    def __reduce_ex__(self, protocol: Any) -> Any:
+        # Pickled and copied as the value
+        return get_lazy_value(self).__reduce_ex__(protocol)
+
+
+def _make_method(function: Callable[..., Any]) -> Callable[..., Any]:
+    def method(self, *args, **kwargs):
+        return function(get_lazy_value(self), *args, **kwargs)
+
+    return method
+
+
+def _make_reflected_method(function: Callable[[Any, Any], Any]) -> Callable[..., Any]:
+    def method(self, other):
+        return function(other, get_lazy_value(self))
+
+    return method
+
+
+_METHODS: Dict[str, Callable[..., Any]] = {
+    "__str__": str,
+    "__bytes__": bytes,
+    "__format__": format,
+    "__hash__": hash,
+    "__bool__": bool,
+    "__len__": len,
+    "__iter__": iter,
+    "__reversed__": reversed,
+    "__contains__": lambda value, item: item in value,
+    "__getitem__": operator.getitem,
+    "__setitem__": operator.setitem,
+    "__delitem__": operator.delitem,
+    "__call__": lambda value, *args, **kwargs: value(*args, **kwargs),
+    "__enter__": lambda value: value.__enter__(),
+    "__exit__": lambda value, *args: value.__exit__(*args),
+    "__fspath__": os.fspath,
+    "__int__": int,
+    "__float__": float,
+    "__complex__": complex,
+    "__index__": operator.index,
+    "__round__": round,
+    "__neg__": operator.neg,
+    "__pos__": operator.pos,
+    "__abs__": operator.abs,
+    "__invert__": operator.invert,
+    "__eq__": operator.eq,
+    "__ne__": operator.ne,
+    "__lt__": operator.lt,
+    "__le__": operator.le,
+    "__gt__": operator.gt,
+    "__ge__": operator.ge,
+}
+
+_BINARY_OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    "add": operator.add,
+    "sub": operator.sub,
+    "mul": operator.mul,
+    "matmul": operator.matmul,
+    "truediv": operator.truediv,
+    "floordiv": operator.floordiv,
+    "mod": operator.mod,
+    "divmod": divmod,
+    "pow": operator.pow,
+    "lshift": operator.lshift,
+    "rshift": operator.rshift,
+    "and": operator.and_,
+    "xor": operator.xor,
+    "or": operator.or_,
+}
+
+for _name, _function in _METHODS.items():
+    setattr(LazyValue, _name, _make_method(_function))
+
+for _name, _function in _BINARY_OPERATORS.items():
+    setattr(LazyValue, "__{}__".format(_name), _make_method(_function))
+    setattr(LazyValue, "__r{}__".format(_name), _make_reflected_method(_function))
+
+
+def get_lazy_value(value: Any) -> Any:
+    """
+    Get the value of a `LazyValue`, getting it from storage on first call. Other
+    values are returned as-is.
+    """
+    if type(value) is not LazyValue:
+        return value
+
+    with object.__getattribute__(value, "_sematic_lock"):
+        if not object.__getattribute__(value, "_sematic_is_loaded"):
+            prefetch = object.__getattribute__(value, "_sematic_prefetch")
+
+            # Wait for an ongoing prefetch, errors are raised when getting the
+            # value.
+            if prefetch is not None and not prefetch.cancel():
+                concurrent.futures.wait([prefetch])
+
+            object.__setattr__(
+                value,
+                "_sematic_value",
+                get_artifact_value(
+                    object.__getattribute__(value, "_sematic_artifact"),
+                    object.__getattribute__(value, "_sematic_storage_backend"),
+                ),
+            )
+            object.__setattr__(value, "_sematic_is_loaded", True)
+
+        return object.__getattribute__(value, "_sematic_value")
+
+
+def get_lazy_artifact(value: Any) -> Optional[Artifact]:
+    """
+    Get the artifact of a `LazyValue`, without getting its value. `None` for other
+    values.
+    """
+    if type(value) is not LazyValue:
+        return None
+
+    return object.__getattribute__(value, "_sematic_artifact")
+
+
+def is_lazy_value_of_type(value: Any, type_: Any) -> bool:
+    """
+    Whether a value is a `LazyValue` whose artifact has type `type_`, without
+    getting its value.
+    """
+    artifact = get_lazy_artifact(value)
+
+    return artifact is not None and _is_artifact_of_type(artifact, type_)
+
+
+def _is_artifact_of_type(artifact: Artifact, type_: Any) -> bool:
+    return json.loads(artifact.type_serialization) == json.loads(
+        json.dumps(type_to_json_encodable(type_))
+    )
+
+
+def make_artifact_by_reference(
+    value: Any,
+    type_: Any,
+    store: bool = False,
+    storage_backend: Optional[StorageBackend] = None,
+) -> Artifact:
+    """
+    Make the artifact of a value, like `make_artifact`.
+
+    The artifact of a `LazyValue` is reused without reading the value, if it has
+    the same type. Lazy values nested in lists, tuples, dicts and dataclasses are
+    read.
+    """
+    artifact = get_lazy_artifact(value)
+
+    if artifact is not None and _is_artifact_of_type(artifact, type_):
+        return artifact
+
+    return make_artifact(
+        _get_nested_lazy_values(value),
+        type_,
+        store=store,
+        storage_backend=storage_backend,
+    )
+
+
+def _get_nested_lazy_values(value: Any) -> Any:
+    """
+    Replace lazy values with their value, in containers that serializers
+    traverse. Containers are only copied if they hold lazy values.
+    """
+    value = get_lazy_value(value)
+
+    if type(value) in (list, tuple):
+        items = [_get_nested_lazy_values(item) for item in value]
+
+        if all(item is original for item, original in zip(items, value)):
+            return value
+
+        return type(value)(items)
+
+    # Named tuples
+    if isinstance(value, tuple) and hasattr(value, "_fields"):
+        items = [_get_nested_lazy_values(item) for item in value]
+
+        if all(item is original for item, original in zip(items, value)):
+            return value
+
+        return type(value)(*items)
+
+    if type(value) is dict:
+        items_dict = {key: _get_nested_lazy_values(item) for key, item in value.items()}
+
+        if all(items_dict[key] is item for key, item in value.items()):
+            return value
+
+        return items_dict
+
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        fields = {
+            field.name: _get_nested_lazy_values(getattr(value, field.name))
+            for field in dataclasses.fields(value)
+        }
+
+        if all(fields[name] is getattr(value, name) for name in fields):
+            return value
+
+        copied_value = copy.copy(value)
+
+        # Supports frozen dataclasses
+        for name, field_value in fields.items():
+            object.__setattr__(copied_value, name, field_value)
+
+        return copied_value
+
+    return value
+
+
+@contextlib.contextmanager
+def make_lazy_values(
+    artifacts: Dict[str, Artifact],
+    storage_backend: Optional[StorageBackend] = None,
+    max_concurrency: int = 4,
+) -> Iterator[Dict[str, LazyValue]]:
+    """
+    Make lazy values of artifacts, prefetched in the background
+    `max_concurrency` at a time while in the context. Prefetches still pending
+    when the context exits are cancelled.
+    """
+    if max_concurrency < 1:
+        raise ValueError(
+            "max_concurrency must be a positive integer, got: {}".format(
+                repr(max_concurrency)
+            )
+        )
+
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_concurrency, thread_name_prefix="sematic-prefetch"
+    )
+
+    values: Dict[str, LazyValue] = {}
+
+    try:
+        values = {
+            name: LazyValue(
+                artifact,
+                storage_backend,
+                executor.submit(_prefetch, artifact, storage_backend),
+            )
+            for name, artifact in artifacts.items()
+        }
+
+        yield values
+    finally:
+        for value in values.values():
+            object.__getattribute__(value, "_sematic_prefetch").cancel()
+
+        executor.shutdown(wait=False)
+
+
+def _prefetch(artifact: Artifact, storage_backend: Optional[StorageBackend]) -> None:
+    try:
+        prefetch_artifact_value(artifact, storage_backend)
+    except Exception:
+        logger.warning("Unable to prefetch artifact %s", artifact.id, exc_info=True)
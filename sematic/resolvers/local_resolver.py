@@ -2,7 +2,7 @@
 import datetime
 import logging
 import uuid
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 # Sematic
 import sematic.api_client as api_client
@@ -11,10 +11,18 @@ from sematic.abstract_future import AbstractFuture, FutureState
 from sematic.config import get_config  # noqa: F401
 from sematic.db.models.artifact import Artifact
 from sematic.db.models.edge import Edge
-from sematic.db.models.factories import make_artifact, make_run_from_future
+from sematic.db.models.factories import (
+    get_artifact_value,
+    make_cache_key,
+    make_run_from_future,
+)
 from sematic.db.models.resolution import Resolution, ResolutionKind, ResolutionStatus
 from sematic.db.models.run import Run
+from sematic.resolvers.graph_persister import GraphPersister
+from sematic.resolvers.lazy_inputs import make_artifact_by_reference
+from sematic.resolvers.run_graph import RunGraph
 from sematic.resolvers.silent_resolver import SilentResolver
+from sematic.storage import StorageBackend, get_storage
 from sematic.user_settings import get_all_user_settings
 from sematic.utils.exceptions import format_exception_for_run
 
@@ -27,21 +35,71 @@ class LocalResolver(SilentResolver):
 
     Each Future's resolution is tracked in the DB as a run. Each individual function's
     input argument and output value is tracked as an artifact.
+
+    Parameters
+    ----------
+    max_parallelism: Optional[int]
+        Defaults to `None`. When set, functions with `inline=False` are executed
+        in a pool of at most `max_parallelism` workers. See `SilentResolver`.
+    executor: str
+        Defaults to `"thread"`. Either `"thread"` or `"process"`. The kind of
+        pool used when `max_parallelism` is set.
+    graph_flush_interval_seconds: float
+        Defaults to `1`. The graph is saved in the background, in batches sent at
+        most once every `graph_flush_interval_seconds`. It is always entirely
+        saved before the resolution completes or fails.
+    graph_flush_size: int
+        Defaults to `1000`. Number of pending runs, artifacts and edges above
+        which they are sent without waiting for `graph_flush_interval_seconds`.
+    storage: Optional[StorageBackend]
+        Defaults to `None`. Where artifact values are stored. When `None`, the
+        backend selected by the `SEMATIC_STORAGE` user settings is used, or a
+        `LocalStorage` in the Sematic config directory if it is not set.
     """
 
-    def __init__(self, **kwargs):
+    def __init__(
+        self,
+        graph_flush_interval_seconds: float = 1,
+        graph_flush_size: int = 1000,
+        storage: Optional[StorageBackend] = None,
+        **kwargs,
+    ):
         super().__init__(**kwargs)
-        self._edges: Dict[str, Edge] = {}
-        self._runs: Dict[str, Run] = {}
-        self._artifacts: Dict[str, Artifact] = {}
+        self._graph = RunGraph()
+        # IDs of futures whose run and edges were created
+        self._populated_future_ids: Set[str] = set()
 
         # Buffers for persistency
         self._buffer_edges: Dict[str, Edge] = {}
         self._buffer_runs: Dict[str, Run] = {}
         self._buffer_artifacts: Dict[str, Artifact] = {}
 
-        # TODO: Replace this with a local storage engine
-        self._store_artifacts = False
+        self._graph_persister = GraphPersister(
+            flush_interval_seconds=graph_flush_interval_seconds,
+            flush_size=graph_flush_size,
+        )
+
+        # Number of runs and edges added to the persistence buffers, to measure
+        # the cost of graph updates across state transitions.
+        self._touched_runs_count = 0
+        self._touched_edges_count = 0
+
+        self._output_artifacts_by_run_id: Dict[str, Artifact] = {}
+
+        self._storage = storage if storage is not None else get_storage("local")
+        self._store_artifacts = True
+
+    @property
+    def _runs(self) -> Dict[str, Run]:
+        return self._graph.runs
+
+    @property
+    def _artifacts(self) -> Dict[str, Artifact]:
+        return self._graph.artifacts
+
+    @property
+    def _edges(self) -> Dict[str, Edge]:
+        return self._graph.edges
 
     def _update_edge(
         self,
@@ -53,47 +111,58 @@ class LocalResolver(SilentResolver):
     ):
         """
         Creates or updates an edge in the graph.
+
+        Existing edges are only added to the persistence buffers if their artifact
+        id changes.
         """
-        edge = Edge(
-            id=uuid.uuid4().hex,
-            created_at=datetime.datetime.utcnow(),
-            updated_at=datetime.datetime.utcnow(),
+        edge = self._graph.get_edge(
             source_run_id=source_run_id,
             destination_run_id=destination_run_id,
             destination_name=destination_name,
-            artifact_id=artifact_id,
             parent_id=parent_id,
         )
 
-        edge_key = make_edge_key(edge)
+        if edge is not None:
+            if artifact_id is not None:
+                self._set_edge_artifact(edge, artifact_id)
+            return
+
+        self._add_edge(
+            Edge(
+                id=uuid.uuid4().hex,
+                created_at=datetime.datetime.utcnow(),
+                updated_at=datetime.datetime.utcnow(),
+                source_run_id=source_run_id,
+                destination_run_id=destination_run_id,
+                destination_name=destination_name,
+                artifact_id=artifact_id,
+                parent_id=parent_id,
+            )
+        )
 
-        edge = self._edges.get(edge_key, edge)
-        if edge.artifact_id is None and artifact_id is not None:
-            edge.artifact_id = artifact_id
+    def _set_edge_artifact(self, edge: Edge, artifact_id: str) -> None:
+        """
+        Set the artifact id of an edge that does not have one yet.
+        """
+        if edge.artifact_id is not None:
+            return
 
+        edge.artifact_id = artifact_id
+        edge.updated_at = datetime.datetime.utcnow()
         self._add_edge(edge)
 
     def _get_input_edge(self, destination_run_id, destination_name) -> Optional[Edge]:
         """
         Find an input edge.
         """
-        for edge in self._edges.values():
-            if (
-                edge.destination_run_id == destination_run_id
-                and edge.destination_name == destination_name
-            ):
-                return edge
-
-        return None
+        return self._graph.get_input_edge(destination_run_id, destination_name)
 
     def _get_output_edges(self, source_run_id: str) -> List[Edge]:
         """
         Find output edges.
         There can be multiple ones if the output goes to multiple futures.
         """
-        return [
-            edge for edge in self._edges.values() if edge.source_run_id == source_run_id
-        ]
+        return self._graph.get_output_edges(source_run_id)
 
     def _populate_run_and_artifacts(self, future: AbstractFuture) -> Run:
         if len(future.kwargs) != len(future.resolved_kwargs):
@@ -101,19 +170,33 @@ class LocalResolver(SilentResolver):
 
         input_artifacts = {}
         for name, value in future.resolved_kwargs.items():
-            artifact = make_artifact(
-                value, future.calculator.input_types[name], store=self._store_artifacts
+            # Outputs of remote runs are passed by reference, see CloudResolver
+            artifact = make_artifact_by_reference(
+                value,
+                future.calculator.input_types[name],
+                store=self._store_artifacts,
+                storage_backend=self._storage,
             )
             self._add_artifact(artifact)
             input_artifacts[name] = artifact
 
         run = self._populate_graph(future, input_artifacts=input_artifacts)
 
+        if future.props.cache:
+            run.cache_key = make_cache_key(
+                calculator_path=run.calculator_path,
+                source_code=run.source_code,
+                input_artifact_ids={
+                    name: artifact.id for name, artifact in input_artifacts.items()
+                },
+            )
+
         return run
 
     def _resolution_will_start(self):
         self._populate_run_and_artifacts(self._root_future)
-        self._save_graph()
+        # The resolution references the root run
+        self._save_graph(wait=True)
         self._create_resolution(self._root_future.id, detached=False)
         self._update_resolution_status(ResolutionStatus.RUNNING)
 
@@ -171,8 +254,38 @@ class LocalResolver(SilentResolver):
         self._add_run(run)
         self._save_graph()
 
+    def _resolve_from_cache(self, future: AbstractFuture) -> bool:
+        if not future.props.cache:
+            return False
+
+        run = self._get_run(future.id)
+
+        if run.cache_key is None:
+            return False
+
+        output_artifact = api_client.get_cached_output_artifact(run.cache_key)
+
+        if output_artifact is None:
+            return False
+
+        try:
+            value = get_artifact_value(output_artifact, self._storage)
+        except KeyError:
+            logger.warning(
+                "Value of cached artifact %s not found in storage", output_artifact.id
+            )
+            return False
+
+        self._add_artifact(output_artifact)
+        self._output_artifacts_by_run_id[future.id] = output_artifact
+
+        self._set_future_state(future, FutureState.SCHEDULED)
+        self._update_future_with_value(future, value)
+
+        return True
+
     def _get_output_artifact(self, run_id: str) -> Optional[Artifact]:
-        return None
+        return self._output_artifacts_by_run_id.get(run_id)
 
     def _future_did_resolve(self, future: AbstractFuture) -> None:
         super()._future_did_resolve(future)
@@ -183,7 +296,13 @@ class LocalResolver(SilentResolver):
 
         output_artifact = self._get_output_artifact(future.id)
         if output_artifact is None:
-            output_artifact = make_artifact(future.value, future.calculator.output_type)
+            # Cached outputs need to be persisted to be reused
+            output_artifact = make_artifact_by_reference(
+                future.value,
+                future.calculator.output_type,
+                store=self._store_artifacts or future.props.cache,
+                storage_backend=self._storage,
+            )
             self._add_artifact(output_artifact)
 
         self._populate_graph(future, output_artifact=output_artifact)
@@ -211,6 +330,7 @@ class LocalResolver(SilentResolver):
 
     def _resolution_did_succeed(self) -> None:
         super()._resolution_did_succeed()
+        self._close_graph_persister()
         self._update_resolution_status(ResolutionStatus.COMPLETE)
         self._notify_pipeline_update()
 
@@ -226,7 +346,16 @@ class LocalResolver(SilentResolver):
             resolution_status = ResolutionStatus.FAILED
 
         self._move_runs_to_terminal_state(reason)
-        self._update_resolution_status(resolution_status)
+
+        try:
+            self._close_graph_persister()
+        except Exception:
+            # e.g. the error that failed the resolution, the resolution status
+            # still needs to be updated.
+            logger.exception("Unable to save the graph of the failed resolution")
+        finally:
+            self._update_resolution_status(resolution_status)
+
         self._notify_pipeline_update()
 
     def _move_runs_to_terminal_state(self, reason):
@@ -237,7 +366,6 @@ class LocalResolver(SilentResolver):
             run.future_state = FutureState.FAILED
             run.exception = reason
             self._buffer_runs[run_id] = run
-        self._save_graph()
 
     def _update_resolution_status(self, status: ResolutionStatus):
         resolution = api_client.get_resolution(self._root_future.id)
@@ -249,17 +377,18 @@ class LocalResolver(SilentResolver):
         return self._runs[run_id]
 
     def _add_run(self, run: Run):
-        self._runs[run.id] = run
+        self._graph.add_run(run)
         self._buffer_runs[run.id] = run
+        self._touched_runs_count += 1
 
     def _add_artifact(self, artifact: Artifact):
-        self._artifacts[artifact.id] = artifact
+        self._graph.add_artifact(artifact)
         self._buffer_artifacts[artifact.id] = artifact
 
     def _add_edge(self, edge: Edge):
-        edge_key = make_edge_key(edge)
-        self._edges[edge_key] = edge
+        edge_key = self._graph.add_edge(edge)
         self._buffer_edges[edge_key] = edge
+        self._touched_edges_count += 1
 
     def _populate_graph(
         self,
@@ -269,19 +398,63 @@ class LocalResolver(SilentResolver):
     ) -> Run:
         """
         Update the graph based on future.
+
+        The future's run and edges, as well as those of its upstream futures, are
+        only created the first time the future is populated. Subsequent calls only
+        set artifact ids on existing edges.
+        """
+        if future.id not in self._populated_future_ids:
+            self._create_future_graph(future)
+
+        if input_artifacts is not None:
+            for name, artifact in input_artifacts.items():
+                input_edge = self._get_input_edge(
+                    destination_run_id=future.id, destination_name=name
+                )
+                if input_edge is None:
+                    raise RuntimeError("Missing input edge")
+
+                self._set_edge_artifact(input_edge, artifact.id)
+
+        if output_artifact is not None:
+            for output_edge in self._get_output_edges(future.id):
+                self._set_edge_artifact(output_edge, output_artifact.id)
+
+        return self._runs[future.id]
+
+    def _create_future_graph(self, future: AbstractFuture) -> None:
         """
+        Create the run and edges of future and of its upstream futures that were
+        not populated yet.
+        """
+        # Iterative depth-first traversal, deep graphs would otherwise hit the
+        # recursion limit.
+        futures_to_create = [future]
+
+        while len(futures_to_create) > 0:
+            future_ = futures_to_create.pop()
+
+            if future_.id in self._populated_future_ids:
+                continue
+
+            self._populated_future_ids.add(future_.id)
+            self._create_run_and_edges(future_)
+
+            # populate the graph for upstream futures
+            futures_to_create.extend(
+                value
+                for value in reversed(list(future_.kwargs.values()))
+                if isinstance(value, AbstractFuture)
+            )
+
+    def _create_run_and_edges(self, future: AbstractFuture) -> None:
         if future.id not in self._runs:
             run = make_run_from_future(future)
             run.root_id = self._futures[0].id
             self._add_run(run)
 
-        # Updating input edges
+        # Creating input edges
         for name, value in future.kwargs.items():
-            # Updating the input artifact
-            artifact_id = None
-            if input_artifacts is not None and name in input_artifacts:
-                artifact_id = input_artifacts[name].id
-
             # If the input is a future, we connect the edge
             source_run_id = None
             if isinstance(value, AbstractFuture):
@@ -310,94 +483,86 @@ class LocalResolver(SilentResolver):
                         parent_id = parent_edge.id
 
             # This is idempotent, edges are indexed by a unique key.
-            # It's ok to set the same edge multiple times (e.g. first without
-            # `artifact_id`, then with)
             self._update_edge(
                 source_run_id=source_run_id,
                 destination_run_id=future.id,
                 destination_name=name,
-                artifact_id=artifact_id,
+                artifact_id=None,
                 parent_id=parent_id,
             )
 
-        # Updating output edges
-
-        # Updating the output artifact
-        artifact_id = None
-        if output_artifact is not None:
-            artifact_id = output_artifact.id
+        # Creating output edges
 
         # There can be multiple output edges:
         # - the output value is input to multiple futures
         # - the future is nested and the parent future has multiple output edges
-        output_edges = self._get_output_edges(future.id)
-
-        # It means we are creating it for the first time
-        if len(output_edges) == 0:
-            # Let's figure out if the parent future has output edges yet
-            parent_output_edges = []
-
-            if (
-                future.parent_future is not None
-                and future.parent_future.nested_future is future
-            ):
-                parent_output_edges = self._get_output_edges(future.parent_future.id)
-
-            parent_ids: Union[List[str], Tuple[None]] = [
-                edge.id for edge in parent_output_edges
-            ] or (None,)
-
-            # For each parent output edge, we create an edge
-            for parent_id in parent_ids:
-                self._update_edge(
-                    source_run_id=future.id,
-                    destination_run_id=None,
-                    destination_name=None,
-                    artifact_id=artifact_id,
-                    parent_id=parent_id,
-                )
-        # There already are output edges, we simply update the artifact id
-        else:
-            for output_edge in output_edges:
-                self._update_edge(
-                    source_run_id=future.id,
-                    destination_run_id=output_edge.destination_run_id,
-                    destination_name=output_edge.destination_name,
-                    parent_id=output_edge.parent_id,
-                    artifact_id=artifact_id,
-                )
+        # Edges to downstream futures are created as input edges of those futures.
+        if len(self._get_output_edges(future.id)) > 0:
+            return
 
-        # populate the graph for upstream futures
-        for value in future.kwargs.values():
-            if isinstance(value, AbstractFuture):
-                self._populate_graph(value)
+        # Let's figure out if the parent future has output edges yet
+        parent_output_edges = []
 
-        return self._runs[future.id]
+        if (
+            future.parent_future is not None
+            and future.parent_future.nested_future is future
+        ):
+            parent_output_edges = self._get_output_edges(future.parent_future.id)
+
+        parent_ids: Union[List[str], Tuple[None]] = [
+            edge.id for edge in parent_output_edges
+        ] or (None,)
 
-    def _save_graph(self):
+        # For each parent output edge, we create an edge
+        for parent_id in parent_ids:
+            self._update_edge(
+                source_run_id=future.id,
+                destination_run_id=None,
+                destination_name=None,
+                artifact_id=None,
+                parent_id=parent_id,
+            )
+
+    def _save_graph(self, wait: bool = False):
         """
         Persist the graph to the DB
+
+        Buffered runs, artifacts and edges are handed over to the graph persister,
+        which saves them in the background. Pass `wait=True` to return only once
+        they are saved, e.g. before something else reads them from the DB.
         """
         runs = list(self._buffer_runs.values())
         artifacts = list(self._buffer_artifacts.values())
         edges = list(self._buffer_edges.values())
 
-        if not any(len(buffer) for buffer in (runs, artifacts, edges)):
-            return
+        if any(len(buffer) for buffer in (runs, artifacts, edges)):
+            logger.debug(
+                "Saving %s runs, %s artifacts, %s edges "
+                "(%s runs, %s edges touched so far)",
+                len(runs),
+                len(artifacts),
+                len(edges),
+                self._touched_runs_count,
+                self._touched_edges_count,
+            )
 
-        api_client.save_graph(
-            root_id=self._futures[0].id, runs=runs, artifacts=artifacts, edges=edges
-        )
+            self._graph_persister.save(
+                root_id=self._futures[0].id,
+                runs=runs,
+                artifacts=artifacts,
+                edges=edges,
+            )
 
-        self._buffer_runs.clear()
-        self._buffer_artifacts.clear()
-        self._buffer_edges.clear()
+            self._buffer_runs.clear()
+            self._buffer_artifacts.clear()
+            self._buffer_edges.clear()
 
+        if wait:
+            self._graph_persister.flush()
 
-def make_edge_key(edge: Edge) -> str:
-    return "{}:{}:{}:{}".format(
-        edge.source_run_id,
-        edge.parent_id,
-        edge.destination_run_id,
-        edge.destination_name,
-    )
+    def _close_graph_persister(self):
+        """
+        Save the remaining buffered graph and stop saving in the background.
+        """
+        self._save_graph()
+        self._graph_persister.close()
@@ -0,0 +1,151 @@
+"""
+In-memory representation of a resolution's graph of runs, artifacts and edges.
+"""
+# Standard Library
+import collections
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Sematic
+from sematic.db.models.artifact import Artifact
+from sematic.db.models.edge import Edge
+from sematic.db.models.run import Run
+
+
+class RunGraph:
+    """
+    Runs, artifacts and edges of a graph, indexed for constant-time lookups.
+
+    Edges are keyed by `make_edge_key`, and additionally indexed by source run,
+    by destination run and name, and by parent edge. Since the indexed fields
+    are exactly the fields of the edge key, indexes store edge keys and are not
+    affected by updates to the edges' other fields (e.g. `artifact_id`), nor by
+    replacing an edge with another edge of the same key.
+
+    Parameters
+    ----------
+    runs: Iterable[Run]
+        Initial runs.
+    artifacts: Iterable[Artifact]
+        Initial artifacts.
+    edges: Iterable[Edge]
+        Initial edges.
+    """
+
+    def __init__(
+        self,
+        runs: Iterable[Run] = (),
+        artifacts: Iterable[Artifact] = (),
+        edges: Iterable[Edge] = (),
+    ):
+        self.runs: Dict[str, Run] = {}
+        self.artifacts: Dict[str, Artifact] = {}
+        self.edges: Dict[str, Edge] = {}
+
+        self._edge_keys_by_source_run_id: Dict[
+            Optional[str], List[str]
+        ] = collections.defaultdict(list)
+        self._edge_keys_by_destination: Dict[
+            Tuple[Optional[str], Optional[str]], List[str]
+        ] = collections.defaultdict(list)
+        self._edge_keys_by_parent_id: Dict[
+            Optional[str], List[str]
+        ] = collections.defaultdict(list)
+
+        for run in runs:
+            self.add_run(run)
+
+        for artifact in artifacts:
+            self.add_artifact(artifact)
+
+        for edge in edges:
+            self.add_edge(edge)
+
+    def add_run(self, run: Run) -> None:
+        self.runs[run.id] = run
+
+    def add_artifact(self, artifact: Artifact) -> None:
+        self.artifacts[artifact.id] = artifact
+
+    def add_edge(self, edge: Edge) -> str:
+        """
+        Add or replace an edge, returns its key.
+        """
+        edge_key = make_edge_key(edge)
+
+        if edge_key not in self.edges:
+            self._edge_keys_by_source_run_id[edge.source_run_id].append(edge_key)
+            self._edge_keys_by_destination[
+                (edge.destination_run_id, edge.destination_name)
+            ].append(edge_key)
+            self._edge_keys_by_parent_id[edge.parent_id].append(edge_key)
+
+        self.edges[edge_key] = edge
+
+        return edge_key
+
+    def get_edge(
+        self,
+        source_run_id: Optional[str],
+        destination_run_id: Optional[str],
+        destination_name: Optional[str],
+        parent_id: Optional[str],
+    ) -> Optional[Edge]:
+        """
+        Find an edge by the fields of its key.
+        """
+        return self.edges.get(
+            _format_edge_key(
+                source_run_id, parent_id, destination_run_id, destination_name
+            )
+        )
+
+    def get_input_edge(
+        self, destination_run_id: Optional[str], destination_name: Optional[str]
+    ) -> Optional[Edge]:
+        """
+        Find an input edge.
+        """
+        edge_keys = self._edge_keys_by_destination.get(
+            (destination_run_id, destination_name)
+        )
+
+        if not edge_keys:
+            return None
+
+        return self.edges[edge_keys[0]]
+
+    def get_output_edges(self, source_run_id: str) -> List[Edge]:
+        """
+        Find output edges.
+        There can be multiple ones if the output goes to multiple futures.
+        """
+        return self._get_edges(self._edge_keys_by_source_run_id.get(source_run_id))
+
+    def get_child_edges(self, parent_id: str) -> List[Edge]:
+        """
+        Find edges whose parent edge is `parent_id`.
+        """
+        return self._get_edges(self._edge_keys_by_parent_id.get(parent_id))
+
+    def _get_edges(self, edge_keys: Optional[List[str]]) -> List[Edge]:
+        return [self.edges[edge_key] for edge_key in edge_keys or []]
+
+
+def make_edge_key(edge: Edge) -> str:
+    return _format_edge_key(
+        edge.source_run_id,
+        edge.parent_id,
+        edge.destination_run_id,
+        edge.destination_name,
+    )
+
+
+def _format_edge_key(
+    source_run_id: Optional[str],
+    parent_id: Optional[str],
+    destination_run_id: Optional[str],
+    destination_name: Optional[str],
+) -> str:
+    return "{}:{}:{}:{}".format(
+        source_run_id, parent_id, destination_run_id, destination_name
+    )
@@ -1,5 +1,10 @@
 # Standard Library
+import concurrent.futures
 import logging
+import typing
+
+# Third-party
+import cloudpickle
 
 # Sematic
 from sematic.abstract_future import AbstractFuture, FutureState
@@ -8,13 +13,65 @@ from sematic.resolvers.state_machine_resolver import StateMachineResolver
 logger = logging.getLogger(__name__)
 
 
+_EXECUTORS: typing.Dict[str, typing.Callable[..., concurrent.futures.Executor]] = {
+    "thread": concurrent.futures.ThreadPoolExecutor,
+    "process": concurrent.futures.ProcessPoolExecutor,
+}
+
+
 class SilentResolver(StateMachineResolver):
     """
     A resolver to resolver a DAG in memory, without tracking to the DB.
+
+    Parameters
+    ----------
+    max_parallelism: Optional[int]
+        Defaults to `None`. When `None`, futures are executed one at a time, in
+        the resolution loop. When set, futures of non-inline functions
+        (`inline=False`) are submitted to a pool of at most `max_parallelism`
+        workers, so that independent branches of the graph execute concurrently.
+    executor: str
+        Defaults to `"thread"`. Either `"thread"` or `"process"`. The kind of
+        pool used when `max_parallelism` is set. Use `"process"` for CPU-bound
+        functions. Inputs and outputs are then serialized with `cloudpickle`.
     """
 
+    def __init__(
+        self,
+        detach: bool = False,
+        max_parallelism: typing.Optional[int] = None,
+        executor: str = "thread",
+    ):
+        super().__init__(detach=detach)
+
+        if max_parallelism is not None and max_parallelism < 1:
+            raise ValueError(
+                "max_parallelism must be a positive integer, got: {}".format(
+                    repr(max_parallelism)
+                )
+            )
+
+        if executor not in _EXECUTORS:
+            raise ValueError(
+                "Unknown executor {}, expected one of: {}".format(
+                    repr(executor), ", ".join(map(repr, _EXECUTORS))
+                )
+            )
+
+        self._max_parallelism = max_parallelism
+        self._executor_kind = executor
+        self._executor: typing.Optional[concurrent.futures.Executor] = None
+        self._pending_futures: typing.Dict[
+            concurrent.futures.Future, AbstractFuture
+        ] = {}
+
     def _schedule_future(self, future: AbstractFuture) -> None:
-        self._run_inline(future)
+        if self._max_parallelism is None:
+            self._run_inline(future)
+            return
+
+        self._set_future_state(future, FutureState.SCHEDULED)
+        self._pending_futures[self._submit_to_executor(future)] = future
 
     def _run_inline(self, future: AbstractFuture) -> None:
         self._set_future_state(future, FutureState.SCHEDULED)
@@ -25,4 +82,86 @@ class SilentResolver(StateMachineResolver):
             self._handle_future_failure(future, exception)
 
     def _wait_for_scheduled_run(self) -> None:
-        pass
+        if len(self._pending_futures) == 0:
+            return
+
+        done, _ = concurrent.futures.wait(
+            self._pending_futures, return_when=concurrent.futures.FIRST_COMPLETED
+        )
+
+        for executor_future in done:
+            future = self._pending_futures.pop(executor_future)
+            try:
+                value = self._get_executor_result(executor_future)
+                self._update_future_with_value(future, value)
+            except Exception as exception:
+                self._handle_future_failure(future, exception)
+
+    def _submit_to_executor(self, future: AbstractFuture) -> concurrent.futures.Future:
+        if self._executor is None:
+            self._executor = _EXECUTORS[self._executor_kind](
+                max_workers=self._max_parallelism
+            )
+
+        logger.info("Submitting {} to {} pool".format(future, self._executor_kind))
+
+        if self._executor_kind == "process":
+            # Calculators and values are not always importable by reference
+            # (e.g. functions defined in __main__), so we use cloudpickle
+            # instead of the executor's default pickling.
+            return self._executor.submit(
+                _calculate_pickled,
+                cloudpickle.dumps((future.calculator, future.resolved_kwargs)),
+            )
+
+        return self._executor.submit(
+            future.calculator.calculate, **future.resolved_kwargs
+        )
+
+    def _get_executor_result(
+        self, executor_future: concurrent.futures.Future
+    ) -> typing.Any:
+        if self._executor_kind != "process":
+            return executor_future.result()
+
+        value, exception, cause = cloudpickle.loads(executor_future.result())
+
+        if exception is not None:
+            # Pickling does not preserve the cause, which is what is
+            # surfaced to the user for errors raised in their code.
+            raise exception from cause
+
+        return value
+
+    def _shutdown_executor(self) -> None:
+        if self._executor is None:
+            return
+
+        for executor_future in self._pending_futures:
+            executor_future.cancel()
+
+        self._pending_futures.clear()
+        self._executor.shutdown(wait=False)
+        self._executor = None
+
+    def _resolution_did_succeed(self) -> None:
+        super()._resolution_did_succeed()
+        self._shutdown_executor()
+
+    def _resolution_did_fail(self, error: Exception) -> None:
+        super()._resolution_did_fail(error)
+        self._shutdown_executor()
+
+
+def _calculate_pickled(pickled_calculation: bytes) -> bytes:
+    """
+    Entry point for calculations submitted to a process pool.
+
+    Returns a pickled `(value, exception, cause)` tuple.
+    """
+    calculator, kwargs = cloudpickle.loads(pickled_calculation)
+
+    try:
+        return cloudpickle.dumps((calculator.calculate(**kwargs), None, None))
+    except Exception as exception:
+        return cloudpickle.dumps((None, exception, exception.__cause__))
@@ -3,6 +3,7 @@ Abstract base class for a state machine-based resolution.
 """
 # Standard Library
 import abc
+import collections
 import logging
 import typing
 
@@ -19,6 +20,22 @@ class StateMachineResolver(Resolver, abc.ABC):
         self._futures: typing.List[AbstractFuture] = []
         self._detach = detach
 
+        # Indexes so that a state transition only visits the futures it affects
+        self._futures_by_id: typing.Dict[str, AbstractFuture] = {}
+        self._futures_by_state: typing.Dict[
+            FutureState, typing.Dict[str, AbstractFuture]
+        ] = collections.defaultdict(dict)
+        # Number of input futures not yet resolved, per future ID
+        self._unresolved_input_counts: typing.Dict[str, int] = {}
+        # Futures taking a given future as input, per future ID
+        self._consumers: typing.Dict[
+            str, typing.List[AbstractFuture]
+        ] = collections.defaultdict(list)
+        # CREATED futures whose inputs are all resolved
+        self._ready_futures: typing.Deque[AbstractFuture] = collections.deque()
+        # RAN futures whose nested future is resolved
+        self._ran_futures: typing.Deque[AbstractFuture] = collections.deque()
+
     @property
     def _root_future(self) -> AbstractFuture:
         return self._futures[0]
@@ -41,11 +58,16 @@ class StateMachineResolver(Resolver, abc.ABC):
             self._resolution_will_start()
 
             while future.state != FutureState.RESOLVED:
-                for future_ in self._futures:
-                    if future_.state == FutureState.CREATED:
-                        self._schedule_future_if_args_resolved(future_)
-                    if future_.state == FutureState.RAN:
-                        self._resolve_nested_future(future_)
+                while len(self._ready_futures) > 0 or len(self._ran_futures) > 0:
+                    while len(self._ready_futures) > 0:
+                        future_ = self._ready_futures.popleft()
+                        if future_.state == FutureState.CREATED:
+                            self._schedule_future_if_args_resolved(future_)
+
+                    while len(self._ran_futures) > 0:
+                        future_ = self._ran_futures.popleft()
+                        if future_.state == FutureState.RAN:
+                            self._resolve_nested_future(future_)
 
                 self._wait_for_scheduled_run()
 
@@ -56,7 +78,12 @@ class StateMachineResolver(Resolver, abc.ABC):
 
             return future.value
         except Exception as e:
-            self._resolution_did_fail(error=e)
+            try:
+                self._resolution_did_fail(error=e)
+            except Exception:
+                # Raise the error that failed the resolution instead
+                logger.exception("Unable to mark the resolution as failed")
+
             if isinstance(e, CalculatorError) and hasattr(e, "__cause__"):
                 # this will simplify the stack trace so the user sees less
                 # from Sematic's stack and more from the error from their code.
@@ -67,16 +94,75 @@ class StateMachineResolver(Resolver, abc.ABC):
         raise NotImplementedError()
 
     def _enqueue_future(self, future: AbstractFuture) -> None:
-        if future in self._futures:
+        if future.id in self._futures_by_id:
             return
 
         self._futures.append(future)
+        self._futures_by_id[future.id] = future
+        self._futures_by_state[future.state][future.id] = future
+
+        unresolved_input_count = 0
 
         for value in future.kwargs.values():
             if isinstance(value, AbstractFuture):
                 value.parent_future = future.parent_future
+                self._consumers[value.id].append(future)
+
+                if value.state != FutureState.RESOLVED:
+                    unresolved_input_count += 1
+
                 self._enqueue_future(value)
 
+        self._unresolved_input_counts[future.id] = unresolved_input_count
+
+        if unresolved_input_count == 0 and future.state == FutureState.CREATED:
+            self._ready_futures.append(future)
+
+    def _get_futures_by_state(self, state: FutureState) -> typing.List[AbstractFuture]:
+        """
+        Get all enqueued futures currently in `state`.
+        """
+        return list(self._futures_by_state[state].values())
+
+    def _update_indexes(
+        self, future: AbstractFuture, previous_state: FutureState
+    ) -> None:
+        """
+        Update future indexes after a state transition, and wake up the futures
+        that were waiting on it.
+        """
+        if future.id not in self._futures_by_id:
+            return
+
+        self._futures_by_state[previous_state].pop(future.id, None)
+        self._futures_by_state[future.state][future.id] = future
+
+        if future.state == FutureState.RESOLVED:
+            for consumer in self._consumers[future.id]:
+                self._unresolved_input_counts[consumer.id] -= 1
+
+                if (
+                    self._unresolved_input_counts[consumer.id] == 0
+                    and consumer.state == FutureState.CREATED
+                ):
+                    self._ready_futures.append(consumer)
+
+            parent_future = future.parent_future
+            if (
+                parent_future is not None
+                and parent_future.nested_future is future
+                and parent_future.state == FutureState.RAN
+            ):
+                self._ran_futures.append(parent_future)
+
+        if future.state == FutureState.RAN:
+            nested_future = future.nested_future
+            if (
+                nested_future is not None
+                and nested_future.state == FutureState.RESOLVED
+            ):
+                self._ran_futures.append(future)
+
     @abc.abstractmethod
     def _schedule_future(self, future: AbstractFuture):
         pass
@@ -95,7 +181,9 @@ class StateMachineResolver(Resolver, abc.ABC):
         """
         Sets state on future and call corresponding callback.
         """
+        previous_state = future.state
         future.state = state
+        self._update_indexes(future, previous_state)
 
         CALLBACKS = {
             FutureState.SCHEDULED: self._future_did_schedule,
@@ -171,6 +259,16 @@ class StateMachineResolver(Resolver, abc.ABC):
         """
         pass
 
+    def _resolve_from_cache(self, future: AbstractFuture) -> bool:
+        """
+        Allows resolvers to resolve a future with the output of a previous
+        execution instead of executing it.
+
+        This is called after `_future_will_schedule`. Returns whether the future
+        was resolved.
+        """
+        return False
+
     @staticmethod
     def _get_resolved_kwargs(future: AbstractFuture) -> typing.Dict[str, typing.Any]:
         """
@@ -195,7 +293,9 @@ class StateMachineResolver(Resolver, abc.ABC):
         if all_args_resolved:
             future.resolved_kwargs = resolved_kwargs
             self._future_will_schedule(future)
-            if future.props.inline:
+            if self._resolve_from_cache(future):
+                logger.info("Reusing cached output of {}".format(future.calculator))
+            elif future.props.inline:
                 logger.info("Running inline {}".format(future.calculator))
                 self._run_inline(future)
             else:
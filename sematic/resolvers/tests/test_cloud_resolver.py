@@ -1,18 +1,33 @@
 # Standard Library
+from typing import Dict
 from unittest import mock
 
+# Third-party
+import kubernetes
+import pytest
+
 # Sematic
 import sematic.api_client as api_client
 from sematic.api.tests.fixtures import (  # noqa: F401
     mock_no_auth,
     mock_requests,
+    mock_user_settings,
     test_client,
 )
 from sematic.calculator import func
 from sematic.db.models.resolution import ResolutionStatus
 from sematic.db.tests.fixtures import test_db  # noqa: F401
-from sematic.resolvers.cloud_resolver import CloudResolver
+from sematic.resolvers.cloud_resolver import (
+    _MAX_WORKER_POOL_RESTARTS,
+    CloudResolver,
+    _create_job,
+    _get_run_id_from_name,
+    _RetriableApiError,
+    _schedule_indexed_job,
+)
+from sematic.resolvers.job_watcher import RUN_IDS_ANNOTATION, JobState
 from sematic.tests.fixtures import test_storage, valid_client_version  # noqa: F401
+from sematic.user_settings import SettingsVar
 
 
 @func
@@ -70,3 +85,129 @@ def test_simulate_cloud_exec(
     assert (
         api_client.get_resolution(future.id).status == ResolutionStatus.COMPLETE.value
     )
+
+
+@mock.patch("sematic.resolvers.cloud_resolver.CloudResolver._start_worker_pool_watcher")
+@mock.patch("sematic.resolvers.cloud_resolver._schedule_job")
+@mock.patch("kubernetes.config.load_kube_config")
+def test_check_worker_pool(
+    mock_load_kube_config: mock.MagicMock,
+    mock_schedule_job: mock.MagicMock,
+    mock_start_worker_pool_watcher: mock.MagicMock,
+    test_storage,  # noqa: F811
+):
+    job_states: Dict[str, JobState] = {}
+    mock_start_worker_pool_watcher.return_value.get_job_state.side_effect = (
+        job_states.get
+    )
+
+    future = pipeline()
+    resolver = CloudResolver()
+    resolver._futures.append(future)
+    resolver._start_worker_pool()
+
+    # The pool job was not seen yet, then is running
+    resolver._check_worker_pool()
+    job_states[mock_schedule_job.call_args.args[1]] = JobState.ACTIVE
+    resolver._check_worker_pool()
+
+    assert mock_schedule_job.call_count == 1
+
+    # Pools whose job is over are restarted with a new job
+    for restarts_count in range(1, _MAX_WORKER_POOL_RESTARTS + 1):
+        job_states[mock_schedule_job.call_args.args[1]] = JobState.FAILED
+        resolver._check_worker_pool()
+
+        assert mock_schedule_job.call_count == restarts_count + 1
+
+    job_names = [call.args[1] for call in mock_schedule_job.call_args_list]
+    assert len(set(job_names)) == len(job_names)
+    assert {_get_run_id_from_name(job_name) for job_name in job_names} == {future.id}
+
+    # Until the resolution fails
+    job_states[mock_schedule_job.call_args.args[1]] = JobState.SUCCEEDED
+
+    with pytest.raises(RuntimeError, match="succeeded with runs in flight"):
+        resolver._check_worker_pool()
+
+
+@mock.patch("sematic.resolvers.cloud_resolver.get_image_uri")
+@mock.patch("sematic.resolvers.cloud_resolver._create_job")
+def test_schedule_indexed_job(
+    mock_create_job: mock.MagicMock, mock_get_image: mock.MagicMock
+):
+    mock_get_image.return_value = "some_image"
+
+    _schedule_indexed_job(["a", "b", "c"], "sematic-worker-a", root_id="root")
+
+    job = mock_create_job.call_args[0][0]
+
+    assert job.metadata.annotations == {RUN_IDS_ANNOTATION: "a,b,c"}
+    assert job.metadata.labels == {
+        "sematic.ai/job-type": "worker",
+        "sematic.ai/root-id": "root",
+    }
+    assert job.spec.completion_mode == "Indexed"
+    assert job.spec.completions == 3
+    assert job.spec.parallelism == 3
+    assert job.spec.backoff_limit == 0
+    assert job.spec.template.spec.containers[0].args == [
+        "--run_id",
+        "a,b,c",
+        "--indexed",
+    ]
+
+
+def _make_api_exception(status: int):
+    return kubernetes.client.rest.ApiException(status=status, reason="Some reason")
+
+
+@mock.patch("sematic.utils.retry.time.sleep")
+@mock.patch("sematic.resolvers.cloud_resolver._get_kubernetes_api_rate_limiter")
+@mock.patch("kubernetes.client.BatchV1Api")
+def test_create_job_retries(
+    mock_batch_api: mock.MagicMock,
+    mock_get_rate_limiter: mock.MagicMock,
+    mock_sleep: mock.MagicMock,
+):
+    mock_create = mock_batch_api.return_value.create_namespaced_job
+    mock_create.side_effect = [
+        _make_api_exception(429),
+        _make_api_exception(503),
+        None,
+    ]
+
+    with mock_user_settings({SettingsVar.KUBERNETES_NAMESPACE: "default"}):
+        _create_job(mock.MagicMock())
+
+    # Throttled requests are retried with backoff, each one rate-limited
+    assert mock_create.call_count == 3
+    assert mock_sleep.call_count == 2
+    assert mock_get_rate_limiter.return_value.acquire.call_count == 3
+
+
+@mock.patch("sematic.utils.retry.time.sleep")
+@mock.patch("sematic.resolvers.cloud_resolver._get_kubernetes_api_rate_limiter")
+@mock.patch("kubernetes.client.BatchV1Api")
+def test_create_job_errors(
+    mock_batch_api: mock.MagicMock,
+    mock_get_rate_limiter: mock.MagicMock,
+    mock_sleep: mock.MagicMock,
+):
+    mock_create = mock_batch_api.return_value.create_namespaced_job
+
+    with mock_user_settings({SettingsVar.KUBERNETES_NAMESPACE: "default"}):
+        # Created by a previous attempt
+        mock_create.side_effect = _make_api_exception(409)
+        _create_job(mock.MagicMock())
+
+        mock_create.side_effect = _make_api_exception(422)
+        with pytest.raises(kubernetes.client.rest.ApiException):
+            _create_job(mock.MagicMock())
+
+        mock_create.reset_mock()
+        mock_create.side_effect = _make_api_exception(429)
+        with pytest.raises(_RetriableApiError):
+            _create_job(mock.MagicMock())
+
+    assert mock_create.call_count == 6
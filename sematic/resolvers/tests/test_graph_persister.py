@@ -0,0 +1,119 @@
+# Standard Library
+import threading
+import uuid
+from unittest import mock
+
+# Third-party
+import pytest
+
+# Sematic
+from sematic.db.models.edge import Edge
+from sematic.db.tests.fixtures import make_run
+from sematic.resolvers.graph_persister import GraphPersister
+from sematic.resolvers.run_graph import make_edge_key
+
+
+@pytest.fixture
+def mock_save_encoded_graph():
+    with mock.patch(
+        "sematic.resolvers.graph_persister.api_client.save_encoded_graph"
+    ) as mock_save:
+        yield mock_save
+
+
+def test_coalesce(mock_save_encoded_graph: mock.MagicMock):
+    persister = GraphPersister(flush_interval_seconds=60)
+    run = make_run(name="a")
+
+    # The first batch is sent right away
+    persister.save("root", [run], [], [])
+    persister.flush()
+
+    for name in ("b", "c", "d"):
+        run.name = name
+        persister.save("root", [run], [], [])
+
+    persister.close()
+
+    assert mock_save_encoded_graph.call_count == 2
+    assert persister.sent_batches_count == 2
+
+    last_runs = mock_save_encoded_graph.call_args.kwargs["runs"]
+    assert len(last_runs) == 1
+    assert last_runs[0]["name"] == "d"
+
+
+def test_edges_keyed(mock_save_encoded_graph: mock.MagicMock):
+    persister = GraphPersister(flush_interval_seconds=60)
+    edge = Edge(id=uuid.uuid4().hex, source_run_id="a", destination_run_id="b")
+
+    persister.save("root", [], [], [edge])
+    edge.artifact_id = "123"
+    persister.save("root", [], [], [edge])
+    persister.close()
+
+    edges = [
+        encoded_edge
+        for call in mock_save_encoded_graph.call_args_list
+        for encoded_edge in call.kwargs["edges"]
+    ]
+
+    assert edges[-1]["artifact_id"] == "123"
+    assert make_edge_key(Edge.from_json_encodable(edges[-1])) == make_edge_key(edge)
+
+
+def test_flush_size(mock_save_encoded_graph: mock.MagicMock):
+    sent = threading.Event()
+    mock_save_encoded_graph.side_effect = lambda **_: sent.set()
+
+    persister = GraphPersister(flush_interval_seconds=60, flush_size=2)
+
+    persister.save("root", [make_run()], [], [])
+    assert sent.wait(timeout=5)
+    sent.clear()
+
+    persister.save("root", [make_run()], [], [])
+    assert not sent.wait(timeout=0.1)
+
+    # Reaching flush_size sends the batch without waiting for the interval
+    persister.save("root", [make_run()], [], [])
+    assert sent.wait(timeout=5)
+
+    persister.close()
+
+    assert mock_save_encoded_graph.call_count == 2
+
+
+def test_error(mock_save_encoded_graph: mock.MagicMock):
+    mock_save_encoded_graph.side_effect = ValueError("some message")
+
+    persister = GraphPersister()
+    persister.save("root", [make_run()], [], [])
+
+    with pytest.raises(ValueError, match="some message"):
+        persister.flush()
+
+    mock_save_encoded_graph.side_effect = None
+
+    persister.save("root", [make_run()], [], [])
+    persister.close()
+
+    assert mock_save_encoded_graph.call_count == 2
+
+
+def test_close(mock_save_encoded_graph: mock.MagicMock):
+    persister = GraphPersister()
+    persister.save("root", [make_run()], [], [])
+
+    thread = persister._thread
+    persister.close()
+
+    assert thread is not None
+    assert not thread.is_alive()
+    assert persister._thread is None
+
+
+@pytest.mark.parametrize("kwargs", ({"flush_interval_seconds": -1}, {"flush_size": 0}))
+def test_invalid_parameters(kwargs):
+    with pytest.raises(ValueError):
+        GraphPersister(**kwargs)
@@ -0,0 +1,309 @@
+# Standard Library
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from unittest import mock
+
+# Third-party
+import kubernetes
+import pytest
+
+# Sematic
+from sematic.abstract_future import FutureState
+from sematic.calculator import func
+from sematic.resolvers.cloud_resolver import (
+    CloudResolver,
+    _get_run_id_from_name,
+    _make_label_selector,
+)
+from sematic.resolvers.job_watcher import (
+    RUN_IDS_ANNOTATION,
+    JobState,
+    JobWatcher,
+    _parse_indexes,
+)
+
+_TIMEOUT = 5
+
+
+def _make_job(name: str, succeeded: bool = False, failed: bool = False):
+    return kubernetes.client.V1Job(
+        metadata=kubernetes.client.V1ObjectMeta(name=name),
+        status=kubernetes.client.V1JobStatus(
+            succeeded=1 if succeeded else None, failed=1 if failed else None
+        ),
+    )
+
+
+def _make_indexed_job(
+    name: str, run_ids: List[str], completed_indexes: str = "", failed: bool = False
+):
+    return kubernetes.client.V1Job(
+        metadata=kubernetes.client.V1ObjectMeta(
+            name=name, annotations={RUN_IDS_ANNOTATION: ",".join(run_ids)}
+        ),
+        status=kubernetes.client.V1JobStatus(
+            completed_indexes=completed_indexes or None, failed=1 if failed else None
+        ),
+    )
+
+
+class FakeBatchApi:
+    """
+    Jobs and their events, with increasing resource versions.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._events: List[Tuple[int, str, Any]] = []
+        self._jobs: Dict[str, Any] = {}
+        self._version = 0
+        # Events at or before this version are compacted
+        self.compacted_version = 0
+        self.watched_versions: List[Optional[str]] = []
+
+    def update_job(self, job) -> None:
+        with self._condition:
+            self._version += 1
+            job.metadata.resource_version = str(self._version)
+            event_type = "MODIFIED" if job.metadata.name in self._jobs else "ADDED"
+            self._jobs[job.metadata.name] = job
+            self._events.append((self._version, event_type, job))
+            self._condition.notify_all()
+
+    def compact(self) -> None:
+        with self._condition:
+            self.compacted_version = self._version
+
+    def list_namespaced_job(self, namespace: str, label_selector: str, **kwargs):
+        with self._condition:
+            return kubernetes.client.V1JobList(
+                items=list(self._jobs.values()),
+                metadata=kubernetes.client.V1ListMeta(
+                    resource_version=str(self._version)
+                ),
+            )
+
+    def stream_events(
+        self, resource_version: str, stopped: threading.Event
+    ) -> Iterator[Dict[str, Any]]:
+        version = int(resource_version)
+        self.watched_versions.append(resource_version)
+
+        if version < self.compacted_version:
+            raise kubernetes.client.rest.ApiException(status=410, reason="Gone")
+
+        while not stopped.is_set():
+            with self._condition:
+                events = [event for event in self._events if event[0] > version]
+
+                if len(events) == 0:
+                    self._condition.wait(0.01)
+                    continue
+
+            for event_version, event_type, job in events:
+                version = event_version
+                yield {"type": event_type, "object": job}
+
+
+class FakeWatch:
+    def __init__(self, batch_api: FakeBatchApi):
+        self._batch_api = batch_api
+        self._stopped = threading.Event()
+
+    def stream(self, func, namespace, label_selector, resource_version, **kwargs):
+        return self._batch_api.stream_events(resource_version, self._stopped)
+
+    def stop(self):
+        self._stopped.set()
+
+
+@pytest.fixture
+def batch_api():
+    return FakeBatchApi()
+
+
+@pytest.fixture
+def job_watcher(batch_api: FakeBatchApi):
+    job_watcher = JobWatcher(
+        namespace="default",
+        label_selector="sematic.ai/root-id=root",
+        get_run_id=_get_run_id_from_name,
+        batch_api=batch_api,
+        make_watch=lambda: FakeWatch(batch_api),
+        retry_delay_seconds=0.01,
+    )
+
+    yield job_watcher
+
+    job_watcher.stop()
+
+
+def test_list_then_watch(batch_api: FakeBatchApi, job_watcher: JobWatcher):
+    batch_api.update_job(_make_job("sematic-worker-a", succeeded=True))
+    batch_api.update_job(_make_job("sematic-worker-b"))
+
+    job_watcher.start()
+
+    # Jobs completed before the watcher started are listed
+    assert job_watcher.get_completed_run_id(timeout=_TIMEOUT) == "a"
+
+    batch_api.update_job(_make_job("sematic-worker-b", failed=True))
+
+    assert job_watcher.get_completed_run_id(timeout=_TIMEOUT) == "b"
+    assert job_watcher.get_job_state("a") is JobState.SUCCEEDED
+    assert job_watcher.get_job_state("b") is JobState.FAILED
+    assert job_watcher.get_job_state("c") is None
+
+    # A single list and watch for all jobs
+    assert job_watcher.lists_count == 1
+    assert batch_api.watched_versions == ["2"]
+
+
+def test_completed_once(batch_api: FakeBatchApi, job_watcher: JobWatcher):
+    job_watcher.start()
+
+    batch_api.update_job(_make_job("sematic-worker-a", succeeded=True))
+    batch_api.update_job(_make_job("sematic-worker-a", succeeded=True))
+
+    assert job_watcher.get_completed_run_id(timeout=_TIMEOUT) == "a"
+    assert job_watcher.get_completed_run_id(timeout=0.1) is None
+
+
+def test_resume_watch(batch_api: FakeBatchApi):
+    watches: List[FakeWatch] = []
+
+    def make_watch():
+        watches.append(FakeWatch(batch_api))
+        return watches[-1]
+
+    job_watcher = JobWatcher(
+        namespace="default",
+        label_selector="sematic.ai/root-id=root",
+        get_run_id=_get_run_id_from_name,
+        batch_api=batch_api,
+        make_watch=make_watch,
+    )
+    job_watcher.start()
+
+    try:
+        batch_api.update_job(_make_job("sematic-worker-a", succeeded=True))
+        assert job_watcher.get_completed_run_id(timeout=_TIMEOUT) == "a"
+
+        # Simulate the watch request timing out
+        watches[0].stop()
+        batch_api.update_job(_make_job("sematic-worker-b", succeeded=True))
+
+        assert job_watcher.get_completed_run_id(timeout=_TIMEOUT) == "b"
+    finally:
+        job_watcher.stop()
+
+    # The watch resumed from the last event, without listing jobs again
+    assert job_watcher.lists_count == 1
+    assert batch_api.watched_versions == ["0", "1"]
+
+
+def test_relist_expired(batch_api: FakeBatchApi, job_watcher: JobWatcher):
+    batch_api.update_job(_make_job("sematic-worker-a"))
+    batch_api.update_job(_make_job("sematic-worker-b"))
+    batch_api.update_job(_make_job("sematic-worker-b", succeeded=True))
+    batch_api.compact()
+
+    with mock.patch.object(
+        batch_api, "list_namespaced_job", wraps=batch_api.list_namespaced_job
+    ) as mock_list:
+        # The first list is stale, its version has since been compacted
+        mock_list.side_effect = [
+            kubernetes.client.V1JobList(
+                items=[],
+                metadata=kubernetes.client.V1ListMeta(resource_version="1"),
+            ),
+            mock.DEFAULT,
+        ]
+
+        job_watcher.start()
+
+        assert job_watcher.get_completed_run_id(timeout=_TIMEOUT) == "b"
+
+    assert job_watcher.lists_count == 2
+    assert batch_api.watched_versions == ["1", "3"]
+
+
+def test_indexed_job(batch_api: FakeBatchApi, job_watcher: JobWatcher):
+    run_ids = ["a", "b", "c", "d"]
+    job_watcher.start()
+
+    batch_api.update_job(_make_indexed_job("sematic-worker-a", run_ids))
+    batch_api.update_job(
+        _make_indexed_job("sematic-worker-a", run_ids, completed_indexes="0,2")
+    )
+
+    # Each run of the job is completed separately
+    completed_run_ids = {
+        job_watcher.get_completed_run_id(timeout=_TIMEOUT) for _ in range(2)
+    }
+    assert completed_run_ids == {"a", "c"}
+    assert job_watcher.get_job_state("b") is JobState.ACTIVE
+
+    batch_api.update_job(
+        _make_indexed_job(
+            "sematic-worker-a", run_ids, completed_indexes="0-2", failed=True
+        )
+    )
+
+    assert job_watcher.get_completed_run_id(timeout=_TIMEOUT) == "b"
+    assert job_watcher.get_completed_run_id(timeout=_TIMEOUT) == "d"
+    assert job_watcher.get_job_state("b") is JobState.SUCCEEDED
+    assert job_watcher.get_job_state("d") is JobState.FAILED
+
+
+def test_parse_indexes():
+    assert _parse_indexes(None) == set()
+    assert _parse_indexes("") == set()
+    assert _parse_indexes("3") == {3}
+    assert _parse_indexes("0-2,5,7-8") == {0, 1, 2, 5, 7, 8}
+
+
+@func(inline=False)
+def remote_add(a: float, b: float) -> float:
+    return a + b
+
+
+@mock.patch("kubernetes.config.load_kube_config")
+def test_wait_for_any_remote_job(
+    mock_load_kube_config: mock.MagicMock, batch_api: FakeBatchApi
+):
+    resolver = CloudResolver(detach=False, is_running_remotely=True)
+
+    future = remote_add(1, 2)
+    future.state = FutureState.SCHEDULED
+    resolver._enqueue_future(future)
+
+    job_watcher = JobWatcher(
+        namespace="default",
+        label_selector=_make_label_selector(future.id),
+        get_run_id=_get_run_id_from_name,
+        batch_api=batch_api,
+        make_watch=lambda: FakeWatch(batch_api),
+    )
+    resolver._job_watcher = job_watcher
+    job_watcher.start()
+
+    try:
+        # Completed jobs of other runs are ignored
+        batch_api.update_job(_make_job("sematic-worker-other", succeeded=True))
+        batch_api.update_job(
+            _make_job("sematic-worker-{}".format(future.id), succeeded=True)
+        )
+
+        assert resolver._wait_for_any_remote_job() == future.id
+    finally:
+        resolver._stop_job_watcher()
+
+    assert resolver._job_watcher is None
+
+
+def test_make_label_selector():
+    assert (
+        _make_label_selector("abc")
+        == "sematic.ai/job-type=worker,sematic.ai/root-id=abc"
+    )
@@ -0,0 +1,176 @@
+# Standard Library
+import copy
+import pickle
+from typing import Any, Callable, Dict, List, Tuple
+from unittest import mock
+
+import numpy
+import pytest
+
+# Sematic
+from sematic.db.models.factories import get_artifact_value, make_artifact
+from sematic.resolvers.lazy_inputs import (
+    LazyValue,
+    get_lazy_artifact,
+    get_lazy_value,
+    make_lazy_values,
+)
+from sematic.storage import CachedStorage, MemoryStorage
+from sematic.tests.benchmark import benchmark, measure_peak_memory, measure_time
+
+
+def _make_lazy_value(
+    value: Any, type_: Any, storage_backend: MemoryStorage
+) -> LazyValue:
+    artifact = make_artifact(value, type_, store=True, storage_backend=storage_backend)
+    return LazyValue(artifact, storage_backend)
+
+
+@pytest.fixture
+def memory_storage():
+    return MemoryStorage()
+
+
+def test_lazy_value(memory_storage: MemoryStorage):
+    artifact = make_artifact(
+        [1, 2], List[int], store=True, storage_backend=memory_storage
+    )
+    lazy_value: Any = LazyValue(artifact, memory_storage)
+
+    with mock.patch(
+        "sematic.resolvers.lazy_inputs.get_artifact_value", wraps=get_artifact_value
+    ) as mock_get_artifact_value:
+        assert get_lazy_artifact(lazy_value) is artifact
+        mock_get_artifact_value.assert_not_called()
+
+        assert lazy_value == [1, 2]
+        assert lazy_value[0] == 1
+        assert get_lazy_value(lazy_value) == [1, 2]
+
+        # The value is only read once
+        mock_get_artifact_value.assert_called_once()
+
+
+def test_lazy_value_proxy(memory_storage: MemoryStorage):
+    lazy_list = _make_lazy_value([1, 2], List[int], memory_storage)
+
+    assert isinstance(lazy_list, list)
+    assert type(lazy_list) is LazyValue
+    assert len(lazy_list) == 2
+    assert list(lazy_list) == [1, 2]
+    assert 2 in lazy_list
+    assert lazy_list + [3] == [1, 2, 3]
+    assert [0] + lazy_list == [0, 1, 2]
+    assert repr(lazy_list) == "[1, 2]"
+    assert pickle.loads(pickle.dumps(lazy_list)) == [1, 2]
+    assert copy.deepcopy(lazy_list) == [1, 2]
+
+    lazy_list.append(3)
+    assert get_lazy_value(lazy_list) == [1, 2, 3]
+
+    lazy_float = _make_lazy_value(1.5, float, memory_storage)
+
+    assert lazy_float * 2 == 3
+    assert 2 ** _make_lazy_value(2, int, memory_storage) == 4
+    assert "{:.2f}".format(lazy_float) == "1.50"
+    assert hash(lazy_float) == hash(1.5)
+    assert lazy_float < 2
+
+    lazy_array = _make_lazy_value(numpy.arange(3), numpy.ndarray, memory_storage)
+
+    assert isinstance(lazy_array, numpy.ndarray)
+    assert lazy_array.shape == (3,)
+    assert numpy.sum(lazy_array) == 3
+    numpy.testing.assert_array_equal(lazy_array * 2, [0, 2, 4])
+
+
+def test_get_lazy_value_not_lazy():
+    value = [1]
+
+    assert get_lazy_value(value) is value
+    assert get_lazy_artifact(value) is None
+
+
+def test_make_lazy_values(memory_storage: MemoryStorage, tmp_path):
+    cached_storage = CachedStorage(memory_storage, cache_dir=str(tmp_path))
+    artifacts = {
+        name: make_artifact(value, int, store=True, storage_backend=memory_storage)
+        for name, value in (("a", 1), ("b", 2))
+    }
+
+    with make_lazy_values(artifacts, cached_storage) as lazy_values:
+        lazy_value: Any = lazy_values["a"]
+        assert lazy_value + 1 == 2
+
+        # All artifacts are prefetched in the background
+        object.__getattribute__(lazy_values["b"], "_sematic_prefetch").result()
+        assert cached_storage.misses_count == 2
+
+        assert lazy_values["b"] == 2
+        assert cached_storage.hits_count == 2
+
+
+def test_make_lazy_values_error(memory_storage: MemoryStorage):
+    artifact = make_artifact(1, int)
+
+    with make_lazy_values({"a": artifact}, memory_storage) as lazy_values:
+        # Prefetch errors are raised when the value is read
+        with pytest.raises(KeyError):
+            get_lazy_value(lazy_values["a"])
+
+
+def test_make_lazy_values_invalid_max_concurrency():
+    with pytest.raises(ValueError, match="max_concurrency"):
+        with make_lazy_values({}, max_concurrency=0):
+            pass
+
+
+def _make_large_artifacts(storage_backend: MemoryStorage) -> Dict[str, Any]:
+    return {
+        "input_{}".format(index): make_artifact(
+            numpy.full(2 * 1024 * 1024, index, dtype="float64"),
+            numpy.ndarray,
+            store=True,
+            storage_backend=storage_backend,
+        )
+        for index in range(8)
+    }
+
+
+def _make_eager_and_lazy_calls(
+    storage_backend: MemoryStorage,
+) -> Tuple[Callable[[], None], Callable[[], None]]:
+    """
+    Calls of a function using one of many large inputs, with eager and lazy
+    inputs.
+    """
+    artifacts = _make_large_artifacts(storage_backend)
+
+    def _function(**kwargs):
+        return float(kwargs["input_1"][0])
+
+    def _eager():
+        kwargs = {
+            name: get_artifact_value(artifact, storage_backend)
+            for name, artifact in artifacts.items()
+        }
+        assert _function(**kwargs) == 1
+
+    def _lazy():
+        with make_lazy_values(artifacts, storage_backend) as kwargs:
+            assert _function(**kwargs) == 1
+
+    return _eager, _lazy
+
+
+def test_lazy_inputs_memory(memory_storage: MemoryStorage):
+    eager, lazy = _make_eager_and_lazy_calls(memory_storage)
+
+    assert measure_peak_memory(lazy) < measure_peak_memory(eager) / 4
+
+
+@benchmark
+def test_lazy_inputs_benchmark(memory_storage: MemoryStorage):
+    eager, lazy = _make_eager_and_lazy_calls(memory_storage)
+
+    assert measure_time(lazy, repeat=1) < measure_time(eager, repeat=1)
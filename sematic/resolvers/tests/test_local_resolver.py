@@ -1,10 +1,13 @@
 # Standard Library
 from typing import List
+from unittest import mock
 
 # Third-party
 import pytest
+import sqlalchemy
 
 # Sematic
+import sematic.api_client as api_client
 from sematic.abstract_future import AbstractFuture, FutureState
 from sematic.api.tests.fixtures import (  # noqa: F401
     mock_no_auth,
@@ -13,12 +16,13 @@ from sematic.api.tests.fixtures import (  # noqa: F401
 )
 from sematic.calculator import func
 from sematic.db.models.edge import Edge
-from sematic.db.models.factories import make_artifact
+from sematic.db.models.factories import get_artifact_value, make_artifact
 from sematic.db.models.resolution import ResolutionStatus
 from sematic.db.queries import get_resolution, get_root_graph, get_run
 from sematic.db.tests.fixtures import pg_mock, test_db  # noqa: F401
 from sematic.resolvers.local_resolver import LocalResolver
-from sematic.tests.fixtures import valid_client_version  # noqa: F401
+from sematic.storage import LocalStorage
+from sematic.tests.fixtures import test_storage, valid_client_version  # noqa: F401
 
 
 @func
@@ -39,7 +43,9 @@ def pipeline(a: float, b: float) -> float:
 
 
 @mock_no_auth
-def test_single_function(test_db, mock_requests, valid_client_version):  # noqa: F811
+def test_single_function(
+    test_db, mock_requests, valid_client_version, test_storage  # noqa: F811
+):
     future = add(1, 2)
 
     result = future.set(name="AAA").resolve(LocalResolver())
@@ -89,7 +95,9 @@ def add_add_add(a: float, b: float) -> float:
 
 
 @mock_no_auth
-def test_add_add(test_db, mock_requests, valid_client_version):  # noqa: F811
+def test_add_add(
+    test_db, mock_requests, valid_client_version, test_storage  # noqa: F811
+):
     future = add_add_add(1, 2)
 
     result = future.resolve(LocalResolver())
@@ -104,7 +112,9 @@ def test_add_add(test_db, mock_requests, valid_client_version):  # noqa: F811
 
 
 @mock_no_auth
-def test_pipeline(test_db, mock_requests, valid_client_version):  # noqa: F811
+def test_pipeline(
+    test_db, mock_requests, valid_client_version, test_storage  # noqa: F811
+):
     future = pipeline(3, 5)
 
     result = future.resolve(LocalResolver())
@@ -122,7 +132,85 @@ def test_pipeline(test_db, mock_requests, valid_client_version):  # noqa: F811
 
 
 @mock_no_auth
-def test_failure(test_db, mock_requests, valid_client_version):  # noqa: F811
+def test_incremental_graph_updates(
+    test_db, mock_requests, valid_client_version, test_storage  # noqa: F811
+):
+    future = pipeline(3, 5)
+    resolver = LocalResolver()
+
+    with mock.patch(
+        "sematic.resolvers.local_resolver.Edge", wraps=Edge
+    ) as mock_edge_class:
+        future.resolve(resolver)
+
+    runs, _, edges = get_root_graph(future.id)
+
+    # Edges are only instantiated once
+    assert mock_edge_class.call_count == len(edges)
+    # Edges are only persisted when created and when their artifact is set
+    assert resolver._touched_edges_count <= 2 * len(edges)
+    assert all(edge.artifact_id is not None for edge in edges)
+
+
+@mock_no_auth
+def test_graph_saves_coalesced(
+    test_db, mock_requests, valid_client_version, test_storage  # noqa: F811
+):
+    future = pipeline(3, 5)
+    resolver = LocalResolver(graph_flush_interval_seconds=60)
+
+    with mock.patch(
+        "sematic.resolvers.graph_persister.api_client.save_encoded_graph",
+        wraps=api_client.save_encoded_graph,
+    ) as mock_save_encoded_graph:
+        assert future.resolve(resolver) == 24
+
+    # The root run is saved before the resolution is created, all subsequent
+    # transitions are saved together when the resolution completes.
+    assert mock_save_encoded_graph.call_count == 2
+
+    runs, _, _ = get_root_graph(future.id)
+
+    assert len(runs) == 6
+    assert all(run.future_state == FutureState.RESOLVED.value for run in runs)
+    assert resolver._graph_persister._thread is None
+
+
+@mock_no_auth
+def test_graph_save_failure(
+    test_db, mock_requests, valid_client_version, test_storage  # noqa: F811
+):
+    future = pipeline(3, 5)
+    resolver = LocalResolver(graph_flush_interval_seconds=0)
+    errors: List[Exception] = []
+    save_encoded_graph = api_client.save_encoded_graph
+
+    def _save_encoded_graph(*args, **kwargs):
+        # The API goes down once the resolution started
+        try:
+            get_resolution(future.id)
+        except sqlalchemy.exc.NoResultFound:
+            return save_encoded_graph(*args, **kwargs)
+
+        errors.append(RuntimeError("Save {} failed".format(len(errors))))
+        raise errors[-1]
+
+    with mock.patch(
+        "sematic.resolvers.graph_persister.api_client.save_encoded_graph",
+        side_effect=_save_encoded_graph,
+    ):
+        with pytest.raises(RuntimeError) as exc_info:
+            future.resolve(resolver)
+
+    # The error that failed the resolution is raised
+    assert exc_info.value is errors[0]
+    assert get_resolution(future.id).status == ResolutionStatus.FAILED.value
+
+
+@mock_no_auth
+def test_failure(
+    test_db, mock_requests, valid_client_version, test_storage  # noqa: F811
+):
     class CustomException(Exception):
         pass
 
@@ -156,7 +244,9 @@ def test_failure(test_db, mock_requests, valid_client_version):  # noqa: F811
 
 
 @mock_no_auth
-def test_resolver_error(test_db, mock_requests, valid_client_version):  # noqa: F811
+def test_resolver_error(
+    test_db, mock_requests, valid_client_version, test_storage  # noqa: F811
+):
     @func
     def add(x: int, y: int) -> int:
         return x + y
@@ -275,12 +365,16 @@ class DBStateMachineTestResolver(LocalResolver):
 
 
 @mock_no_auth
-def test_db_state_machine(test_db, mock_requests, valid_client_version):  # noqa: F811
+def test_db_state_machine(
+    test_db, mock_requests, valid_client_version, test_storage  # noqa: F811
+):
     pipeline(1, 2).resolve(DBStateMachineTestResolver())
 
 
 @mock_no_auth
-def test_list_conversion(test_db, mock_requests, valid_client_version):  # noqa: F811
+def test_list_conversion(
+    test_db, mock_requests, valid_client_version, test_storage  # noqa: F811
+):
     @func
     def alist(a: float, b: float) -> List[float]:
         return [add(a, b), add(a, b)]
@@ -289,7 +383,7 @@ def test_list_conversion(test_db, mock_requests, valid_client_version):  # noqa:
 
 
 @mock_no_auth
-def test_exceptions(mock_requests, valid_client_version):  # noqa: F811
+def test_exceptions(mock_requests, valid_client_version, test_storage):  # noqa: F811
     @func
     def fail():
         raise Exception("FAIL!")
@@ -312,3 +406,83 @@ def test_exceptions(mock_requests, valid_client_version):  # noqa: F811
 
     assert runs_by_id[future.nested_future.id].future_state == FutureState.FAILED.value
     assert "FAIL!" in runs_by_id[future.nested_future.id].exception
+
+
+@func(inline=False)
+def remote_add(a: float, b: float) -> float:
+    return a + b
+
+
+@func
+def remote_pipeline(a: float, b: float) -> float:
+    c = remote_add(a, b)
+    d = remote_add(a, c)
+    return remote_add(c, d)
+
+
+@pytest.mark.parametrize("executor", ("thread", "process"))
+@mock_no_auth
+def test_parallel(
+    test_db, mock_requests, valid_client_version, executor, test_storage  # noqa: F811
+):
+    future = remote_pipeline(1, 2)
+
+    result = future.resolve(LocalResolver(max_parallelism=2, executor=executor))
+
+    assert result == 7
+
+    runs, artifacts, edges = get_root_graph(future.id)
+
+    assert len(runs) == 4
+    assert len(artifacts) == 5
+    assert len(edges) == 10
+    assert all(run.future_state == FutureState.RESOLVED.value for run in runs)
+    assert get_resolution(future.id).status == ResolutionStatus.COMPLETE.value
+
+
+_cached_add_calls: List[float] = []
+
+
+@func(cache=True)
+def cached_add(a: float, b: float) -> float:
+    _cached_add_calls.append(a)
+    return a + b
+
+
+@mock_no_auth
+def test_cache(
+    test_db, mock_requests, valid_client_version, test_storage  # noqa: F811
+):
+    _cached_add_calls.clear()
+
+    assert cached_add(1, 2).resolve(LocalResolver()) == 3
+    assert _cached_add_calls == [1]
+
+    future = cached_add(1, 2)
+    assert future.resolve(LocalResolver()) == 3
+    # The second resolution reused the first one's output
+    assert _cached_add_calls == [1]
+
+    run = get_run(future.id)
+    assert run.cache_key is not None
+    assert run.future_state == FutureState.RESOLVED.value
+
+    assert cached_add(2, 2).resolve(LocalResolver()) == 4
+    assert _cached_add_calls == [1, 2]
+
+
+@mock_no_auth
+def test_local_storage(
+    test_db, mock_requests, valid_client_version, tmp_path  # noqa: F811
+):
+    local_storage = LocalStorage(root_dir=str(tmp_path))
+
+    future = pipeline(3, 5)
+    assert future.resolve(LocalResolver(storage=local_storage)) == 24
+
+    _, artifacts, _ = get_root_graph(future.id)
+
+    # Values of local runs can be reloaded
+    values = {get_artifact_value(artifact, local_storage) for artifact in artifacts}
+
+    assert values == {3, 5, 8, 16, 24}
@@ -0,0 +1,54 @@
+# Standard Library
+import uuid
+
+# Sematic
+from sematic.db.models.edge import Edge
+from sematic.resolvers.run_graph import RunGraph, make_edge_key
+
+
+def _make_edge(**kwargs) -> Edge:
+    fields = dict(
+        id=uuid.uuid4().hex,
+        source_run_id=None,
+        destination_run_id=None,
+        destination_name=None,
+        artifact_id=None,
+        parent_id=None,
+    )
+    fields.update(kwargs)
+    return Edge(**fields)
+
+
+def test_indexes():
+    input_edge = _make_edge(destination_run_id="b", destination_name="x")
+    edge_ab = _make_edge(
+        source_run_id="a", destination_run_id="b", destination_name="y"
+    )
+    edge_ac = _make_edge(
+        source_run_id="a", destination_run_id="c", destination_name="z"
+    )
+    child_edge = _make_edge(
+        destination_run_id="d", destination_name="x", parent_id=input_edge.id
+    )
+
+    graph = RunGraph(edges=[input_edge, edge_ab, edge_ac, child_edge])
+
+    assert graph.get_input_edge("b", "x") is input_edge
+    assert graph.get_input_edge("b", "y") is edge_ab
+    assert graph.get_input_edge("b", "z") is None
+    assert graph.get_output_edges("a") == [edge_ab, edge_ac]
+    assert graph.get_output_edges("b") == []
+    assert graph.get_child_edges(input_edge.id) == [child_edge]
+    assert len(graph.edges) == 4
+
+
+def test_replace_edge():
+    edge = _make_edge(source_run_id="a")
+    graph = RunGraph(edges=[edge])
+
+    new_edge = _make_edge(source_run_id="a", artifact_id="artifact")
+
+    assert graph.add_edge(new_edge) == make_edge_key(edge)
+    assert graph.get_output_edges("a") == [new_edge]
+    assert graph.get_output_edges("a")[0] is new_edge
+    assert len(graph.edges) == 1
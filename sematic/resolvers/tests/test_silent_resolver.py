@@ -1,6 +1,15 @@
+# Standard Library
+import threading
+from typing import Any, Callable, List
+
+# Third-party
+import pytest
+
 # Sematic
+from sematic.abstract_future import FutureState
 from sematic.calculator import func
 from sematic.resolvers.silent_resolver import SilentResolver
+from sematic.tests.benchmark import benchmark, measure_time
 
 
 @func
@@ -22,3 +31,147 @@ def pipeline(a: float, b: float) -> float:
 
 def test_silent_resolver():
     assert SilentResolver().resolve(pipeline(3, 5)) == 24
+
+
+def test_dependency_counters():
+    resolver = SilentResolver()
+
+    a = add(1, 2)
+    b = add(a, a)
+    c = add3(a, b, 3)
+
+    resolver._enqueue_future(c)
+
+    assert resolver._unresolved_input_counts == {a.id: 0, b.id: 2, c.id: 2}
+    assert resolver._consumers[a.id] == [c, b, b]
+    assert list(resolver._ready_futures) == [a]
+    assert set(resolver._futures_by_id) == {a.id, b.id, c.id}
+
+
+def test_indexes_drained():
+    resolver = SilentResolver()
+
+    assert resolver.resolve(pipeline(3, 5)) == 24
+    assert resolver._get_futures_by_state(FutureState.CREATED) == []
+    assert len(resolver._get_futures_by_state(FutureState.RESOLVED)) == len(
+        resolver._futures
+    )
+    assert len(resolver._ready_futures) == 0
+    assert len(resolver._ran_futures) == 0
+
+
+@func
+def total(values: List[int]) -> int:
+    return sum(values)
+
+
+@func
+def wide_fan_out(n: int) -> int:
+    return total([add(i, 1) for i in range(n)])
+
+
+@func
+def deep_chain(i: int, n: int) -> int:
+    if i >= n:
+        return i
+
+    return deep_chain(add(i, 1), n)
+
+
+def _time_resolution(make_future: Callable[[int], Any], size: int) -> float:
+    return measure_time(lambda: SilentResolver().resolve(make_future(size)))
+
+
+@benchmark
+def test_resolution_overhead_is_linear():
+    """
+    Benchmark of the resolver's own overhead on deep nested graphs and wide
+    fan-outs.
+
+    The functions are trivial so the resolution time is the scheduling overhead.
+    Quadrupling the graph size should roughly quadruple the resolution time. A
+    quadratic scheduler would take about 16 times longer.
+    """
+    size = 250
+
+    for make_future in (
+        lambda n: deep_chain(0, n),
+        lambda n: wide_fan_out(n),
+    ):
+        # Warm-up
+        SilentResolver().resolve(make_future(size))
+
+        small = _time_resolution(make_future, size)
+        large = _time_resolution(make_future, 4 * size)
+
+        assert large / small < 10
+
+
+@func(inline=False)
+def remote_add(a: float, b: float) -> float:
+    return a + b
+
+
+@func(inline=False)
+def remote_fail(a: float) -> float:
+    raise ValueError("some message")
+
+
+@func
+def fan_out(a: float, b: float) -> float:
+    c = remote_add(a, b)
+    d = remote_add(a, a)
+    e = remote_add(b, b)
+    return remote_add(remote_add(c, d), e)
+
+
+@pytest.mark.parametrize("executor", ("thread", "process"))
+def test_parallel(executor):
+    resolver = SilentResolver(max_parallelism=2, executor=executor)
+    future = fan_out(3, 5)
+
+    assert resolver.resolve(future) == 24
+    assert all(future_.state == FutureState.RESOLVED for future_ in resolver._futures)
+    assert resolver._executor is None
+
+
+@pytest.mark.parametrize("executor", ("thread", "process"))
+def test_parallel_failure(executor):
+    @func
+    def pipeline(a: float) -> float:
+        return remote_add(remote_fail(a), remote_add(a, a))
+
+    resolver = SilentResolver(max_parallelism=2, executor=executor)
+    future = pipeline(1)
+
+    with pytest.raises(ValueError, match="some message"):
+        resolver.resolve(future)
+
+    assert future.state == FutureState.NESTED_FAILED
+    assert future.nested_future.kwargs["a"].state == FutureState.FAILED
+
+
+def test_parallel_concurrency():
+    barrier = threading.Barrier(2, timeout=5)
+
+    @func(inline=False)
+    def wait_for_sibling(a: int) -> int:
+        # Deadlocks (and times out) unless both siblings run concurrently
+        barrier.wait()
+        return a
+
+    @func
+    def pipeline() -> int:
+        return remote_add(wait_for_sibling(1), wait_for_sibling(2))
+
+    resolver = SilentResolver(max_parallelism=2, executor="thread")
+
+    assert resolver.resolve(pipeline()) == 3
+
+
+@pytest.mark.parametrize(
+    "kwargs", ({"max_parallelism": 0}, {"max_parallelism": 2, "executor": "gpu"})
+)
+def test_invalid_parallelism(kwargs):
+    with pytest.raises(ValueError):
+        SilentResolver(**kwargs)
@@ -1,21 +1,39 @@
 # Standard Library
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List
 from unittest import mock
 
 import pytest
 
 # Sematic
+import sematic.api_client as api_client
 from sematic.abstract_future import FutureState
 from sematic.api.tests.fixtures import (  # noqa: F401
     mock_no_auth,
     mock_requests,
+    mock_user_settings,
     test_client,
 )
 from sematic.calculator import func
+from sematic.db.models.edge import Edge
+from sematic.db.models.factories import get_artifact_value, make_artifact
+from sematic.db.models.resolution import ResolutionStatus
 from sematic.db.queries import get_root_graph
-from sematic.db.tests.fixtures import test_db  # noqa: F401
+from sematic.db.tests.fixtures import make_run, test_db  # noqa: F401
 from sematic.resolvers.cloud_resolver import CloudResolver
-from sematic.resolvers.worker import main
+from sematic.resolvers.lazy_inputs import LazyValue
+from sematic.resolvers.worker import (
+    _make_input_kwargs,
+    _make_output_artifact,
+    _set_run_output,
+    get_indexed_run_id,
+    main,
+    serve,
+)
 from sematic.tests.fixtures import test_storage, valid_client_version  # noqa: F401
+from sematic.user_settings import SettingsVar
 
 
 @func
@@ -94,3 +112,534 @@ def test_fail(
 
     assert runs[0].future_state == FutureState.FAILED.value
     assert "FAIL!" in runs[0].exception
+
+
+@func(inline=False)
+def make_values(count: int) -> List[float]:
+    return [float(index) for index in range(count)]
+
+
+@func(inline=False)
+def total(values: List[float]) -> float:
+    return sum(values)
+
+
+@func
+def describe(value: float) -> str:
+    return "total: {}".format(value)
+
+
+@func
+def remote_pipeline(count: int) -> str:
+    return describe(total(make_values(count)))
+
+
+def _schedule_worker_job(run_id: str, name: str, resolve: bool = False, **kwargs):
+    # Workers run synchronously, in lieu of Kubernetes jobs
+    if not resolve:
+        main(run_id=run_id, resolve=False)
+
+
+def _wait_for_any_remote_job(self):
+    return next(
+        (
+            future.id
+            for future in self._get_futures_by_state(FutureState.SCHEDULED)
+            if not future.props.inline
+        ),
+        None,
+    )
+
+
+@mock.patch(
+    "sematic.resolvers.cloud_resolver.CloudResolver._wait_for_any_remote_job",
+    _wait_for_any_remote_job,
+)
+@mock.patch("sematic.resolvers.cloud_resolver.CloudResolver._start_job_watcher")
+@mock.patch("sematic.resolvers.cloud_resolver.get_image_uri")
+@mock.patch(
+    "sematic.resolvers.cloud_resolver._schedule_job", side_effect=_schedule_worker_job
+)
+@mock.patch("kubernetes.config.load_kube_config")
+@mock_no_auth
+def test_main_outputs_by_reference(
+    mock_load_kube_config: mock.MagicMock,
+    mock_schedule_job: mock.MagicMock,
+    mock_get_image: mock.MagicMock,
+    mock_start_job_watcher: mock.MagicMock,
+    mock_requests,  # noqa: F811
+    test_db,  # noqa: F811
+    test_storage,  # noqa: F811
+    valid_client_version,  # noqa: F811
+):
+    mock_get_image.return_value = "some_image"
+
+    # On the user's machine
+    resolver = CloudResolver(detach=True)
+
+    future = remote_pipeline(3)
+
+    future.resolve(resolver)
+
+    # In the driver job
+    with mock.patch(
+        "sematic.resolvers.lazy_inputs.get_artifact_value", wraps=get_artifact_value
+    ) as mock_get_artifact_value:
+        main(run_id=future.id, resolve=True)
+
+    # Only the input of the inline function is read by the driver
+    mock_get_artifact_value.assert_called_once()
+    assert mock_get_artifact_value.call_args[0][0].json_summary == "3.0"
+
+    runs, artifacts, edges = get_root_graph(future.id)
+    assert len(runs) == 4
+
+    root_output_edge = next(
+        edge
+        for edge in edges
+        if edge.source_run_id == future.id and edge.destination_run_id is None
+    )
+    root_output = next(
+        artifact
+        for artifact in artifacts
+        if artifact.id == root_output_edge.artifact_id
+    )
+    assert get_artifact_value(root_output) == "total: 3.0"
+
+
+@func(inline=False)
+def count_to(count: int) -> float:
+    # Cast to float by the worker
+    return count
+
+
+@func(inline=False)
+def invalid_count(count: int) -> int:
+    return "count: {}".format(count)  # type: ignore
+
+
+@func
+def describe_count(count: int) -> str:
+    return describe(count_to(count))
+
+
+@func
+def invalid_pipeline(count: int) -> str:
+    return describe(invalid_count(count))
+
+
+@mock.patch(
+    "sematic.resolvers.cloud_resolver.CloudResolver._wait_for_any_remote_job",
+    _wait_for_any_remote_job,
+)
+@mock.patch("sematic.resolvers.cloud_resolver.CloudResolver._start_job_watcher")
+@mock.patch("sematic.resolvers.cloud_resolver.get_image_uri")
+@mock.patch(
+    "sematic.resolvers.cloud_resolver._schedule_job", side_effect=_schedule_worker_job
+)
+@mock.patch("kubernetes.config.load_kube_config")
+@mock_no_auth
+def test_main_cast_remote_output(
+    mock_load_kube_config: mock.MagicMock,
+    mock_schedule_job: mock.MagicMock,
+    mock_get_image: mock.MagicMock,
+    mock_start_job_watcher: mock.MagicMock,
+    mock_requests,  # noqa: F811
+    test_db,  # noqa: F811
+    test_storage,  # noqa: F811
+    valid_client_version,  # noqa: F811
+):
+    mock_get_image.return_value = "some_image"
+
+    future = describe_count(3)
+    future.resolve(CloudResolver(detach=True))
+    main(run_id=future.id, resolve=True)
+
+    runs, artifacts, edges = get_root_graph(future.id)
+    remote_run = next(run for run in runs if run.name == "count_to")
+    remote_output = next(
+        artifact
+        for artifact in artifacts
+        for edge in edges
+        if edge.source_run_id == remote_run.id and edge.artifact_id == artifact.id
+    )
+    remote_output_value = get_artifact_value(remote_output)
+
+    assert type(remote_output_value) is float
+    assert remote_output_value == 3.0
+
+    # Remote outputs of the wrong type fail their run
+    future = invalid_pipeline(3)
+    future.resolve(CloudResolver(detach=True))
+
+    with pytest.raises(TypeError, match="Cannot cast 'count: 3' to <class 'int'>"):
+        main(run_id=future.id, resolve=True)
+
+    runs, _, _ = get_root_graph(future.id)
+    remote_run = next(run for run in runs if run.name == "invalid_count")
+
+    assert remote_run.future_state == FutureState.FAILED.value
+
+
+@func(inline=False)
+def square(value: float) -> float:
+    return value**2
+
+
+@func
+def fan_out(count: int) -> float:
+    return total([square(float(index)) for index in range(count)])
+
+
+def _schedule_indexed_worker_job(run_ids: List[str], name: str, **kwargs):
+    # The pods of the indexed job run synchronously
+    for index in range(len(run_ids)):
+        with mock.patch.dict(os.environ, {"JOB_COMPLETION_INDEX": str(index)}):
+            main(run_id=get_indexed_run_id(",".join(run_ids)), resolve=False)
+
+
+@mock.patch(
+    "sematic.resolvers.cloud_resolver.CloudResolver._wait_for_any_remote_job",
+    _wait_for_any_remote_job,
+)
+@mock.patch("sematic.resolvers.cloud_resolver.CloudResolver._start_job_watcher")
+@mock.patch("sematic.resolvers.cloud_resolver.get_image_uri")
+@mock.patch(
+    "sematic.resolvers.cloud_resolver._schedule_indexed_job",
+    side_effect=_schedule_indexed_worker_job,
+)
+@mock.patch(
+    "sematic.resolvers.cloud_resolver._schedule_job", side_effect=_schedule_worker_job
+)
+@mock.patch("kubernetes.config.load_kube_config")
+@mock_no_auth
+def test_main_indexed_job(
+    mock_load_kube_config: mock.MagicMock,
+    mock_schedule_job: mock.MagicMock,
+    mock_schedule_indexed_job: mock.MagicMock,
+    mock_get_image: mock.MagicMock,
+    mock_start_job_watcher: mock.MagicMock,
+    mock_requests,  # noqa: F811
+    test_db,  # noqa: F811
+    test_storage,  # noqa: F811
+    valid_client_version,  # noqa: F811
+):
+    mock_get_image.return_value = "some_image"
+
+    # On the user's machine
+    resolver = CloudResolver(detach=True)
+
+    future = fan_out(3)
+
+    future.resolve(resolver)
+
+    # In the driver job
+    main(run_id=future.id, resolve=True)
+
+    runs, _, _ = get_root_graph(future.id)
+    square_run_ids = [run.id for run in runs if run.calculator_path.endswith(".square")]
+
+    # The squares were executed by a single indexed job, the total by its own job
+    mock_schedule_indexed_job.assert_called_once()
+    assert sorted(mock_schedule_indexed_job.call_args[0][0]) == sorted(square_run_ids)
+    assert len(square_run_ids) == 3
+    assert mock_schedule_job.call_count == 2
+
+    assert {run.future_state for run in runs} == {FutureState.RESOLVED.value}
+
+
+def test_get_indexed_run_id():
+    with mock.patch.dict(os.environ, {"JOB_COMPLETION_INDEX": "1"}):
+        assert get_indexed_run_id("a,b,c") == "b"
+
+
+@func(inline=False, max_concurrency=2)
+def capped_square(value: float) -> float:
+    return value**2
+
+
+@func
+def capped_fan_out(count: int) -> float:
+    return total([capped_square(float(index)) for index in range(count)])
+
+
+@pytest.mark.parametrize(
+    "pipeline_, settings",
+    (
+        (capped_fan_out, {}),
+        (fan_out, {SettingsVar.SEMATIC_MAX_IN_FLIGHT_RUNS: "2"}),
+    ),
+)
+@mock.patch(
+    "sematic.resolvers.cloud_resolver.CloudResolver._wait_for_any_remote_job",
+    _wait_for_any_remote_job,
+)
+@mock.patch("sematic.resolvers.cloud_resolver.CloudResolver._start_job_watcher")
+@mock.patch("sematic.resolvers.cloud_resolver.get_image_uri")
+@mock.patch("sematic.resolvers.cloud_resolver._schedule_indexed_job")
+@mock.patch("sematic.resolvers.cloud_resolver._schedule_job")
+@mock.patch("kubernetes.config.load_kube_config")
+def test_main_max_in_flight_runs(
+    mock_load_kube_config: mock.MagicMock,
+    mock_schedule_job: mock.MagicMock,
+    mock_schedule_indexed_job: mock.MagicMock,
+    mock_get_image: mock.MagicMock,
+    mock_start_job_watcher: mock.MagicMock,
+    pipeline_,
+    settings,
+    mock_requests,  # noqa: F811
+    test_db,  # noqa: F811
+    test_storage,  # noqa: F811
+    valid_client_version,  # noqa: F811
+):
+    mock_get_image.return_value = "some_image"
+    submitted_run_ids: List[List[str]] = []
+    queued_counts: List[int] = []
+
+    def _submit(run_ids: List[str]):
+        submitted_run_ids.append(run_ids)
+
+        # Futures waiting for capacity are visible as queued
+        runs, _, _ = get_root_graph(api_client.get_run(run_ids[0]).root_id)
+        queued_counts.append(
+            sum(run.future_state == FutureState.QUEUED.value for run in runs)
+        )
+
+        for run_id in run_ids:
+            main(run_id=run_id, resolve=False)
+
+    def _schedule_worker_job(run_id: str, name: str, resolve: bool = False, **kwargs):
+        if not resolve:
+            _submit([run_id])
+
+    mock_schedule_job.side_effect = _schedule_worker_job
+    mock_schedule_indexed_job.side_effect = lambda run_ids, *args, **kwargs: _submit(
+        run_ids
+    )
+
+    with mock_user_settings({SettingsVar.SEMATIC_AUTHENTICATE: False, **settings}):
+        # On the user's machine
+        resolver = CloudResolver(detach=True)
+
+        future = pipeline_(5)
+
+        future.resolve(resolver)
+
+        # In the driver job
+        main(run_id=future.id, resolve=True)
+
+    runs, _, _ = get_root_graph(future.id)
+    square_run_ids = {run.id for run in runs if "square" in run.calculator_path}
+
+    # The squares were submitted at most 2 at a time, in a batch then one by one
+    # as runs completed.
+    assert [len(run_ids) for run_ids in submitted_run_ids] == [2, 1, 1, 1, 1]
+    assert set().union(*submitted_run_ids[:4]) == square_run_ids
+    assert queued_counts[0] == 3
+
+    assert {run.future_state for run in runs} == {FutureState.RESOLVED.value}
+
+
+@mock.patch(
+    "sematic.resolvers.cloud_resolver.CloudResolver._poll_interval_seconds", 0.01
+)
+@mock.patch("sematic.resolvers.cloud_resolver.CloudResolver._start_worker_pool_watcher")
+@mock.patch("sematic.resolvers.cloud_resolver.get_image_uri")
+@mock.patch("sematic.resolvers.cloud_resolver._schedule_job")
+@mock.patch("kubernetes.config.load_kube_config")
+def test_worker_pool(
+    mock_load_kube_config: mock.MagicMock,
+    mock_schedule_job: mock.MagicMock,
+    mock_get_image: mock.MagicMock,
+    mock_start_worker_pool_watcher: mock.MagicMock,
+    mock_requests,  # noqa: F811
+    test_db,  # noqa: F811
+    test_storage,  # noqa: F811
+    valid_client_version,  # noqa: F811
+):
+    mock_get_image.return_value = "some_image"
+    # The pool job is never seen over
+    mock_start_worker_pool_watcher.return_value.get_job_state.return_value = None
+    executed_counts: List[int] = []
+    threads: List[threading.Thread] = []
+
+    def _schedule_worker_pool(run_id: str, name: str, worker_pool_size=None, **kwargs):
+        # Workers run in threads, in lieu of the pool's pods
+        for _ in range(worker_pool_size or 0):
+            threads.append(
+                threading.Thread(
+                    target=lambda: executed_counts.append(
+                        serve(run_id, poll_interval_seconds=0.01)
+                    )
+                )
+            )
+            threads[-1].start()
+
+    mock_schedule_job.side_effect = _schedule_worker_pool
+
+    with mock_user_settings(
+        {
+            SettingsVar.SEMATIC_AUTHENTICATE: False,
+            SettingsVar.SEMATIC_WORKER_POOL_SIZE: "2",
+        }
+    ):
+        # On the user's machine
+        resolver = CloudResolver(detach=True)
+
+        future = remote_pipeline(3)
+
+        future.resolve(resolver)
+
+        # In the driver job
+        main(run_id=future.id, resolve=True)
+
+        for thread in threads:
+            thread.join()
+
+    # A single pool job executed both remote runs, and exited when the
+    # resolution completed.
+    assert mock_schedule_job.call_count == 2
+    assert mock_schedule_job.call_args.kwargs["worker_pool_size"] == 2
+    assert len(executed_counts) == 2
+    assert sum(executed_counts) == 2
+
+    runs, _, _ = get_root_graph(future.id)
+    assert {run.future_state for run in runs} == {FutureState.RESOLVED.value}
+
+
+@mock.patch("sematic.resolvers.worker.main")
+@mock.patch("sematic.resolvers.worker.api_client")
+def test_serve(mock_api_client: mock.MagicMock, mock_main: mock.MagicMock):
+    mock_api_client.claim_queued_run.side_effect = ["run", None, None, None]
+    mock_api_client.get_resolution.side_effect = [
+        mock.Mock(status=status.value)
+        for status in (
+            ResolutionStatus.RUNNING,
+            ResolutionStatus.RUNNING,
+            ResolutionStatus.COMPLETE,
+        )
+    ]
+    renewed = threading.Event()
+
+    def _renew_queued_run_claim(root_id: str, run_id: str) -> bool:
+        renewed.set()
+        return True
+
+    mock_api_client.renew_queued_run_claim.side_effect = _renew_queued_run_claim
+    # The run lasts until its claim is renewed
+    mock_main.side_effect = lambda run_id, resolve: renewed.wait(5)
+
+    assert serve("root", poll_interval_seconds=0, renew_interval_seconds=0.01) == 1
+
+    mock_main.assert_called_once_with("run", resolve=False)
+    mock_api_client.renew_queued_run_claim.assert_called_with("root", "run")
+    # Workers wait for runs until the resolution is over
+    assert mock_api_client.get_resolution.call_count == 3
+
+
+def test_make_input_kwargs_lazy(test_storage):  # noqa: F811
+    artifact = make_artifact(1.0, float, store=True)
+    edges = [
+        Edge(destination_run_id="run", destination_name="a", artifact_id=artifact.id)
+    ]
+
+    with _make_input_kwargs("run", [artifact], edges, lazy=False) as kwargs:
+        assert kwargs == {"a": 1.0}
+
+    with _make_input_kwargs("run", [artifact], edges, lazy=True) as kwargs:
+        assert type(kwargs["a"]) is LazyValue
+        assert kwargs["a"] == 1.0
+
+
+def test_make_output_artifact_lazy(test_storage):  # noqa: F811
+    artifact = make_artifact(1.0, float, store=True)
+    lazy_value = LazyValue(artifact)
+
+    with mock.patch(
+        "sematic.resolvers.lazy_inputs.get_artifact_value"
+    ) as mock_get_artifact_value:
+        # Inputs returned as-is are not read
+        assert _make_output_artifact(lazy_value, float) is artifact
+        mock_get_artifact_value.assert_not_called()
+
+    # Unless the output type is different
+    output_artifact = _make_output_artifact(lazy_value, int)
+
+    assert output_artifact.id != artifact.id
+    assert output_artifact.id == make_artifact(1.0, int).id
+
+
+def test_set_run_output_lazy(test_storage):  # noqa: F811
+    artifact = make_artifact(1.0, float, store=True)
+    lazy_value = LazyValue(artifact)
+    run = make_run()
+    edges = [Edge(source_run_id=run.id, source_name="output")]
+
+    with mock.patch("sematic.resolvers.worker.api_client") as mock_api_client:
+        _set_run_output(run, lazy_value, float, edges)
+
+    # Inputs returned as-is are not read
+    assert not object.__getattribute__(lazy_value, "_sematic_is_loaded")
+    assert edges[0].artifact_id == artifact.id
+    assert run.future_state == FutureState.RESOLVED.value
+    mock_api_client.save_graph.assert_called_once_with(
+        run.root_id, [run], [artifact], edges
+    )
+
+
+class Foo:
+    def __init__(self, x: int):
+        self.x = x
+
+
+@func(inline=False)
+def get_x(foo: Foo) -> int:
+    return foo.x
+
+
+@func(inline=False, lazy_inputs=True)
+def lazy_get_x(foo: Foo) -> int:
+    return get_x(foo)
+
+
+def test_lazy_inputs_nested_future(test_storage):  # noqa: F811
+    artifact = make_artifact(Foo(5), Foo, store=True)
+    edges = [
+        Edge(destination_run_id="run", destination_name="foo", artifact_id=artifact.id)
+    ]
+
+    with _make_input_kwargs("run", [artifact], edges, lazy=True) as kwargs:
+        future = lazy_get_x.func(**kwargs)
+
+    # Nested futures get the values of lazy inputs, not copies wrapping them
+    assert type(future.kwargs["foo"]) is Foo
+    assert future.kwargs["foo"].x == 5
+
+
+@dataclass
+class Pair:
+    first: float
+    second: float
+
+
+@pytest.mark.parametrize(
+    "make_output, type_",
+    (
+        (lambda a, b: [a, b], List[float]),
+        (lambda a, b: {"a": a, "b": b}, Dict[str, float]),
+        (lambda a, b: Pair(first=a, second=b), Pair),
+        (lambda a, b: [Pair(first=a, second=b)], List[Pair]),
+    ),
+)
+def test_make_output_artifact_nested_lazy(
+    make_output, type_, test_storage  # noqa: F811
+):
+    lazy_values = [
+        LazyValue(make_artifact(value, float, store=True)) for value in (1.0, 2.0)
+    ]
+
+    # Inputs returned within another value are read, artifact IDs are derived
+    # from the serialized value
+    output_artifact = _make_output_artifact(make_output(*lazy_values), type_)
+
+    assert output_artifact.id == make_artifact(make_output(1.0, 2.0), type_).id
@@ -1,9 +1,13 @@
 # Standard Library
 import argparse
+import contextlib
 import datetime
 import importlib
 import logging
-from typing import Any, Dict, List
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List
 
 # Third-party
 import cloudpickle
@@ -15,13 +19,21 @@ from sematic.abstract_future import FutureState
 from sematic.calculator import Calculator
 from sematic.db.models.artifact import Artifact
 from sematic.db.models.edge import Edge
-from sematic.db.models.factories import get_artifact_value, make_artifact
+from sematic.db.models.factories import get_artifact_value
+from sematic.db.models.queued_run import CLAIM_LEASE_SECONDS
+from sematic.db.models.resolution import ResolutionStatus
 from sematic.db.models.run import Run
 from sematic.future import Future
 from sematic.resolvers.cloud_resolver import (
     CloudResolver,
     make_nested_future_storage_key,
 )
+from sematic.resolvers.lazy_inputs import (
+    get_lazy_artifact,
+    is_lazy_value_of_type,
+    make_artifact_by_reference,
+    make_lazy_values,
+)
 from sematic.utils.exceptions import format_exception_for_run
 
 
@@ -32,6 +44,23 @@ def parse_args():
     parser = argparse.ArgumentParser("Sematic cloud worker")
     parser.add_argument("--run_id", type=str, required=True)
     parser.add_argument("--resolve", default=False, action="store_true", required=False)
+    parser.add_argument(
+        "--worker_pool",
+        default=False,
+        action="store_true",
+        required=False,
+        help="Execute the queued runs of the resolution of root run `run_id`.",
+    )
+    parser.add_argument(
+        "--indexed",
+        default=False,
+        action="store_true",
+        required=False,
+        help=(
+            "`run_id` is a comma-separated list of run IDs, execute the one at "
+            "the completion index of the pod's indexed job."
+        ),
+    )
 
     args = parser.parse_args()
 
@@ -41,25 +70,57 @@ def parse_args():
 logger = logging.getLogger(__name__)
 
 
-def _get_input_kwargs(
+def _get_input_artifacts(
     run_id: str, artifacts: List[Artifact], edges: List[Edge]
-) -> Dict[str, Any]:
+) -> Dict[str, Artifact]:
     """
-    Get input values for run
+    Get input artifacts for run, by input name
     """
     artifacts_by_id = {artifact.id: artifact for artifact in artifacts}
 
-    kwargs = {
-        edge.destination_name: get_artifact_value(artifacts_by_id[edge.artifact_id])
+    return {
+        edge.destination_name: artifacts_by_id[edge.artifact_id]
         for edge in edges
         if edge.destination_run_id == run_id
         and edge.artifact_id is not None
         and edge.destination_name is not None
     }
 
+
+def _get_input_kwargs(
+    run_id: str, artifacts: List[Artifact], edges: List[Edge]
+) -> Dict[str, Any]:
+    """
+    Get input values for run
+    """
+    storage_backend = storage.get_cached_storage()
+
+    kwargs = {
+        name: get_artifact_value(artifact, storage_backend)
+        for name, artifact in _get_input_artifacts(run_id, artifacts, edges).items()
+    }
+
     return kwargs
 
 
+@contextlib.contextmanager
+def _make_input_kwargs(
+    run_id: str, artifacts: List[Artifact], edges: List[Edge], lazy: bool
+) -> Iterator[Dict[str, Any]]:
+    """
+    Get input values for run, lazy values prefetched while in the context if
+    `lazy` is `True`.
+    """
+    if not lazy:
+        yield _get_input_kwargs(run_id, artifacts, edges)
+        return
+
+    with make_lazy_values(
+        _get_input_artifacts(run_id, artifacts, edges), storage.get_cached_storage()
+    ) as kwargs:
+        yield kwargs
+
+
 def _fail_run(run: Run):
     """
     Mark run as failed.
@@ -91,7 +152,8 @@ def _set_run_output(run: Run, output: Any, type_: Any, edges: List[Edge]):
     """
     artifacts = []
 
-    if isinstance(output, Future):
+    # isinstance would read lazy values, which are never futures
+    if get_lazy_artifact(output) is None and isinstance(output, Future):
         pickled_nested_future = cloudpickle.dumps(output)
         storage.set(make_nested_future_storage_key(output.id), pickled_nested_future)
         run.nested_future_id = output.id
@@ -99,7 +161,7 @@ def _set_run_output(run: Run, output: Any, type_: Any, edges: List[Edge]):
         run.ended_at = datetime.datetime.utcnow()
 
     else:
-        artifacts.append(make_artifact(output, type_, store=True))
+        artifacts.append(_make_output_artifact(output, type_))
 
         # Set output artifact on output edges
         for edge in edges:
@@ -112,6 +174,30 @@ def _set_run_output(run: Run, output: Any, type_: Any, edges: List[Edge]):
     api_client.save_graph(run.root_id, [run], artifacts, edges)
 
 
+def _make_output_artifact(output: Any, type_: Any) -> Artifact:
+    """
+    Make and store the output artifact of a run.
+
+    Lazy inputs returned as-is are not read, their artifact is reused if it has
+    the output type.
+    """
+    return make_artifact_by_reference(
+        output, type_, store=True, storage_backend=storage.get_cached_storage()
+    )
+
+
+def _cast_output(func: Calculator, output: Any) -> Any:
+    """
+    Cast a run output to the function's output type.
+
+    Lazy inputs returned as-is are not read if they have the output type.
+    """
+    if is_lazy_value_of_type(output, func.output_type):
+        return output
+
+    return func.cast_output(output)
+
+
 def main(run_id: str, resolve: bool):
     """
     Main job logic.
@@ -128,9 +214,10 @@ def main(run_id: str, resolve: bool):
 
     try:
         func = _get_func(run)
-        kwargs = _get_input_kwargs(run.id, artifacts, edges)
 
         if resolve:
+            kwargs = _get_input_kwargs(run.id, artifacts, edges)
+
             logger.info("Resolving %s", func.__name__)
             future: Future = func(**kwargs)
             future.id = run.id
@@ -141,9 +228,12 @@ def main(run_id: str, resolve: bool):
             resolver.resolve(future)
 
         else:
-            logger.info("Executing %s", func.__name__)
-            output = func.func(**kwargs)
-            _set_run_output(run, output, func.output_type, edges)
+            with _make_input_kwargs(
+                run.id, artifacts, edges, lazy=func.lazy_inputs
+            ) as kwargs:
+                logger.info("Executing %s", func.__name__)
+                output = _cast_output(func, func.func(**kwargs))
+                _set_run_output(run, output, func.output_type, edges)
 
     except Exception as e:
         logger.error("Run failed:")
@@ -157,6 +247,93 @@ def main(run_id: str, resolve: bool):
         raise e
 
 
+_TERMINAL_RESOLUTION_STATUSES = {
+    ResolutionStatus.COMPLETE.value,
+    ResolutionStatus.FAILED.value,
+}
+
+
+# Set by Kubernetes in the pods of indexed jobs
+_JOB_COMPLETION_INDEX_ENV_VAR = "JOB_COMPLETION_INDEX"
+
+
+def get_indexed_run_id(run_ids: str) -> str:
+    """
+    Get the run ID of the pod's completion index, among the comma-separated
+    `run_ids` of its indexed job.
+    """
+    return run_ids.split(",")[int(os.environ[_JOB_COMPLETION_INDEX_ENV_VAR])]
+
+
+def serve(
+    root_id: str,
+    poll_interval_seconds: float = 1,
+    renew_interval_seconds: float = CLAIM_LEASE_SECONDS / 4,
+) -> int:
+    """
+    Worker pool logic.
+
+    Execute the queued runs of the resolution of root run `root_id`, one at a
+    time, until the resolution is over. Imported modules and cached artifacts
+    are reused across runs.
+
+    The claim of the executed run is renewed every `renew_interval_seconds`, so
+    that it is claimed again by another worker if this one dies.
+
+    Returns the number of runs executed.
+    """
+    executed_count = 0
+
+    while True:
+        run_id = api_client.claim_queued_run(root_id)
+
+        if run_id is not None:
+            with _renew_claim(root_id, run_id, renew_interval_seconds):
+                try:
+                    main(run_id, resolve=False)
+                except Exception:
+                    # The run was marked failed, the driver handles the failure
+                    pass
+
+            executed_count += 1
+            continue
+
+        # Workers wait for runs as long as the driver may queue them
+        if api_client.get_resolution(root_id).status in _TERMINAL_RESOLUTION_STATUSES:
+            logger.info("Resolution %s is over, exiting", root_id)
+            break
+
+        time.sleep(poll_interval_seconds)
+
+    return executed_count
+
+
+@contextlib.contextmanager
+def _renew_claim(root_id: str, run_id: str, interval_seconds: float) -> Iterator[None]:
+    """
+    Renew the claim of a queued run from a background thread while in the
+    context.
+    """
+    stopped = threading.Event()
+
+    def _renew():
+        while not stopped.wait(interval_seconds):
+            try:
+                if not api_client.renew_queued_run_claim(root_id, run_id):
+                    logger.warning("Run %s is no longer claimed", run_id)
+            except Exception:
+                logger.warning("Unable to renew the claim of %s", run_id, exc_info=True)
+
+    thread = threading.Thread(target=_renew, name="sematic-claim", daemon=True)
+    thread.start()
+
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
 
@@ -164,5 +341,12 @@ if __name__ == "__main__":
 
     logger.info("Worker CLI args: run_id=%s", args.run_id)
     logger.info("Worker CLI args:  resolve=%s", args.resolve)
+    logger.info("Worker CLI args:  worker_pool=%s", args.worker_pool)
+    logger.info("Worker CLI args:  indexed=%s", args.indexed)
 
-    main(args.run_id, args.resolve)
+    if args.worker_pool:
+        serve(args.run_id)
+    elif args.indexed:
+        main(get_indexed_run_id(args.run_id), resolve=False)
+    else:
+        main(args.run_id, args.resolve)
@@ -1,48 +1,1028 @@
+"""
+Storage of artifact values and other payloads.
+
+Payloads are stored by `StorageBackend`s. `S3Storage` is used by default, other
+backends can be selected with the `SEMATIC_STORAGE` user settings, or passed to
+resolvers. Payloads stored remotely are compressed, see `CompressedStorage`.
+"""
 # Standard Library
+import abc
+import collections
+import concurrent.futures
+import contextlib
 import io
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+from typing import (
+    Any,
+    BinaryIO,
+    ContextManager,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    NoReturn,
+    Optional,
+    Tuple,
+    Type,
+    cast,
+)
 
 # Third-party
 import boto3
+import botocore.config
 import botocore.exceptions
 
 # Sematic
+from sematic.compression import (
+    DEFAULT_CODEC_NAME,
+    DEFAULT_MIN_SIZE_BYTES,
+    CompressingWriter,
+    DecompressingReader,
+    compress,
+    decompress,
+    get_codec,
+)
+from sematic.config_dir import get_config_dir
 from sematic.user_settings import SettingsVar, get_user_settings
 
+_LOCAL_STORAGE_DIR = "data"
+_LOCAL_STORAGE_FILE_MODE = 0o644
 
-def _get_bucket() -> str:
-    return get_user_settings(SettingsVar.AWS_S3_BUCKET)
+_LOCAL_CACHE_DIR = "cache"
+# Only artifact values, whose keys are derived from their content, are cached
+_CACHED_KEY_PREFIX = "artifacts/"
+_COPY_BUFFER_SIZE = 1024 * 1024
 
+_MIB = 1024 * 1024
+_S3_MIN_PART_SIZE = 5 * _MIB
+_S3_MAX_POOL_CONNECTIONS = 50
+_S3_NOT_FOUND_CODES = {"404", "NoSuchKey", "NotFound"}
 
-def set(key: str, value: bytes):
+
+class StorageBackend(abc.ABC):
     """
-    Store value in S3
+    Abstract base class for storage backends.
 
-    TODO: modularize the F out of this to enable local/remote storage switch
-    based on resolver. Also enable multiple storage clients (AWS, GCP, Azure)
+    Keys are `/`-separated paths, e.g. `artifacts/<artifact ID>`.
     """
-    s3_client = boto3.client("s3")
 
-    with io.BytesIO(value) as file_obj:
-        s3_client.upload_fileobj(file_obj, _get_bucket(), key)
+    # Whether values are stored on another host, and are worth caching locally
+    is_remote = False
 
+    @abc.abstractmethod
+    def set(self, key: str, value: bytes) -> None:
+        """
+        Store value under key.
+        """
+        pass
 
-def get(key: str) -> bytes:
+    @abc.abstractmethod
+    def get(self, key: str) -> bytes:
+        """
+        Get value stored under key.
+
+        Raises
+        ------
+        KeyError
+            If nothing is stored under key.
+        """
+        pass
+
+    def get_buffer(self, key: str) -> memoryview:
+        """
+        Get a buffer of the value stored under key.
+
+        Backends storing values in local files memory-map them, so that only the
+        parts of the value which are accessed are read. The buffer remains valid
+        as long as it is referenced. It may be read-only, and writes to it are
+        never stored.
+
+        Raises
+        ------
+        KeyError
+            If nothing is stored under key.
+        """
+        return memoryview(self.get(key)).toreadonly()
+
+    def prefetch(self, key: str) -> None:
+        """
+        Make the value stored under key faster to read later, e.g. by downloading
+        it to a local cache. Does nothing by default.
+
+        Raises
+        ------
+        KeyError
+            If nothing is stored under key, when the backend checks it.
+        """
+        pass
+
+    @contextlib.contextmanager
+    def open_reader(self, key: str) -> Iterator[BinaryIO]:
+        """
+        Open a file-like object to read the value stored under key.
+
+        The default implementation reads the entire value in memory, backends
+        override it to stream values.
+
+        Raises
+        ------
+        KeyError
+            If nothing is stored under key.
+        """
+        with io.BytesIO(self.get(key)) as reader:
+            yield reader
+
+    @contextlib.contextmanager
+    def open_writer(self, key: str) -> Iterator[BinaryIO]:
+        """
+        Open a file-like object to write a value under key.
+
+        The value is only stored if the context exits without error.
+
+        The default implementation buffers the entire value in memory, backends
+        override it to stream values.
+        """
+        with io.BytesIO() as writer:
+            yield writer
+            self.set(key, writer.getvalue())
+
+
+class S3Storage(StorageBackend):
+    """
+    Stores values in the S3 bucket set in the `AWS_S3_BUCKET` user settings.
+
+    A single S3 client, safe to share across threads, is created per instance.
+    Values larger than `chunk_size` are uploaded in parts and downloaded in
+    ranges, `max_concurrency` at a time.
+
+    Parameters
+    ----------
+    chunk_size: int
+        Defaults to 8 MiB. Size of the parts of multipart uploads and of the
+        ranges of downloads. Must be at least 5 MiB, the minimum size of S3
+        parts.
+    max_concurrency: int
+        Defaults to `10`. Maximum number of parts or ranges transferred
+        concurrently by each reader or writer.
+    """
+
+    is_remote = True
+
+    def __init__(self, chunk_size: int = 8 * _MIB, max_concurrency: int = 10):
+        if chunk_size < _S3_MIN_PART_SIZE:
+            raise ValueError(
+                "chunk_size must be at least {}, got: {}".format(
+                    _S3_MIN_PART_SIZE, repr(chunk_size)
+                )
+            )
+
+        if max_concurrency < 1:
+            raise ValueError(
+                "max_concurrency must be a positive integer, got: {}".format(
+                    repr(max_concurrency)
+                )
+            )
+
+        self._chunk_size = chunk_size
+        self._max_concurrency = max_concurrency
+
+        self._client: Any = None
+        self._client_lock = threading.Lock()
+
+    def set(self, key: str, value: bytes) -> None:
+        with self.open_writer(key) as writer:
+            writer.write(value)
+
+    def get(self, key: str) -> bytes:
+        with self.open_reader(key) as reader:
+            return reader.read()
+
+    @contextlib.contextmanager
+    def open_reader(self, key: str) -> Iterator[BinaryIO]:
+        reader = _S3Reader(
+            self._get_client(),
+            _get_bucket(),
+            key,
+            chunk_size=self._chunk_size,
+            max_concurrency=self._max_concurrency,
+        )
+
+        # Buffered readers read exactly the requested size
+        with io.BufferedReader(reader) as buffered_reader:
+            yield cast(BinaryIO, buffered_reader)
+
+    @contextlib.contextmanager
+    def open_writer(self, key: str) -> Iterator[BinaryIO]:
+        writer = _S3Writer(
+            self._get_client(),
+            _get_bucket(),
+            key,
+            chunk_size=self._chunk_size,
+            max_concurrency=self._max_concurrency,
+        )
+
+        try:
+            yield cast(BinaryIO, writer)
+        except BaseException:
+            writer.abort()
+            raise
+
+        writer.close()
+
+    def _get_client(self) -> Any:
+        with self._client_lock:
+            if self._client is None:
+                self._client = _make_s3_client(
+                    # Connections are shared by all concurrent transfers
+                    max_pool_connections=max(
+                        _S3_MAX_POOL_CONNECTIONS, self._max_concurrency
+                    )
+                )
+
+            return self._client
+
+
+class _S3Reader(io.RawIOBase):
+    """
+    Reads an S3 object in ranges of `chunk_size`.
+
+    Up to `max_concurrency` ranges ahead of the current position are downloaded
+    in parallel, which bounds memory usage.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        bucket: str,
+        key: str,
+        chunk_size: int,
+        max_concurrency: int,
+    ):
+        super().__init__()
+
+        self._client = client
+        self._bucket = bucket
+        self._key = key
+        self._chunk_size = chunk_size
+        self._max_concurrency = max_concurrency
+
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._chunks: Deque[concurrent.futures.Future] = collections.deque()
+        # Offset of the next range to download
+        self._next_offset = 0
+
+        self._chunk = memoryview(b"")
+
+        try:
+            self._size = client.head_object(Bucket=bucket, Key=key)["ContentLength"]
+        except botocore.exceptions.ClientError as e:
+            self.close()
+            _raise_not_found(key, e)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        if len(self._chunk) == 0:
+            self._chunk = memoryview(self._read_chunk())
+
+        read_size = min(len(buffer), len(self._chunk))
+        buffer[:read_size] = self._chunk[:read_size]
+        self._chunk = self._chunk[read_size:]
+
+        return read_size
+
+    def readall(self) -> bytes:
+        chunks = [self._chunk.tobytes()]
+        self._chunk = memoryview(b"")
+
+        while True:
+            chunk = self._read_chunk()
+
+            if len(chunk) == 0:
+                break
+
+            chunks.append(chunk)
+
+        if len(chunks) == 2 and len(chunks[0]) == 0:
+            # Avoid copying single-range values
+            return chunks[1]
+
+        return b"".join(chunks)
+
+    def close(self) -> None:
+        for chunk in self._chunks:
+            chunk.cancel()
+
+        self._chunks.clear()
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        super().close()
+
+    def _read_chunk(self) -> bytes:
+        if self._next_offset == 0 and self._size <= self._chunk_size:
+            # Single range values are downloaded in the current thread
+            self._next_offset = self._size
+            return self._download_range(0, self._size)
+
+        self._schedule_ranges()
+
+        if len(self._chunks) == 0:
+            return b""
+
+        chunk = self._chunks.popleft().result()
+        self._schedule_ranges()
+
+        return chunk
+
+    def _schedule_ranges(self) -> None:
+        while (
+            self._next_offset < self._size and len(self._chunks) < self._max_concurrency
+        ):
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self._max_concurrency
+                )
+
+            end = min(self._next_offset + self._chunk_size, self._size)
+            self._chunks.append(
+                self._executor.submit(self._download_range, self._next_offset, end)
+            )
+            self._next_offset = end
+
+    def _download_range(self, start: int, end: int) -> bytes:
+        if start == end:
+            return b""
+
+        try:
+            response = self._client.get_object(
+                Bucket=self._bucket,
+                Key=self._key,
+                Range="bytes={}-{}".format(start, end - 1),
+            )
+        except botocore.exceptions.ClientError as e:
+            _raise_not_found(self._key, e)
+
+        return response["Body"].read()
+
+
+class _S3Writer(io.RawIOBase):
+    """
+    Writes an S3 object.
+
+    Values smaller than `chunk_size` are uploaded in a single request. Larger
+    values are uploaded in parts of `chunk_size` as they are written, up to
+    `max_concurrency` at a time, which bounds memory usage.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        bucket: str,
+        key: str,
+        chunk_size: int,
+        max_concurrency: int,
+    ):
+        super().__init__()
+
+        self._client = client
+        self._bucket = bucket
+        self._key = key
+        self._chunk_size = chunk_size
+        self._max_concurrency = max_concurrency
+
+        self._buffer = bytearray()
+        self._upload_id: Optional[str] = None
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._parts: List[concurrent.futures.Future] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, value: Any) -> int:
+        self._buffer += value
+
+        while len(self._buffer) >= self._chunk_size:
+            part = bytes(self._buffer[: self._chunk_size])
+            del self._buffer[: self._chunk_size]
+            self._upload_part(part)
+
+        return len(value)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+
+        try:
+            if self._upload_id is None:
+                self._client.put_object(
+                    Bucket=self._bucket, Key=self._key, Body=bytes(self._buffer)
+                )
+            else:
+                if len(self._buffer) > 0:
+                    self._upload_part(bytes(self._buffer))
+
+                self._client.complete_multipart_upload(
+                    Bucket=self._bucket,
+                    Key=self._key,
+                    UploadId=self._upload_id,
+                    MultipartUpload={
+                        "Parts": [
+                            dict(PartNumber=part_number, ETag=part.result())
+                            for part_number, part in enumerate(self._parts, start=1)
+                        ]
+                    },
+                )
+        except BaseException:
+            self.abort()
+            raise
+
+        self._shutdown()
+        super().close()
+
+    def abort(self) -> None:
+        """
+        Close the writer without storing the value.
+        """
+        if self.closed:
+            return
+
+        self._shutdown()
+
+        if self._upload_id is not None:
+            self._client.abort_multipart_upload(
+                Bucket=self._bucket, Key=self._key, UploadId=self._upload_id
+            )
+
+        super().close()
+
+    def _upload_part(self, part: bytes) -> None:
+        if self._upload_id is None:
+            self._upload_id = self._client.create_multipart_upload(
+                Bucket=self._bucket, Key=self._key
+            )["UploadId"]
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._max_concurrency
+            )
+
+        # Bound the number of parts in memory
+        pending_parts = [part for part in self._parts if not part.done()]
+        if len(pending_parts) >= self._max_concurrency:
+            concurrent.futures.wait(
+                pending_parts, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+
+        # Raise upload errors early
+        for uploaded_part in self._parts:
+            if uploaded_part.done():
+                uploaded_part.result()
+
+        self._parts.append(
+            cast(concurrent.futures.ThreadPoolExecutor, self._executor).submit(
+                self._send_part, len(self._parts) + 1, part
+            )
+        )
+
+    def _send_part(self, part_number: int, part: bytes) -> str:
+        return self._client.upload_part(
+            Bucket=self._bucket,
+            Key=self._key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=part,
+        )["ETag"]
+
+    def _shutdown(self) -> None:
+        if self._executor is not None:
+            for part in self._parts:
+                part.cancel()
+
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def _make_s3_client(max_pool_connections: int) -> Any:
+    # Sessions are not thread-safe, clients are
+    return boto3.session.Session().client(
+        "s3",
+        config=botocore.config.Config(
+            max_pool_connections=max_pool_connections,
+            retries={"mode": "standard"},
+        ),
+    )
+
+
+def _raise_not_found(key: str, error: botocore.exceptions.ClientError) -> NoReturn:
+    # Standardizing "Not found" errors across storage backends
+    if error.response.get("Error", {}).get("Code") in _S3_NOT_FOUND_CODES:
+        raise KeyError("{}: {}".format(key, str(error)))
+
+    raise error
+
+
+class LocalStorage(StorageBackend):
     """
-    Get value from S3.
+    Stores values in files of a local directory.
+
+    Files are written atomically: values are written to a temporary file which
+    is then renamed, so that readers never see partially written values. Since
+    artifact keys are derived from their content, concurrent writes of the same
+    key write the same value.
 
-    See TODO in `set`.
+    Parameters
+    ----------
+    root_dir: Optional[str]
+        Defaults to the `data` directory of the Sematic config directory
+        (typically `~/.sematic/data`).
     """
-    s3_client = boto3.client("s3")
 
-    file_obj = io.BytesIO()
+    def __init__(self, root_dir: Optional[str] = None):
+        if root_dir is None:
+            root_dir = os.path.join(get_config_dir(), _LOCAL_STORAGE_DIR)
+
+        self._root_dir = os.path.abspath(root_dir)
+
+    def set(self, key: str, value: bytes) -> None:
+        with self.open_writer(key) as writer:
+            writer.write(value)
+
+    def get(self, key: str) -> bytes:
+        with self.open_reader(key) as reader:
+            # Empty files cannot be memory-mapped
+            if os.fstat(reader.fileno()).st_size == 0:
+                return b""
+
+            with mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                return mapped_file[:]
+
+    def get_buffer(self, key: str) -> memoryview:
+        with self.open_reader(key) as reader:
+            # Empty files cannot be memory-mapped
+            if os.fstat(reader.fileno()).st_size == 0:
+                return memoryview(b"")
+
+            # The mapping is closed when the buffer is garbage collected. Pages
+            # are copied on write, so that values can be modified in place
+            # without modifying the stored file.
+            return memoryview(mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_COPY))
 
-    try:
-        s3_client.download_fileobj(_get_bucket(), key, file_obj)
-    except botocore.exceptions.ClientError as e:
-        # Standardizing "Not found" errors across storage backends
-        if "404" in str(e):
+    @contextlib.contextmanager
+    def open_reader(self, key: str) -> Iterator[BinaryIO]:
+        try:
+            reader = open(self._get_path(key), "rb")
+        except FileNotFoundError as e:
+            # Standardizing "Not found" errors across storage backends
             raise KeyError("{}: {}".format(key, str(e)))
 
-        raise e
+        with reader:
+            yield reader
+
+    @contextlib.contextmanager
+    def open_writer(self, key: str) -> Iterator[BinaryIO]:
+        path = self._get_path(key)
+        dir_path = os.path.dirname(path)
+
+        os.makedirs(dir_path, exist_ok=True)
+
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=dir_path, prefix=".{}.".format(os.path.basename(path))
+        )
+
+        try:
+            with os.fdopen(file_descriptor, "wb") as writer:
+                yield writer
+
+            # Temporary files are only readable by their owner
+            os.chmod(temp_path, _LOCAL_STORAGE_FILE_MODE)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def _get_path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self._root_dir, key))
+
+        if os.path.commonpath([self._root_dir, path]) != self._root_dir:
+            raise ValueError(
+                "Invalid storage key {}: outside of {}".format(
+                    repr(key), self._root_dir
+                )
+            )
 
-    return file_obj.getvalue()
+        return path
+
+
+class MemoryStorage(StorageBackend):
+    """
+    Stores values in memory, for the lifetime of the process.
+    """
+
+    def __init__(self):
+        self._values: Dict[str, bytes] = {}
+
+    def set(self, key: str, value: bytes) -> None:
+        self._values[key] = value
+
+    def get(self, key: str) -> bytes:
+        return self._values[key]
+
+
+class CachedStorage(StorageBackend):
+    """
+    Read-through cache of artifact values in a local directory, in front of
+    another storage backend. Written values are not cached.
+
+    Artifact keys are derived from their content, so cached values never need
+    to be invalidated. Values are written to the cache atomically, which makes
+    it safe to share a cache directory between processes.
+
+    When the cache exceeds `max_size_bytes`, the least recently used values are
+    evicted. Values are marked as used by updating their modification time.
+
+    Parameters
+    ----------
+    storage: StorageBackend
+        The backend values are read from and written to.
+    cache_dir: Optional[str]
+        Defaults to the `cache` directory of the Sematic config directory
+        (typically `~/.sematic/cache`).
+    max_size_bytes: int
+        Defaults to 10 GiB. Size of the cache above which values are evicted.
+    """
+
+    def __init__(
+        self,
+        storage: StorageBackend,
+        cache_dir: Optional[str] = None,
+        max_size_bytes: int = 10 * 1024 * _MIB,
+    ):
+        if max_size_bytes < 0:
+            raise ValueError(
+                "max_size_bytes must be positive, got: {}".format(repr(max_size_bytes))
+            )
+
+        if cache_dir is None:
+            cache_dir = os.path.join(get_config_dir(), _LOCAL_CACHE_DIR)
+
+        self._storage = storage
+        self._cache = LocalStorage(root_dir=cache_dir)
+        self._max_size_bytes = max_size_bytes
+
+        # Estimate of the cache size, only values written by this process are
+        # added to it between two evictions.
+        self._size_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.hits_count = 0
+        self.misses_count = 0
+
+    def set(self, key: str, value: bytes) -> None:
+        # Values are only cached when read, workers mostly write values that
+        # are read by other pods.
+        self._storage.set(key, value)
+
+    def get(self, key: str) -> bytes:
+        if not _is_cached_key(key):
+            return self._storage.get(key)
+
+        try:
+            value = self._cache.get(key)
+        except KeyError:
+            self._count(is_hit=False)
+        else:
+            self._count(is_hit=True)
+            self._touch(key)
+            return value
+
+        value = self._storage.get(key)
+        self._add_to_cache(key, value)
+
+        return value
+
+    def get_buffer(self, key: str) -> memoryview:
+        if not _is_cached_key(key):
+            return self._storage.get_buffer(key)
+
+        try:
+            buffer = self._cache.get_buffer(key)
+        except KeyError:
+            self._count(is_hit=False)
+            # Values are memory-mapped from the cache rather than kept in memory
+            self._stream_to_cache(key)
+            return self._cache.get_buffer(key)
+
+        self._count(is_hit=True)
+        self._touch(key)
+
+        return buffer
+
+    def prefetch(self, key: str) -> None:
+        if not _is_cached_key(key) or os.path.exists(self._cache._get_path(key)):
+            return
+
+        self._count(is_hit=False)
+        self._stream_to_cache(key)
+
+    @contextlib.contextmanager
+    def open_reader(self, key: str) -> Iterator[BinaryIO]:
+        if not _is_cached_key(key):
+            with self._storage.open_reader(key) as reader:
+                yield reader
+            return
+
+        with contextlib.ExitStack() as exit_stack:
+            try:
+                reader = exit_stack.enter_context(self._cache.open_reader(key))
+            except KeyError:
+                self._count(is_hit=False)
+                self._stream_to_cache(key)
+                reader = exit_stack.enter_context(self._cache.open_reader(key))
+            else:
+                self._count(is_hit=True)
+                self._touch(key)
+
+            yield reader
+
+    @contextlib.contextmanager
+    def open_writer(self, key: str) -> Iterator[BinaryIO]:
+        # Streamed values are only cached when read
+        with self._storage.open_writer(key) as writer:
+            yield writer
+
+    def _stream_to_cache(self, key: str) -> None:
+        with self._storage.open_reader(key) as reader, self._cache.open_writer(
+            key
+        ) as writer:
+            shutil.copyfileobj(reader, writer, _COPY_BUFFER_SIZE)
+            size = writer.tell()
+
+        self._add_size(size)
+
+    def _add_to_cache(self, key: str, value: bytes) -> None:
+        self._cache.set(key, value)
+        self._add_size(len(value))
+
+    def _count(self, is_hit: bool) -> None:
+        with self._lock:
+            if is_hit:
+                self.hits_count += 1
+            else:
+                self.misses_count += 1
+
+    def _touch(self, key: str) -> None:
+        try:
+            os.utime(self._cache._get_path(key))
+        except FileNotFoundError:
+            # Evicted by another process
+            pass
+
+    def _add_size(self, size: int) -> None:
+        with self._lock:
+            if self._size_bytes is None:
+                self._size_bytes = self._get_cache_size()
+            else:
+                self._size_bytes += size
+
+            if self._size_bytes > self._max_size_bytes:
+                self._size_bytes = self._evict()
+
+    def _list_cached_files(self) -> List[Tuple[float, int, str]]:
+        """
+        List modification time, size and path of cached files.
+        """
+        cached_files = []
+
+        for dir_path, _, file_names in os.walk(self._cache._root_dir):
+            for file_name in file_names:
+                # Temporary files of ongoing writes
+                if file_name.startswith("."):
+                    continue
+
+                path = os.path.join(dir_path, file_name)
+
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+
+                cached_files.append((stat.st_mtime, stat.st_size, path))
+
+        return cached_files
+
+    def _get_cache_size(self) -> int:
+        return sum(size for _, size, _ in self._list_cached_files())
+
+    def _evict(self) -> int:
+        """
+        Remove least recently used files until the cache fits in its size budget.
+
+        Returns the size of the cache.
+        """
+        cached_files = sorted(self._list_cached_files())
+        size_bytes = sum(size for _, size, _ in cached_files)
+
+        for _, size, path in cached_files:
+            if size_bytes <= self._max_size_bytes:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # Evicted by another process
+                pass
+
+            size_bytes -= size
+
+        return size_bytes
+
+
+class CompressedStorage(StorageBackend):
+    """
+    Compresses values stored in another storage backend.
+
+    Compressed values start with a header recording their codec. Values are
+    decompressed according to their header when read, values without a header
+    are read as-is.
+
+    Parameters
+    ----------
+    storage: StorageBackend
+        The backend values are read from and written to.
+    codec_name: Optional[str]
+        Defaults to `"zlib"`. One of the codecs of `sematic.compression`, e.g.
+        `"zlib"`, `"gzip"`, `"zstd"` or `"lz4"`.
+    min_size_bytes: int
+        Defaults to 4 KiB. Values smaller than this are stored uncompressed.
+    """
+
+    def __init__(
+        self,
+        storage: StorageBackend,
+        codec_name: str = DEFAULT_CODEC_NAME,
+        min_size_bytes: int = DEFAULT_MIN_SIZE_BYTES,
+    ):
+        # Fail early on unknown codecs
+        get_codec(codec_name)
+
+        self._storage = storage
+        self._codec_name = codec_name
+        self._min_size_bytes = min_size_bytes
+        self.is_remote = storage.is_remote
+
+    def set(self, key: str, value: bytes) -> None:
+        self._storage.set(key, compress(value, self._codec_name, self._min_size_bytes))
+
+    def get(self, key: str) -> bytes:
+        return decompress(self._storage.get(key))
+
+    @contextlib.contextmanager
+    def open_reader(self, key: str) -> Iterator[BinaryIO]:
+        with self._storage.open_reader(key) as reader:
+            with io.BufferedReader(
+                DecompressingReader(reader), _COPY_BUFFER_SIZE
+            ) as decompressing_reader:
+                yield cast(BinaryIO, decompressing_reader)
+
+    @contextlib.contextmanager
+    def open_writer(self, key: str) -> Iterator[BinaryIO]:
+        with self._storage.open_writer(key) as writer:
+            with CompressingWriter(
+                writer, self._codec_name, self._min_size_bytes
+            ) as compressing_writer:
+                yield cast(BinaryIO, compressing_writer)
+
+
+def _is_cached_key(key: str) -> bool:
+    return key.startswith(_CACHED_KEY_PREFIX)
+
+
+_STORAGE_BACKENDS: Dict[str, Type[StorageBackend]] = {
+    "s3": S3Storage,
+    "local": LocalStorage,
+    "memory": MemoryStorage,
+}
+
+# Backends are instantiated once per process
+_NO_COMPRESSION = "none"
+
+_storages: Dict[str, StorageBackend] = {}
+# Caches by ID of the backend they are in front of
+_cached_storages: Dict[int, "CachedStorage"] = {}
+_storages_lock = threading.Lock()
+
+
+def get_storage(default: str = "s3") -> StorageBackend:
+    """
+    Get the storage backend selected with the `SEMATIC_STORAGE` user settings.
+
+    Values stored in remote backends are compressed with the codec set in the
+    `SEMATIC_STORAGE_COMPRESSION` user settings, `"none"` to disable compression.
+
+    Parameters
+    ----------
+    default: str
+        Defaults to `"s3"`. Backend to use if `SEMATIC_STORAGE` is not set. One of
+        `"s3"`, `"local"` or `"memory"`.
+    """
+    storage_name = get_user_settings(SettingsVar.SEMATIC_STORAGE, default)
+
+    if storage_name not in _STORAGE_BACKENDS:
+        raise ValueError(
+            "Unknown storage {}, expected one of: {}".format(
+                repr(storage_name), ", ".join(map(repr, _STORAGE_BACKENDS))
+            )
+        )
+
+    with _storages_lock:
+        if storage_name not in _storages:
+            _storages[storage_name] = _make_storage(storage_name)
+
+        return _storages[storage_name]
+
+
+def _make_storage(storage_name: str) -> StorageBackend:
+    storage = _STORAGE_BACKENDS[storage_name]()
+
+    # Local backends are not worth compressing
+    if not storage.is_remote:
+        return storage
+
+    codec_name = get_user_settings(
+        SettingsVar.SEMATIC_STORAGE_COMPRESSION, DEFAULT_CODEC_NAME
+    )
+
+    if codec_name == _NO_COMPRESSION:
+        return storage
+
+    return CompressedStorage(storage, codec_name)
+
+
+def get_cached_storage() -> StorageBackend:
+    """
+    Get the storage backend selected with the `SEMATIC_STORAGE` user settings,
+    behind a `CachedStorage` if it is remote.
+    """
+    storage = get_storage()
+
+    # Local backends are not worth caching
+    if not storage.is_remote:
+        return storage
+
+    with _storages_lock:
+        cached_storage = _cached_storages.get(id(storage))
+
+        if cached_storage is None:
+            cached_storage = _cached_storages[id(storage)] = CachedStorage(storage)
+
+        return cached_storage
+
+
+def set(key: str, value: bytes):
+    """
+    Store value in the storage backend selected by user settings.
+    """
+    get_storage().set(key, value)
+
+
+def get(key: str) -> bytes:
+    """
+    Get value from the storage backend selected by user settings.
+
+    Raises
+    ------
+    KeyError
+        If nothing is stored under key.
+    """
+    return get_storage().get(key)
+
+
+def open_reader(key: str) -> ContextManager[BinaryIO]:
+    """
+    Open a file-like object to read a value from the storage backend selected by
+    user settings.
+
+    Raises
+    ------
+    KeyError
+        If nothing is stored under key.
+    """
+    return get_storage().open_reader(key)
+
+
+def open_writer(key: str) -> ContextManager[BinaryIO]:
+    """
+    Open a file-like object to write a value to the storage backend selected by
+    user settings.
+    """
+    return get_storage().open_writer(key)
+
+
+def _get_bucket() -> str:
+    return get_user_settings(SettingsVar.AWS_S3_BUCKET)
@@ -0,0 +1,54 @@
+"""
+Helpers of benchmark tests.
+
+Benchmarks compare wall-clock times, which depend on the machine and make the
+test suite slower, so they only run when the `SEMATIC_BENCHMARK` environment
+variable is set:
+
+```
+SEMATIC_BENCHMARK=1 python -m pytest sematic/resolvers/tests/test_silent_resolver.py
+bazel test //sematic/... --test_env=SEMATIC_BENCHMARK=1
+```
+"""
+# Standard Library
+import os
+import time
+import tracemalloc
+from typing import Any, Callable
+
+# Third-party
+import pytest
+
+benchmark = pytest.mark.skipif(
+    os.environ.get("SEMATIC_BENCHMARK") is None,
+    reason="Benchmarks only run when SEMATIC_BENCHMARK is set",
+)
+
+
+def measure_time(function: Callable[[], Any], repeat: int = 3) -> float:
+    """
+    Best wall-clock time of `repeat` calls of `function`, in seconds.
+    """
+    durations = []
+
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - started_at)
+
+    return min(durations)
+
+
+def measure_peak_memory(function: Callable[[], Any]) -> int:
+    """
+    Peak memory allocated by Python during a call of `function`, in bytes.
+    """
+    tracemalloc.start()
+
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak
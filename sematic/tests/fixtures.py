@@ -2,6 +2,7 @@
 import contextlib
 import os
 from typing import Dict, Optional
+from unittest import mock
 
 # Third-party
 import pytest
@@ -13,25 +14,13 @@ import sematic.storage as storage
 
 @pytest.fixture(scope="function")
 def test_storage():
-    current_set = storage.set
-    current_get = storage.get
+    memory_storage = storage.MemoryStorage()
 
-    store = {}
-
-    def _set(key, value):
-        store[key] = value
-
-    def _get(key):
-        return store[key]
-
-    storage.set = _set
-    storage.get = _get
-
-    try:
-        yield
-    finally:
-        storage.set = current_set
-        storage.get = current_get
+    # All storage backends selected by user settings are replaced
+    with mock.patch.dict(
+        storage._storages, {name: memory_storage for name in storage._STORAGE_BACKENDS}
+    ):
+        yield memory_storage
 
 
 @pytest.fixture
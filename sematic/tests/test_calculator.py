@@ -105,6 +105,20 @@ def test_missing_types():
             pass
 
 
+def test_max_concurrency():
+    @func(inline=False, max_concurrency=2)
+    def f(a: float) -> float:
+        return a
+
+    assert f(1).props.max_concurrency == 2
+
+    with pytest.raises(ValueError, match="max_concurrency must be a positive integer"):
+
+        @func(max_concurrency=0)
+        def g(a: float) -> float:
+            return a
+
+
 def test_call_fail_cast():
     @func
     def f(a: float) -> float:
@@ -0,0 +1,162 @@
+# Standard Library
+import io
+import json
+import os
+import pickle
+
+# Third-party
+import pytest
+
+# Sematic
+from sematic.compression import (
+    _CODECS,
+    CompressingWriter,
+    DecompressingReader,
+    compress,
+    decompress,
+    is_compressed,
+)
+from sematic.tests.benchmark import benchmark, measure_time
+
+_CODEC_NAMES = list(_CODECS)
+
+_COMPRESSIBLE_PAYLOAD = json.dumps([float(i) for i in range(10000)]).encode("utf-8")
+
+
+@pytest.mark.parametrize("codec_name", _CODEC_NAMES)
+def test_compress(codec_name: str):
+    compressed = compress(_COMPRESSIBLE_PAYLOAD, codec_name)
+
+    assert is_compressed(compressed)
+    assert len(compressed) < len(_COMPRESSIBLE_PAYLOAD) / 2
+    assert decompress(compressed) == _COMPRESSIBLE_PAYLOAD
+
+
+@pytest.mark.parametrize("payload", (b"", b"foo", os.urandom(10000)))
+def test_compress_skipped(payload: bytes):
+    """
+    Small and incompressible payloads are not compressed.
+    """
+    compressed = compress(payload, "zlib")
+
+    assert compressed == payload
+    assert not is_compressed(compressed)
+    assert decompress(compressed) == payload
+
+
+def test_compress_min_size_bytes():
+    assert compress(_COMPRESSIBLE_PAYLOAD, "zlib", min_size_bytes=10**6) == (
+        _COMPRESSIBLE_PAYLOAD
+    )
+
+
+def test_compress_unknown_codec():
+    with pytest.raises(ValueError, match="Unknown compression codec 'rar'"):
+        compress(_COMPRESSIBLE_PAYLOAD, "rar")
+
+
+def _write(payload: bytes, codec_name: str, write_size: int) -> bytes:
+    output = io.BytesIO()
+
+    with CompressingWriter(output, codec_name) as writer:
+        for index in range(0, len(payload), write_size):
+            end = index + write_size
+            writer.write(payload[index:end])
+
+    return output.getvalue()
+
+
+@pytest.mark.parametrize("codec_name", _CODEC_NAMES)
+@pytest.mark.parametrize("payload", (b"", b"foo", _COMPRESSIBLE_PAYLOAD))
+def test_streaming(codec_name: str, payload: bytes):
+    compressed = _write(payload, codec_name, write_size=1000)
+
+    assert is_compressed(compressed) == (len(payload) > 4096)
+    assert decompress(compressed) == payload
+
+    reader = io.BufferedReader(DecompressingReader(io.BytesIO(compressed)))
+
+    assert reader.read(10) == payload[:10]
+    assert reader.read() == payload[10:]
+
+
+def _make_json_payload() -> bytes:
+    values = [{"x": float(i), "y": i % 7, "label": str(i % 3)} for i in range(100000)]
+
+    return json.dumps(values, sort_keys=True).encode("utf-8")
+
+
+def _make_dataframe_payload() -> bytes:
+    pandas = pytest.importorskip("pandas")
+
+    dataframe = pandas.DataFrame(
+        {
+            "id": range(200000),
+            "category": [str(i % 10) for i in range(200000)],
+            "value": [i / 3 for i in range(200000)],
+        }
+    )
+
+    return pickle.dumps(dataframe)
+
+
+def _make_random_payload() -> bytes:
+    # e.g. images or already compressed data
+    return os.urandom(5 * 1024 * 1024)
+
+
+@pytest.mark.parametrize(
+    "make_payload", (_make_json_payload, _make_dataframe_payload, _make_random_payload)
+)
+def test_compression_ratio(make_payload):
+    """
+    Compression of each codec on representative artifact payloads.
+    """
+    payload = make_payload()
+
+    for codec_name in _CODEC_NAMES:
+        compressed = compress(payload, codec_name)
+
+        assert decompress(compressed) == payload
+
+        if make_payload is _make_random_payload:
+            assert compressed == payload
+        else:
+            assert len(compressed) < len(payload) / 2
+
+
+# Conservative throughput of transfers between workers and storage
+_BANDWIDTH_MIB_PER_SECOND = 25
+
+
+@benchmark
+@pytest.mark.parametrize(
+    "make_payload", (_make_json_payload, _make_dataframe_payload, _make_random_payload)
+)
+def test_compression_benchmark(make_payload):
+    """
+    Benchmark of the throughput against ratio of each codec, on representative
+    artifact payloads.
+
+    Compressing, transferring and decompressing compressible payloads is faster
+    than transferring them uncompressed. Incompressible payloads are skipped at
+    a small fraction of their transfer time.
+    """
+    payload = make_payload()
+    size_mib = len(payload) / 1024 / 1024
+    transfer_time = size_mib / _BANDWIDTH_MIB_PER_SECOND
+
+    for codec_name in _CODEC_NAMES:
+        compressed = compress(payload, codec_name)
+
+        compress_time = measure_time(lambda: compress(payload, codec_name))
+        decompress_time = measure_time(lambda: decompress(compressed))
+        compressed_transfer_time = transfer_time * len(compressed) / len(payload)
+
+        if make_payload is _make_random_payload:
+            assert compress_time + decompress_time < transfer_time / 5
+        else:
+            assert (
+                compress_time + compressed_transfer_time + decompress_time
+                < transfer_time
+            )
@@ -0,0 +1,608 @@
+# Standard Library
+import concurrent.futures
+import io
+import mmap
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+from unittest import mock
+
+# Third-party
+import botocore.exceptions
+import pytest
+
+# Sematic
+import sematic.storage as storage
+from sematic.storage import (
+    CachedStorage,
+    CompressedStorage,
+    LocalStorage,
+    MemoryStorage,
+    S3Storage,
+    get_cached_storage,
+    get_storage,
+)
+from sematic.user_settings import SettingsVar
+
+_MIB = 1024 * 1024
+
+
+@pytest.fixture
+def local_storage(tmp_path):
+    return LocalStorage(root_dir=str(tmp_path))
+
+
+@pytest.mark.parametrize("value", (b"foo", b""))
+def test_local_storage(local_storage: LocalStorage, tmp_path, value: bytes):
+    local_storage.set("artifacts/123", value)
+
+    assert local_storage.get("artifacts/123") == value
+    # No temporary files are left behind
+    assert os.listdir(tmp_path / "artifacts") == ["123"]
+
+
+def test_local_storage_overwrite(local_storage: LocalStorage):
+    local_storage.set("futures/123", b"foo")
+    local_storage.set("futures/123", b"bar")
+
+    assert local_storage.get("futures/123") == b"bar"
+
+
+def test_local_storage_missing_key(local_storage: LocalStorage):
+    with pytest.raises(KeyError, match="artifacts/123"):
+        local_storage.get("artifacts/123")
+
+
+def test_local_storage_invalid_key(local_storage: LocalStorage):
+    with pytest.raises(ValueError, match="outside of"):
+        local_storage.set("../123", b"foo")
+
+
+def test_local_storage_failed_write(local_storage: LocalStorage, tmp_path):
+    with mock.patch("os.replace", side_effect=OSError("disk full")):
+        with pytest.raises(OSError, match="disk full"):
+            local_storage.set("artifacts/123", b"foo")
+
+    assert os.listdir(tmp_path / "artifacts") == []
+
+    with pytest.raises(KeyError):
+        local_storage.get("artifacts/123")
+
+
+def test_memory_storage():
+    memory_storage = MemoryStorage()
+    memory_storage.set("artifacts/123", b"foo")
+
+    assert memory_storage.get("artifacts/123") == b"foo"
+
+    with pytest.raises(KeyError):
+        memory_storage.get("artifacts/456")
+
+
+def test_get_storage():
+    with mock.patch.dict(storage._storages, clear=True), mock.patch(
+        "sematic.storage.get_user_settings", side_effect=lambda var, default: default
+    ):
+        assert isinstance(get_storage("memory"), MemoryStorage)
+        assert get_storage("memory") is get_storage("memory")
+        assert isinstance(get_storage(), CompressedStorage)
+        assert isinstance(get_storage()._storage, storage.S3Storage)
+
+
+def test_get_storage_settings():
+    with mock.patch.dict(storage._storages, clear=True), mock.patch(
+        "sematic.storage.get_user_settings", return_value="memory"
+    ):
+        assert isinstance(get_storage(), MemoryStorage)
+
+        storage.set("artifacts/123", b"foo")
+        assert storage.get("artifacts/123") == b"foo"
+
+
+def _mock_user_settings(settings: Dict[SettingsVar, str]):
+    return mock.patch(
+        "sematic.storage.get_user_settings",
+        side_effect=lambda var, default: settings.get(var, default),
+    )
+
+
+def test_get_storage_compression():
+    # Codecs which are not always available must be selected explicitly
+    with mock.patch.dict(storage._storages, clear=True), _mock_user_settings({}):
+        assert get_storage()._codec_name == "zlib"
+
+    with mock.patch.dict(storage._storages, clear=True), _mock_user_settings(
+        {SettingsVar.SEMATIC_STORAGE_COMPRESSION: "gzip"}
+    ):
+        assert get_storage()._codec_name == "gzip"
+        assert isinstance(get_storage("local"), LocalStorage)
+
+    with mock.patch.dict(storage._storages, clear=True), _mock_user_settings(
+        {SettingsVar.SEMATIC_STORAGE_COMPRESSION: "none"}
+    ):
+        assert isinstance(get_storage(), storage.S3Storage)
+
+    with mock.patch.dict(storage._storages, clear=True), _mock_user_settings(
+        {SettingsVar.SEMATIC_STORAGE_COMPRESSION: "rar"}
+    ):
+        with pytest.raises(ValueError, match="Unknown compression codec 'rar'"):
+            get_storage()
+
+
+def test_get_storage_invalid_settings():
+    with mock.patch("sematic.storage.get_user_settings", return_value="gcs"):
+        with pytest.raises(ValueError, match="Unknown storage 'gcs'"):
+            get_storage()
+
+
+def test_default_open_reader_writer():
+    memory_storage = MemoryStorage()
+
+    with memory_storage.open_writer("artifacts/123") as writer:
+        writer.write(b"foo")
+        writer.write(b"bar")
+
+    with memory_storage.open_reader("artifacts/123") as reader:
+        assert reader.read() == b"foobar"
+
+    with pytest.raises(ValueError):
+        with memory_storage.open_writer("artifacts/456") as writer:
+            writer.write(b"foo")
+            raise ValueError()
+
+    with pytest.raises(KeyError):
+        memory_storage.get("artifacts/456")
+
+
+def test_local_storage_streaming(local_storage: LocalStorage, tmp_path):
+    with local_storage.open_writer("artifacts/123") as writer:
+        writer.write(b"foo")
+
+        # Not visible until the writer is closed
+        with pytest.raises(KeyError):
+            local_storage.get("artifacts/123")
+
+    with local_storage.open_reader("artifacts/123") as reader:
+        assert reader.read() == b"foo"
+
+    with pytest.raises(ValueError):
+        with local_storage.open_writer("artifacts/456") as writer:
+            writer.write(b"foo")
+            raise ValueError()
+
+    assert os.listdir(tmp_path / "artifacts") == ["123"]
+
+
+class FakeS3Client:
+    """
+    Local S3 stand-in implementing the subset of the S3 API used by `S3Storage`.
+    """
+
+    def __init__(self):
+        self.objects: Dict[Tuple[str, str], bytes] = {}
+        self.uploads: Dict[str, Dict[int, bytes]] = {}
+        self.requests: List[str] = []
+        self._lock = threading.Lock()
+
+    def head_object(self, Bucket: str, Key: str):
+        self._log("head_object")
+        return {"ContentLength": len(self._get_object(Bucket, Key, "HeadObject"))}
+
+    def get_object(self, Bucket: str, Key: str, Range: Optional[str] = None):
+        self._log("get_object")
+        value = self._get_object(Bucket, Key, "GetObject")
+
+        if Range is not None:
+            # Range ends are inclusive
+            start, last = map(int, Range.replace("bytes=", "").split("-"))
+            end = last + 1
+            value = value[start:end]
+
+        return {"Body": io.BytesIO(value)}
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes):
+        self._log("put_object")
+        self.objects[(Bucket, Key)] = Body
+
+    def create_multipart_upload(self, Bucket: str, Key: str):
+        self._log("create_multipart_upload")
+
+        with self._lock:
+            upload_id = str(len(self.uploads))
+            self.uploads[upload_id] = {}
+
+        return {"UploadId": upload_id}
+
+    def upload_part(
+        self, Bucket: str, Key: str, UploadId: str, PartNumber: int, Body: bytes
+    ):
+        self._log("upload_part")
+        self.uploads[UploadId][PartNumber] = Body
+
+        return {"ETag": "etag-{}".format(PartNumber)}
+
+    def complete_multipart_upload(
+        self, Bucket: str, Key: str, UploadId: str, MultipartUpload
+    ):
+        self._log("complete_multipart_upload")
+        parts = self.uploads.pop(UploadId)
+        part_numbers = [part["PartNumber"] for part in MultipartUpload["Parts"]]
+
+        assert part_numbers == sorted(parts)
+        assert all(
+            part["ETag"] == "etag-{}".format(part["PartNumber"])
+            for part in MultipartUpload["Parts"]
+        )
+        assert all(len(parts[number]) >= 5 * _MIB for number in part_numbers[:-1])
+
+        self.objects[(Bucket, Key)] = b"".join(parts[number] for number in part_numbers)
+
+    def abort_multipart_upload(self, Bucket: str, Key: str, UploadId: str):
+        self._log("abort_multipart_upload")
+        del self.uploads[UploadId]
+
+    def _get_object(self, bucket: str, key: str, operation_name: str) -> bytes:
+        try:
+            return self.objects[(bucket, key)]
+        except KeyError:
+            raise botocore.exceptions.ClientError(
+                {"Error": {"Code": "404", "Message": "Not Found"}}, operation_name
+            )
+
+    def _log(self, request: str):
+        with self._lock:
+            self.requests.append(request)
+
+
+@pytest.fixture
+def s3_client():
+    s3_client = FakeS3Client()
+
+    with mock.patch(
+        "sematic.storage._make_s3_client", return_value=s3_client
+    ) as mock_make_s3_client, mock.patch(
+        "sematic.storage._get_bucket", return_value="bucket"
+    ):
+        yield s3_client
+
+    # The client is created once and reused
+    assert mock_make_s3_client.call_count <= 1
+
+
+def test_s3_storage_small_value(s3_client: FakeS3Client):
+    s3_storage = S3Storage()
+
+    s3_storage.set("artifacts/123", b"foo")
+    assert s3_storage.get("artifacts/123") == b"foo"
+
+    assert s3_client.requests == ["put_object", "head_object", "get_object"]
+
+
+def test_s3_storage_multipart(s3_client: FakeS3Client):
+    s3_storage = S3Storage(chunk_size=5 * _MIB, max_concurrency=2)
+    value = os.urandom(17 * _MIB)
+
+    with s3_storage.open_writer("artifacts/123") as writer:
+        # Writes which do not align with parts
+        for start in range(0, len(value), 3 * _MIB):
+            end = start + 3 * _MIB
+            writer.write(value[start:end])
+
+    assert s3_client.requests.count("upload_part") == 4
+    assert s3_client.uploads == {}
+
+    assert s3_storage.get("artifacts/123") == value
+
+    with s3_storage.open_reader("artifacts/123") as reader:
+        # Reads which do not align with ranges
+        first_read, second_read = _MIB, 6 * _MIB
+
+        assert reader.read(first_read) == value[:first_read]
+        assert reader.read(second_read - first_read) == value[first_read:second_read]
+        assert reader.read() == value[second_read:]
+        assert reader.read() == b""
+
+    # Ranges of at most chunk_size
+    assert s3_client.requests.count("get_object") == 8
+
+
+def test_s3_storage_multipart_abort(s3_client: FakeS3Client):
+    s3_storage = S3Storage(chunk_size=5 * _MIB)
+
+    with pytest.raises(ValueError):
+        with s3_storage.open_writer("artifacts/123") as writer:
+            writer.write(os.urandom(6 * _MIB))
+            raise ValueError()
+
+    assert "abort_multipart_upload" in s3_client.requests
+    assert s3_client.uploads == {}
+    assert s3_client.objects == {}
+
+
+def test_s3_storage_missing_key(s3_client: FakeS3Client):
+    with pytest.raises(KeyError, match="artifacts/123"):
+        S3Storage().get("artifacts/123")
+
+
+@pytest.mark.parametrize("kwargs", ({"chunk_size": _MIB}, {"max_concurrency": 0}))
+def test_s3_storage_invalid_params(kwargs):
+    with pytest.raises(ValueError):
+        S3Storage(**kwargs)
+
+
+@pytest.fixture
+def cached_storage(tmp_path):
+    return CachedStorage(MemoryStorage(), cache_dir=str(tmp_path), max_size_bytes=10)
+
+
+def test_cached_storage(cached_storage: CachedStorage):
+    cached_storage._storage.set("artifacts/123", b"foo")
+
+    assert cached_storage.get("artifacts/123") == b"foo"
+    assert (cached_storage.hits_count, cached_storage.misses_count) == (0, 1)
+
+    assert cached_storage.get("artifacts/123") == b"foo"
+    assert (cached_storage.hits_count, cached_storage.misses_count) == (1, 1)
+
+    with cached_storage.open_reader("artifacts/123") as reader:
+        assert reader.read() == b"foo"
+
+    assert (cached_storage.hits_count, cached_storage.misses_count) == (2, 1)
+
+    # Values are only fetched once
+    with mock.patch.object(cached_storage._storage, "get") as mock_get:
+        assert cached_storage.get("artifacts/123") == b"foo"
+
+    mock_get.assert_not_called()
+
+
+def test_cached_storage_streaming(cached_storage: CachedStorage):
+    with cached_storage.open_writer("artifacts/123") as writer:
+        writer.write(b"foo")
+
+    with cached_storage.open_reader("artifacts/123") as reader:
+        assert reader.read() == b"foo"
+
+    assert (cached_storage.hits_count, cached_storage.misses_count) == (0, 1)
+    assert cached_storage.get("artifacts/123") == b"foo"
+    assert (cached_storage.hits_count, cached_storage.misses_count) == (1, 1)
+
+
+def test_cached_storage_set(cached_storage: CachedStorage, tmp_path):
+    cached_storage.set("artifacts/123", b"foo")
+
+    # Values are written to the backend only, and cached when read
+    assert cached_storage._storage.get("artifacts/123") == b"foo"
+    assert not (tmp_path / "artifacts" / "123").exists()
+
+    assert cached_storage.get("artifacts/123") == b"foo"
+    assert cached_storage.get("artifacts/123") == b"foo"
+    assert (cached_storage.hits_count, cached_storage.misses_count) == (1, 1)
+
+
+def test_cached_storage_uncached_keys(cached_storage: CachedStorage):
+    cached_storage.set("futures/123", b"foo")
+
+    assert cached_storage.get("futures/123") == b"foo"
+    assert cached_storage.get("futures/123") == b"foo"
+    assert (cached_storage.hits_count, cached_storage.misses_count) == (0, 0)
+
+    with pytest.raises(KeyError):
+        cached_storage.get("artifacts/456")
+
+
+def test_cached_storage_eviction(cached_storage: CachedStorage, tmp_path):
+    for key in ("1", "2", "3"):
+        cached_storage._storage.set("artifacts/{}".format(key), b"1234")
+
+    cached_storage.get("artifacts/1")
+    # Make modification times distinct
+    os.utime(tmp_path / "artifacts" / "1", (0, 0))
+    cached_storage.get("artifacts/2")
+    os.utime(tmp_path / "artifacts" / "2", (1, 1))
+    # Marks 1 as used
+    cached_storage.get("artifacts/1")
+    cached_storage.get("artifacts/3")
+
+    # The least recently used value was evicted to fit in 10 bytes
+    assert sorted(os.listdir(tmp_path / "artifacts")) == ["1", "3"]
+    assert cached_storage._size_bytes == 8
+
+    assert cached_storage.get("artifacts/2") == b"1234"
+    assert (cached_storage.hits_count, cached_storage.misses_count) == (1, 4)
+
+
+def _read_cached_values(cache_dir: str, values: Dict[str, bytes]) -> bool:
+    backend = MemoryStorage()
+
+    for key, value in values.items():
+        backend.set(key, value)
+
+    cached_storage = CachedStorage(backend, cache_dir=cache_dir, max_size_bytes=300)
+
+    return all(
+        cached_storage.get(key) == value
+        for _ in range(20)
+        for key, value in values.items()
+    )
+
+
+def test_cached_storage_processes(tmp_path):
+    values = {"artifacts/{}".format(i): os.urandom(100) for i in range(10)}
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=4) as executor:
+        results = list(
+            executor.map(_read_cached_values, [str(tmp_path)] * 4, [values] * 4)
+        )
+
+    assert all(results)
+    # No temporary files are left behind
+    assert all(
+        not file_name.startswith(".")
+        for file_name in os.listdir(tmp_path / "artifacts")
+    )
+
+
+def test_get_cached_storage():
+    with mock.patch.dict(storage._storages, clear=True), mock.patch.dict(
+        storage._cached_storages, clear=True
+    ), mock.patch("sematic.storage.get_user_settings", return_value="memory"):
+        assert isinstance(get_cached_storage(), MemoryStorage)
+
+    with mock.patch.dict(storage._storages, clear=True), mock.patch.dict(
+        storage._cached_storages, clear=True
+    ), _mock_user_settings({SettingsVar.SEMATIC_STORAGE: "s3"}):
+        cached_storage = get_cached_storage()
+
+        assert isinstance(cached_storage, CachedStorage)
+        assert cached_storage._storage is get_storage()
+        assert get_cached_storage() is cached_storage
+
+
+def test_cached_storage_invalid_params(tmp_path):
+    with pytest.raises(ValueError):
+        CachedStorage(MemoryStorage(), str(tmp_path), max_size_bytes=-1)
+
+
+_COMPRESSIBLE_VALUE = b"0123456789" * 1000
+
+
+@pytest.mark.parametrize("value", (b"", b"foo", _COMPRESSIBLE_VALUE, os.urandom(10000)))
+def test_compressed_storage(value: bytes):
+    memory_storage = MemoryStorage()
+    compressed_storage = CompressedStorage(memory_storage, "zlib")
+
+    compressed_storage.set("artifacts/123", value)
+
+    assert compressed_storage.get("artifacts/123") == value
+    assert len(memory_storage.get("artifacts/123")) <= len(value)
+
+    with compressed_storage.open_reader("artifacts/123") as reader:
+        assert reader.read() == value
+
+    with compressed_storage.open_writer("artifacts/456") as writer:
+        writer.write(value)
+
+    assert compressed_storage.get("artifacts/456") == value
+
+
+def test_compressed_storage_small_values():
+    memory_storage = MemoryStorage()
+    compressed_storage = CompressedStorage(memory_storage, "zlib", min_size_bytes=100)
+
+    compressed_storage.set("artifacts/123", b"0" * 99)
+
+    with compressed_storage.open_writer("artifacts/456") as writer:
+        writer.write(b"0" * 50)
+        writer.write(b"0" * 49)
+
+    assert memory_storage.get("artifacts/123") == b"0" * 99
+    assert memory_storage.get("artifacts/456") == b"0" * 99
+
+    compressed_storage.set("artifacts/123", b"0" * 100)
+
+    with compressed_storage.open_writer("artifacts/456") as writer:
+        writer.write(b"0" * 50)
+        writer.write(b"0" * 50)
+
+    assert len(memory_storage.get("artifacts/123")) < 100
+    assert memory_storage.get("artifacts/456") == memory_storage.get("artifacts/123")
+
+
+def test_compressed_storage_uncompressed_values():
+    memory_storage = MemoryStorage()
+    compressed_storage = CompressedStorage(memory_storage, "zlib")
+
+    memory_storage.set("artifacts/123", _COMPRESSIBLE_VALUE)
+
+    assert compressed_storage.get("artifacts/123") == _COMPRESSIBLE_VALUE
+
+    with compressed_storage.open_reader("artifacts/123") as reader:
+        assert reader.read() == _COMPRESSIBLE_VALUE
+
+    with pytest.raises(KeyError):
+        compressed_storage.get("artifacts/456")
+
+
+def test_compressed_storage_s3(s3_client):
+    s3_storage = S3Storage()
+    compressed_storage = CompressedStorage(s3_storage, "gzip")
+    value = os.urandom(1000) * 20000
+
+    with compressed_storage.open_writer("artifacts/123") as writer:
+        for index in range(0, len(value), 1000000):
+            end = index + 1000000
+            writer.write(value[index:end])
+
+    # Values are read with the codec recorded in their header
+    assert CompressedStorage(s3_storage, "zlib").get("artifacts/123") == value
+    assert len(s3_storage.get("artifacts/123")) < len(value) / 10
+
+
+def test_compressed_storage_invalid_codec():
+    with pytest.raises(ValueError, match="Unknown compression codec"):
+        CompressedStorage(MemoryStorage(), "rar")
+
+
+@pytest.mark.parametrize("value", (b"", b"foo"))
+def test_get_buffer(value: bytes, local_storage: LocalStorage):
+    memory_storage = MemoryStorage()
+
+    for storage_backend in (memory_storage, local_storage):
+        storage_backend.set("artifacts/123", value)
+
+        buffer = storage_backend.get_buffer("artifacts/123")
+
+        assert buffer == value
+
+        if not buffer.readonly and len(value) > 0:
+            buffer[0] = ord("x")
+
+        # Writes to the buffer are not stored
+        assert storage_backend.get("artifacts/123") == value
+
+        with pytest.raises(KeyError):
+            storage_backend.get_buffer("artifacts/456")
+
+
+def test_local_storage_get_buffer_mapped(local_storage: LocalStorage):
+    local_storage.set("artifacts/123", b"foo")
+
+    buffer = local_storage.get_buffer("artifacts/123")
+
+    assert isinstance(buffer.obj, mmap.mmap)
+    # Pages are copied on write
+    assert not buffer.readonly
+
+    # The buffer remains valid after the file is replaced
+    local_storage.set("artifacts/123", b"bar")
+
+    assert buffer == b"foo"
+
+
+def test_cached_storage_prefetch(cached_storage: CachedStorage):
+    cached_storage._storage.set("artifacts/123", b"foo")
+
+    cached_storage.prefetch("artifacts/123")
+    cached_storage.prefetch("artifacts/123")
+
+    assert (cached_storage.hits_count, cached_storage.misses_count) == (0, 1)
+    assert cached_storage.get("artifacts/123") == b"foo"
+    assert (cached_storage.hits_count, cached_storage.misses_count) == (1, 1)
+
+    with pytest.raises(KeyError):
+        cached_storage.prefetch("artifacts/456")
+
+
+def test_cached_storage_get_buffer(cached_storage: CachedStorage):
+    cached_storage._storage.set("artifacts/123", b"foo")
+
+    assert cached_storage.get_buffer("artifacts/123") == b"foo"
+    assert (cached_storage.hits_count, cached_storage.misses_count) == (0, 1)
+
+    buffer = cached_storage.get_buffer("artifacts/123")
+
+    assert buffer == b"foo"
+    # Values are memory-mapped from the cache
+    assert isinstance(buffer.obj, mmap.mmap)
+    assert (cached_storage.hits_count, cached_storage.misses_count) == (1, 1)
@@ -23,6 +23,10 @@ from sematic.types.types.link import Link  # noqa: F401
 # Only activates if matplotlib is available
 import sematic.types.types.matplotlib  # noqa: F401
 
+# NumPy
+# Only activates if numpy is available
+import sematic.types.types.numpy  # noqa: F401
+
 # Pandas
 # Only activates if pandas is available
 import sematic.types.types.pandas  # noqa: F401
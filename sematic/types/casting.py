@@ -1,15 +1,27 @@
 # Standard Library
-import dataclasses
 import typing
 
 # Sematic
 from sematic.types.registry import (
-    DataclassKey,
-    get_can_cast_func,
-    get_safe_cast_func,
     is_parameterized_generic,
+    make_dispatch_cache,
+    resolve_can_cast_func,
+    resolve_safe_cast_func,
 )
 
+CastPlan = typing.Callable[[typing.Any], typing.Tuple[typing.Any, typing.Optional[str]]]
+
+
+# Casting plans compiled per (value type, target type) pair
+_CAST_PLANS: typing.Dict[
+    typing.Tuple[typing.Any, typing.Any], CastPlan
+] = make_dispatch_cache()
+
+# `can_cast_type` results per (origin type, destination type) pair
+_CAN_CAST_RESULTS: typing.Dict[
+    typing.Tuple[typing.Any, typing.Any], typing.Tuple[bool, typing.Optional[str]]
+] = make_dispatch_cache()
+
 
 # types must be `typing.Any` because `typing` aliases are not type
 def can_cast_type(
@@ -41,11 +53,28 @@ def can_cast_type(
     if from_type is to_type:
         return True, None
 
-    can_cast_func = get_can_cast_func(to_type)
+    cache_key = (from_type, to_type)
+
+    try:
+        return _CAN_CAST_RESULTS[cache_key]
+    except KeyError:
+        is_hashable = True
+    except TypeError:
+        is_hashable = False
+
+    result = _can_cast_type(from_type, to_type)
+
+    if is_hashable:
+        _CAN_CAST_RESULTS[cache_key] = result
+
+    return result
 
-    # If this is a dataclass we fetch the datacalss casting logic
-    if can_cast_func is None and dataclasses.is_dataclass(to_type):
-        can_cast_func = get_can_cast_func(DataclassKey)
+
+def _can_cast_type(
+    from_type: typing.Any, to_type: typing.Any
+) -> typing.Tuple[bool, typing.Optional[str]]:
+    # Falls back on the dataclass casting logic if this is a dataclass
+    can_cast_func = resolve_can_cast_func(to_type)
 
     if can_cast_func is not None:
         return can_cast_func(from_type, to_type)
@@ -79,29 +108,109 @@ def safe_cast(
         successful or `None`, and the second element is an error message
         if unsuccessful or `None`.
     """
-    # 1. First we check if there is a custom casting function
-    _safe_cast_func = get_safe_cast_func(type_)
+    return get_cast_plan(type(value), type_)(value)
 
-    # 1b. If this is a dataclass we fetch the datacalss casting logic
-    if _safe_cast_func is None and dataclasses.is_dataclass(type_):
-        _safe_cast_func = get_safe_cast_func(DataclassKey)
+
+def get_cast_plan(value_type: typing.Any, type_: typing.Any) -> CastPlan:
+    """
+    Obtain the plan casting values of type `value_type` to `type_`.
+
+    Plans are compiled once per pair of types and cached until a casting
+    function is registered.
+
+    Parameters
+    ----------
+    value_type : Any
+        The runtime type of the values to cast
+    type_ : Any
+        The target type to cast values to
+
+    Returns
+    -------
+    CastPlan
+        A function taking a value and returning the same 2-tuple as
+        `safe_cast`.
+    """
+    cache_key = (value_type, type_)
+
+    try:
+        return _CAST_PLANS[cache_key]
+    except KeyError:
+        is_hashable = True
+    except TypeError:
+        is_hashable = False
+
+    cast_plan = _compile_cast_plan(value_type, type_)
+
+    if is_hashable:
+        _CAST_PLANS[cache_key] = cast_plan
+
+    return cast_plan
+
+
+def make_element_cast_plan(type_: typing.Any) -> CastPlan:
+    """
+    Make a plan casting values of any type to `type_`.
+
+    The plan for each runtime type is looked up once and memoized, which makes
+    it suited to cast the many elements of a collection.
+    """
+    cast_plans: typing.Dict[typing.Any, CastPlan] = {}
+
+    def _cast_element(
+        value: typing.Any,
+    ) -> typing.Tuple[typing.Any, typing.Optional[str]]:
+        value_type = type(value)
+
+        try:
+            cast_plan = cast_plans[value_type]
+        except KeyError:
+            cast_plan = cast_plans[value_type] = get_cast_plan(value_type, type_)
+
+        return cast_plan(value)
+
+    return _cast_element
+
+
+def _compile_cast_plan(value_type: typing.Any, type_: typing.Any) -> CastPlan:
+    # 1. First we check if there is a custom casting function, or if this is a
+    # dataclass
+    _safe_cast_func = resolve_safe_cast_func(type_)
 
     if _safe_cast_func is not None:
-        return _safe_cast_func(value, type_)
+        safe_cast_func = _safe_cast_func
 
-    # 2. If not, we check if value is simply an instance of type_
-    if not is_parameterized_generic(type_):
-        # isinstance is not allowed with generics
-        if isinstance(value, type_):
-            return value, None
+        def _cast_with_func(
+            value: typing.Any,
+        ) -> typing.Tuple[typing.Any, typing.Optional[str]]:
+            return safe_cast_func(value, type_)
+
+        return _cast_with_func
+
+    # 2. If not, we check if values are simply instances of type_
+    # issubclass is not allowed with generics
+    if not is_parameterized_generic(type_) and issubclass(value_type, type_):
+        return identity_cast
 
     # 3. Finally we attempt an actual cast
-    try:
-        return type_(value), None
-    except Exception:
-        pass
+    def _cast_with_constructor(
+        value: typing.Any,
+    ) -> typing.Tuple[typing.Any, typing.Optional[str]]:
+        try:
+            return type_(value), None
+        except Exception:
+            pass
 
-    return None, "Cannot cast {} to {}".format(repr(value), type_)
+        return None, "Cannot cast {} to {}".format(repr(value), type_)
+
+    return _cast_with_constructor
+
+
+def identity_cast(value: typing.Any) -> typing.Tuple[typing.Any, typing.Optional[str]]:
+    """
+    Casting plan for values whose runtime type already matches the target type.
+    """
+    return value, None
 
 
 def cast(value: typing.Any, type_: type) -> typing.Any:
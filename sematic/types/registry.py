@@ -1,4 +1,5 @@
 # Standard Library
+import dataclasses
 from typing import (
     Any,
     Callable,
@@ -72,6 +73,8 @@ def register_can_cast(
         for type_ in types:
             _CAN_CAST_REGISTRY[type_] = func
 
+        _clear_dispatch_cache()
+
         return func
 
     return _register_can_cast
@@ -81,7 +84,6 @@ def get_can_cast_func(type_: TypeAnnotation) -> Optional[CanCastTypeCallable]:
     """
     Obtain the registered `can_cast_type` logic for `type_`.
     """
-    validate_type_annotation(type_)
     return _get_registered_func(_CAN_CAST_REGISTRY, type_)
 
 
@@ -107,6 +109,8 @@ def register_safe_cast(
         for type_ in types:
             _SAFE_CAST_REGISTRY[type_] = func
 
+        _clear_dispatch_cache()
+
         return func
 
     return _register_can_cast
@@ -116,7 +120,6 @@ def get_safe_cast_func(type_: TypeAnnotation) -> Optional[SafeCastCallable]:
     """
     Obtain a `safe_cast` function for type `type_`.
     """
-    validate_type_annotation(type_)
     return _get_registered_func(_SAFE_CAST_REGISTRY, type_)
 
 
@@ -144,6 +147,8 @@ def register_to_json_encodable(
         for type_ in types:
             _TO_JSON_ENCODABLE_REGISTRY[type_] = func
 
+        _clear_dispatch_cache()
+
         return func
 
     return _register_to_json_encodable
@@ -155,7 +160,6 @@ def get_to_json_encodable_func(
     """
     Obtain the serialization function for `type_`.
     """
-    validate_type_annotation(type_)
     return _get_registered_func(_TO_JSON_ENCODABLE_REGISTRY, type_)
 
 
@@ -180,6 +184,8 @@ def register_from_json_encodable(
         for type_ in types:
             _FROM_JSON_ENCODABLE_REGISTRY[type_] = func
 
+        _clear_dispatch_cache()
+
         return func
 
     return _register_from_json_encodable
@@ -191,7 +197,6 @@ def get_from_json_encodable_func(
     """
     Obtain the deserialization function for `type_`.
     """
-    validate_type_annotation(type_)
     return _get_registered_func(_FROM_JSON_ENCODABLE_REGISTRY, type_)
 
 
@@ -214,6 +219,8 @@ def register_to_json_encodable_summary(
         for type_ in types:
             _JSON_ENCODABLE_SUMMARY_REGISTRY[type_] = func
 
+        _clear_dispatch_cache()
+
         return func
 
     return _register_to_json_encodable_summary
@@ -225,26 +232,145 @@ def get_to_json_encodable_summary_func(
     """
     Obtain the serialization function for `type_`.
     """
-    validate_type_annotation(type_)
     return _get_registered_func(_JSON_ENCODABLE_SUMMARY_REGISTRY, type_)
 
 
+# DISPATCH
+
+
+def resolve_can_cast_func(type_: TypeAnnotation) -> Optional[CanCastTypeCallable]:
+    """
+    Obtain the `can_cast_type` logic for `type_`, falling back on the default
+    dataclass logic.
+    """
+    return _get_registered_func(_CAN_CAST_REGISTRY, type_, dataclass_fallback=True)
+
+
+def resolve_safe_cast_func(type_: TypeAnnotation) -> Optional[SafeCastCallable]:
+    """
+    Obtain the `safe_cast` logic for `type_`, falling back on the default
+    dataclass logic.
+    """
+    return _get_registered_func(_SAFE_CAST_REGISTRY, type_, dataclass_fallback=True)
+
+
+def resolve_to_json_encodable_func(
+    type_: TypeAnnotation,
+) -> Optional[ToJSONEncodableCallable]:
+    """
+    Obtain the serialization function for `type_`, falling back on the default
+    dataclass logic.
+    """
+    return _get_registered_func(
+        _TO_JSON_ENCODABLE_REGISTRY, type_, dataclass_fallback=True
+    )
+
+
+def resolve_from_json_encodable_func(
+    type_: TypeAnnotation,
+) -> Optional[FromJSONEncodableCallable]:
+    """
+    Obtain the deserialization function for `type_`, falling back on the default
+    dataclass logic.
+    """
+    return _get_registered_func(
+        _FROM_JSON_ENCODABLE_REGISTRY, type_, dataclass_fallback=True
+    )
+
+
+def resolve_to_json_encodable_summary_func(
+    type_: TypeAnnotation,
+) -> Optional[ToJSONEncodableCallable]:
+    """
+    Obtain the summary function for `type_`, falling back on the default
+    dataclass logic.
+    """
+    return _get_registered_func(
+        _JSON_ENCODABLE_SUMMARY_REGISTRY, type_, dataclass_fallback=True
+    )
+
+
 # TOOLS
 
 
 RegisteredFunc = TypeVar("RegisteredFunc")
 
 
+# Registered functions resolved per registry and type annotation, including
+# misses. Cleared whenever a function is registered.
+_DISPATCH_CACHE: Dict[Tuple[int, TypeAnnotation, bool], Optional[Callable]] = {}
+
+# Caches of values derived from registered functions, see `make_dispatch_cache`
+_DERIVED_CACHES: List[Dict[Any, Any]] = []
+
+
+def make_dispatch_cache() -> Dict[Any, Any]:
+    """
+    Create a cache for values derived from registered functions (e.g. casting
+    plans).
+
+    The returned dictionary is cleared along with the dispatch cache whenever a
+    function is registered.
+    """
+    cache: Dict[Any, Any] = {}
+    _DERIVED_CACHES.append(cache)
+    return cache
+
+
+def _clear_dispatch_cache() -> None:
+    _DISPATCH_CACHE.clear()
+
+    for cache in _DERIVED_CACHES:
+        cache.clear()
+
+
 def _get_registered_func(
-    registry: Dict[RegistryKey, RegisteredFunc], type_: TypeAnnotation
+    registry: Dict[RegistryKey, RegisteredFunc],
+    type_: TypeAnnotation,
+    dataclass_fallback: bool = False,
 ) -> Optional[RegisteredFunc]:
     """
     Obtain a registered function (casting, serialization) from a registry.
+
+    Resolutions are cached per type annotation, so that the annotation is only
+    validated and its origin type extracted once.
     """
+    cache_key = (id(registry), type_, dataclass_fallback)
+
+    try:
+        return _DISPATCH_CACHE[cache_key]  # type: ignore
+    except KeyError:
+        is_hashable = True
+    except TypeError:
+        # Unhashable annotations are resolved on every lookup
+        is_hashable = False
+
+    registered_func = _resolve_registered_func(registry, type_, dataclass_fallback)
+
+    if is_hashable:
+        _DISPATCH_CACHE[cache_key] = registered_func  # type: ignore
+
+    return registered_func
+
+
+def _resolve_registered_func(
+    registry: Dict[RegistryKey, RegisteredFunc],
+    type_: TypeAnnotation,
+    dataclass_fallback: bool,
+) -> Optional[RegisteredFunc]:
     validate_type_annotation(type_)
     registry_type = get_origin_type(type_)
 
-    return registry.get(registry_type)
+    registered_func = registry.get(registry_type)
+
+    if (
+        registered_func is None
+        and dataclass_fallback
+        and dataclasses.is_dataclass(type_)
+    ):
+        registered_func = registry.get(DataclassKey)
+
+    return registered_func
 
 
 def get_origin_type(type_: TypeAnnotation) -> TypeAnnotation:
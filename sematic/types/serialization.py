@@ -5,7 +5,9 @@ This module contains the public API for artifact serialization.
 import abc
 import base64
 import builtins
-import dataclasses
+import contextlib
+import contextvars
+import functools
 import importlib
 import inspect
 import json
@@ -17,40 +19,41 @@ import cloudpickle  # type: ignore
 # Sematic
 from sematic.types.generic_type import GenericType
 from sematic.types.registry import (
-    DataclassKey,
-    get_from_json_encodable_func,
     get_origin_type,
-    get_to_json_encodable_func,
-    get_to_json_encodable_summary_func,
     is_parameterized_generic,
     is_sematic_parametrized_generic_type,
     is_supported_type_annotation,
+    resolve_from_json_encodable_func,
+    resolve_to_json_encodable_func,
+    resolve_to_json_encodable_summary_func,
 )
 
 # VALUE SERIALIZATION
 
+_JSON_SCALARS = (str, int, float, bool)
+
 
 # type_ must be `typing.Any` because `typing` aliases are not type
 def value_to_json_encodable(value: typing.Any, type_: typing.Any) -> typing.Any:
-    # First we check if there is a registered serializer for this exact type
-    to_json_encodable_func = get_to_json_encodable_func(type_)
-
-    # If not we check if this is a dataclass
-    if to_json_encodable_func is None and dataclasses.is_dataclass(type_):
-        to_json_encodable_func = get_to_json_encodable_func(DataclassKey)
+    # First we check if there is a registered serializer for this exact type, or
+    # if this is a dataclass
+    to_json_encodable_func = resolve_to_json_encodable_func(type_)
 
     # If we have a serializer, we use it
     if to_json_encodable_func is not None:
         return to_json_encodable_func(value, type_)
 
     # Otherwise we default
+    if value is None or isinstance(value, _JSON_SCALARS):
+        return value
+
     try:
         # We try to dump to JSON, this is innefficient, how else can we test this?
         json.dumps(value)
         return value
     except Exception:
         # Otherwise we pickle by default
-        return {"pickle": binary_to_string(cloudpickle.dumps(value))}
+        return {"pickle": binary_to_json_encodable(cloudpickle.dumps(value))}
 
 
 def value_from_json_encodable(
@@ -60,12 +63,9 @@ def value_from_json_encodable(
     Public API to deserialize a JSON-encodable payload into its
     corresponding value using the deserialization of `type_`.
     """
-    # First we check whether this is a deserializer for type_.
-    from_json_encodable_func = get_from_json_encodable_func(type_)
-
-    # Then we check if this is a dataclass
-    if from_json_encodable_func is None and dataclasses.is_dataclass(type_):
-        from_json_encodable_func = get_from_json_encodable_func(DataclassKey)
+    # First we check whether this is a deserializer for type_, or if this is a
+    # dataclass
+    from_json_encodable_func = resolve_from_json_encodable_func(type_)
 
     # If we have a deserializer we use it
     if from_json_encodable_func is not None:
@@ -73,13 +73,95 @@ def value_from_json_encodable(
 
     # If this is a pickled payload
     if isinstance(json_encodable, typing.Mapping) and set(json_encodable) == {"pickle"}:
-        return cloudpickle.loads(binary_from_string(json_encodable["pickle"]))
+        return cloudpickle.loads(binary_from_json_encodable(json_encodable["pickle"]))
 
     # If not the raw value must have already been
     # JSON encodable
     return json_encodable
 
 
+# BINARY SEGMENTS
+
+# Bytes-like objects, segments read from storage are memory views of the payload
+Binary = typing.Union[bytes, bytearray, memoryview]
+
+# Binary segments of the value being serialized or deserialized, if any
+_binary_segments: contextvars.ContextVar[
+    typing.Optional[typing.List[Binary]]
+] = contextvars.ContextVar("binary_segments", default=None)
+
+
+def value_to_json_encodable_and_segments(
+    value: typing.Any, type_: typing.Any
+) -> typing.Tuple[typing.Any, typing.List[Binary]]:
+    """
+    Serialize a value, keeping binary data out of the JSON-encodable payload.
+
+    Binary data passed to `binary_to_json_encodable` is collected as raw segments
+    and referenced by index in the payload, instead of being base64-encoded.
+    """
+    segments: typing.List[Binary] = []
+
+    with _use_binary_segments(segments):
+        json_encodable = value_to_json_encodable(value, type_)
+
+    return json_encodable, segments
+
+
+def value_from_json_encodable_and_segments(
+    json_encodable: typing.Any,
+    type_: typing.Any,
+    segments: typing.Sequence[Binary],
+) -> typing.Any:
+    """
+    Deserialize a payload produced by `value_to_json_encodable_and_segments`.
+    """
+    with _use_binary_segments(list(segments)):
+        return value_from_json_encodable(json_encodable, type_)
+
+
+@contextlib.contextmanager
+def _use_binary_segments(segments: typing.List[Binary]) -> typing.Iterator[None]:
+    token = _binary_segments.set(segments)
+
+    try:
+        yield
+    finally:
+        _binary_segments.reset(token)
+
+
+def binary_to_json_encodable(binary: Binary) -> typing.Any:
+    """
+    Serialize binary data.
+
+    Within `value_to_json_encodable_and_segments`, the data is stored as a raw
+    segment and referenced by index. Otherwise it is base64-encoded.
+    """
+    segments = _binary_segments.get()
+
+    if segments is None:
+        return binary_to_string(bytes(binary))
+
+    segments.append(binary)
+
+    return {"segment": len(segments) - 1}
+
+
+def binary_from_json_encodable(json_encodable: typing.Any) -> Binary:
+    """
+    Deserialize binary data serialized with `binary_to_json_encodable`.
+    """
+    if isinstance(json_encodable, str):
+        return binary_from_string(json_encodable)
+
+    segments = _binary_segments.get()
+
+    if segments is None:
+        raise ValueError("Binary segments are required to deserialize this value")
+
+    return segments[json_encodable["segment"]]
+
+
 def binary_to_string(binary: bytes) -> str:
     return base64.b64encode(binary).decode("ascii")
 
@@ -90,12 +172,7 @@ def binary_from_string(string: str) -> bytes:
 
 # JSON SUMMARIES
 def get_json_encodable_summary(value: typing.Any, type_: typing.Any) -> typing.Any:
-    to_json_encodable_summary_func = get_to_json_encodable_summary_func(type_)
-
-    if to_json_encodable_summary_func is None and dataclasses.is_dataclass(type_):
-        to_json_encodable_summary_func = get_to_json_encodable_summary_func(
-            DataclassKey
-        )
+    to_json_encodable_summary_func = resolve_to_json_encodable_summary_func(type_)
 
     if to_json_encodable_summary_func is not None:
         return to_json_encodable_summary_func(value, type_)
@@ -109,7 +186,18 @@ def get_json_encodable_summary(value: typing.Any, type_: typing.Any) -> typing.A
 def type_to_json_encodable(type_: typing.Any) -> typing.Dict[str, typing.Any]:
     """
     Serialize a type
+
+    Serializations are cached per type and must not be mutated.
     """
+    try:
+        hash(type_)
+    except TypeError:
+        return _type_to_json_encodable(type_)
+
+    return _type_to_json_encodable_cached(type_)
+
+
+def _type_to_json_encodable(type_: typing.Any) -> typing.Dict[str, typing.Any]:
     registry: typing.Dict[str, typing.Any] = dict()
 
     _populate_registry(type_, registry)
@@ -120,6 +208,12 @@ def type_to_json_encodable(type_: typing.Any) -> typing.Dict[str, typing.Any]:
     }
 
 
+# Types live as long as the process, there are few of them
+_type_to_json_encodable_cached = functools.lru_cache(maxsize=1024)(
+    _type_to_json_encodable
+)
+
+
 # This is necessary because `List[T].__origin__.__name__` is `"list"`.
 _ORIGIN_TO_ALIAS_MAPPING: typing.Dict[str, typing.Type] = {
     "list": typing.List,
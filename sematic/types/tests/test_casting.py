@@ -6,7 +6,14 @@ import typing
 import pytest
 
 # Sematic
-from sematic.types.casting import can_cast_type, cast, safe_cast
+from sematic.types.casting import (
+    can_cast_type,
+    cast,
+    get_cast_plan,
+    identity_cast,
+    make_element_cast_plan,
+    safe_cast,
+)
 from sematic.types.registry import (
     is_parameterized_generic,
     register_can_cast,
@@ -70,6 +77,47 @@ def test_safe_cast_registered():
     assert error is None
 
 
+def test_get_cast_plan():
+    class A:
+        pass
+
+    class B(A):
+        pass
+
+    assert get_cast_plan(A, A) is identity_cast
+    assert get_cast_plan(B, A) is identity_cast
+    assert get_cast_plan(int, float) is get_cast_plan(int, float)
+    assert get_cast_plan(int, float)(42) == (42.0, None)
+
+    cast_value, error = get_cast_plan(A, B)(A())
+
+    assert cast_value is None
+    assert re.match("Cannot cast .*A object.* to .*B", error)
+
+
+def test_get_cast_plan_invalidated_on_register():
+    class A:
+        pass
+
+    value = A()
+
+    assert get_cast_plan(A, A)(value) == (value, None)
+
+    @register_safe_cast(A)
+    def _safe_cast_to_A(value, _):
+        return None, "Nope"
+
+    assert get_cast_plan(A, A)(value) == (None, "Nope")
+
+
+def test_make_element_cast_plan():
+    cast_element_plan = make_element_cast_plan(float)
+
+    assert cast_element_plan(1) == (1.0, None)
+    assert cast_element_plan(1.5) == (1.5, None)
+    assert cast_element_plan("abc")[1] == "Cannot cast 'abc' to <class 'float'>"
+
+
 def test_cast():
     class A:
         pass
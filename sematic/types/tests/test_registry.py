@@ -1,18 +1,32 @@
 # Standard
 # Standard Library
 from dataclasses import dataclass
-from typing import Any, List, Literal, Optional, Union
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple, Union
+from unittest import mock
 
 # Third party
 import pytest
 
 # Sematic
+import sematic.types  # noqa: F401
+import sematic.types.registry as registry
+from sematic.tests.benchmark import benchmark, measure_time
+from sematic.types.casting import safe_cast
 from sematic.types.registry import (
+    DataclassKey,
+    _get_registered_func,
     _validate_registry_keys,
+    get_to_json_encodable_func,
     is_parameterized_generic,
     is_supported_type_annotation,
+    register_to_json_encodable,
+    resolve_to_json_encodable_func,
     validate_type_annotation,
 )
+from sematic.types.serialization import (
+    get_json_encodable_summary,
+    value_to_json_encodable,
+)
 
 
 @dataclass
@@ -73,3 +87,113 @@ def test_validate_registry_keys():
         _validate_registry_keys(Union[int, float])
     with pytest.raises(TypeError, match=r"Cannot register type 42"):
         _validate_registry_keys(42)
+
+
+def test_dispatch_cache_invalidated_on_register():
+    class Foo:
+        pass
+
+    assert resolve_to_json_encodable_func(Foo) is None
+
+    @register_to_json_encodable(Foo)
+    def _foo_to_json_encodable(value: Foo, type_: Any) -> str:
+        return "foo"
+
+    assert resolve_to_json_encodable_func(Foo) is _foo_to_json_encodable
+    assert value_to_json_encodable(Foo(), Foo) == "foo"
+
+
+def test_dispatch_dataclass_fallback():
+    def _dataclass_func(value, type_):
+        pass
+
+    def _list_func(value, type_):
+        pass
+
+    test_registry = {DataclassKey: _dataclass_func, list: _list_func}
+
+    assert _get_registered_func(test_registry, FooDataclass) is None
+    assert (
+        _get_registered_func(test_registry, FooDataclass, dataclass_fallback=True)
+        is _dataclass_func
+    )
+    assert _get_registered_func(test_registry, List[FooDataclass]) is _list_func
+    assert (
+        _get_registered_func(test_registry, FooStandard, dataclass_fallback=True)
+        is None
+    )
+    assert get_to_json_encodable_func(FooDataclass) is None
+    assert resolve_to_json_encodable_func(FooDataclass) is not None
+
+
+def test_dispatch_invalid_type_annotation():
+    for _ in range(2):
+        with pytest.raises(TypeError, match="must be parametrized"):
+            resolve_to_json_encodable_func(Union)
+
+
+class _NoDispatchCache(dict):
+    def __setitem__(self, key, value):
+        pass
+
+
+_NESTED_VALUE = [
+    {str(i): (list(range(10)), FooDataclass(foo=i) if i % 2 else None)}
+    for i in range(200)
+]
+
+_NESTED_TYPE = List[Dict[str, Tuple[List[int], Optional[FooDataclass]]]]
+
+
+def _cast_and_serialize_nested_value():
+    cast_value, error = safe_cast(_NESTED_VALUE, _NESTED_TYPE)
+    assert error is None
+
+    value_to_json_encodable(cast_value, _NESTED_TYPE)
+    get_json_encodable_summary(cast_value, _NESTED_TYPE)
+
+
+def _count_validations(run: Callable[[], Any]) -> int:
+    with mock.patch(
+        "sematic.types.registry.validate_type_annotation",
+        side_effect=validate_type_annotation,
+    ) as mock_validate_type_annotation:
+        run()
+
+    return mock_validate_type_annotation.call_count
+
+
+def test_dispatch_cache_nested_generics():
+    """
+    Casting and serializing a nested generic value validates no annotation.
+
+    Every element of the value dispatches to the registry, so without the cache
+    the annotation is validated and its origin type extracted for each of them.
+    """
+    # Fills the cache
+    _cast_and_serialize_nested_value()
+
+    cached_validations = _count_validations(_cast_and_serialize_nested_value)
+
+    with mock.patch.object(registry, "_DISPATCH_CACHE", _NoDispatchCache()):
+        uncached_validations = _count_validations(_cast_and_serialize_nested_value)
+
+    assert cached_validations == 0
+    assert uncached_validations > len(_NESTED_VALUE)
+
+
+@benchmark
+def test_dispatch_cache_benchmark():
+    """
+    Microbenchmark of casting and serializing a nested generic value, with and
+    without the dispatch cache.
+    """
+    # Fills the cache
+    _cast_and_serialize_nested_value()
+
+    cached_time = measure_time(_cast_and_serialize_nested_value, repeat=5)
+
+    with mock.patch.object(registry, "_DISPATCH_CACHE", _NoDispatchCache()):
+        uncached_time = measure_time(_cast_and_serialize_nested_value, repeat=5)
+
+    assert cached_time < uncached_time / 2
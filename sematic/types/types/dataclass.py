@@ -4,11 +4,12 @@ import dataclasses
 from typing import Any, Dict, Literal, Optional, Tuple, Union
 
 # Sematic
-from sematic.types.casting import can_cast_type, safe_cast
+from sematic.types.casting import CastPlan, can_cast_type, make_element_cast_plan
 from sematic.types.registry import (
     DataclassKey,
     ToJSONEncodableCallable,
     is_parameterized_generic,
+    make_dispatch_cache,
     register_can_cast,
     register_from_json_encodable,
     register_safe_cast,
@@ -23,6 +24,9 @@ from sematic.types.serialization import (
     value_to_json_encodable,
 )
 
+# Casting plans of each field, per dataclass
+_FIELD_CAST_PLANS: Dict[Any, Tuple[Tuple[str, CastPlan], ...]] = make_dispatch_cache()
+
 
 @register_safe_cast(DataclassKey)
 def _safe_cast_dataclass(value: Any, type_: Any) -> Tuple[Any, Optional[str]]:
@@ -39,14 +43,9 @@ def _safe_cast_dataclass(value: Any, type_: Any) -> Tuple[Any, Optional[str]]:
     # dict to prepare parameters.
     create_instance_from_scratch = not isinstance(value, type_)
 
-    if create_instance_from_scratch:
-        cast_value = dict()
-    else:
-        # Otherwise we make sure the subclass is conserved, including
-        # potential additional fields.
-        cast_value = copy.deepcopy(value)
+    cast_fields: Dict[str, Any] = {}
 
-    for name, field in type_.__dataclass_fields__.items():
+    for name, cast_field_plan in _get_field_cast_plans(type_):
         try:
             # First we attempt to access the property
             field_value = getattr(value, name)
@@ -59,21 +58,46 @@ def _safe_cast_dataclass(value: Any, type_: Any) -> Tuple[Any, Optional[str]]:
                     repr(value), type_, repr(name)
                 )
 
-        cast_field, error = safe_cast(field_value, field.type)
+        cast_field, error = cast_field_plan(field_value)
         if error is not None:
             return None, "Cannot cast {} to {}: {}".format(repr(value), type_, error)
 
-        if create_instance_from_scratch:
-            cast_value[name] = cast_field
-        else:
-            setattr(cast_value, name, cast_field)
+        if create_instance_from_scratch or cast_field is not field_value:
+            cast_fields[name] = cast_field
 
     if create_instance_from_scratch:
-        cast_value = type_(**cast_value)
+        return type_(**cast_fields), None
+
+    # All fields already have the right types
+    if len(cast_fields) == 0:
+        return value, None
+
+    # Otherwise we make sure the subclass is conserved, including
+    # potential additional fields. Unchanged fields are shared with value.
+    cast_value = copy.copy(value)
+
+    for name, cast_field in cast_fields.items():
+        setattr(cast_value, name, cast_field)
 
     return cast_value, None
 
 
+def _get_field_cast_plans(type_: Any) -> Tuple[Tuple[str, CastPlan], ...]:
+    try:
+        return _FIELD_CAST_PLANS[type_]
+    except KeyError:
+        pass
+
+    fields: Dict[str, dataclasses.Field] = type_.__dataclass_fields__
+
+    field_cast_plans = tuple(
+        (name, make_element_cast_plan(field.type)) for name, field in fields.items()
+    )
+    _FIELD_CAST_PLANS[type_] = field_cast_plans
+
+    return field_cast_plans
+
+
 @register_can_cast(DataclassKey)
 def _can_cast_to_dataclass(from_type: Any, to_type: Any) -> Tuple[bool, Optional[str]]:
     prefix = "Cannot cast {} to {}".format(from_type, to_type)
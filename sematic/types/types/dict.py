@@ -2,7 +2,7 @@
 from typing import Any, Dict, List, Mapping, Optional, Tuple, Type
 
 # Sematic
-from sematic.types.casting import safe_cast
+from sematic.types.casting import make_element_cast_plan
 from sematic.types.registry import (
     register_safe_cast,
     register_to_json_encodable,
@@ -25,15 +25,17 @@ def _dict_safe_cast(value: Dict, type_: Type) -> Tuple[Optional[Dict], Optional[
         )
 
     key_type, element_type = type_.__args__
+    cast_key_plan = make_element_cast_plan(key_type)
+    cast_element_plan = make_element_cast_plan(element_type)
 
     cast_value = dict()
 
     for key, element in value.items():
-        cast_key, error = safe_cast(key, key_type)
+        cast_key, error = cast_key_plan(key)
         if error is not None:
             return None, "Cannot cast {} to key type: {}".format(repr(key), error)
 
-        cast_element, error = safe_cast(element, element_type)
+        cast_element, error = cast_element_plan(element)
 
         if error is not None:
             return None, "Cannot cast {} to value type: {}".format(repr(element), error)
@@ -4,7 +4,7 @@ import math
 import typing
 
 # Sematic
-from sematic.types.casting import can_cast_type, safe_cast
+from sematic.types.casting import can_cast_type, make_element_cast_plan
 from sematic.types.registry import (
     register_can_cast,
     register_from_json_encodable,
@@ -34,11 +34,12 @@ def safe_cast_list(
         return None, "{} not an iterable".format(value)
 
     element_type = type_.__args__[0]
+    cast_element_plan = make_element_cast_plan(element_type)
 
     result: typing.List[element_type] = []  # type: ignore
 
-    for index, element in enumerate(value):
-        cast_element, error = safe_cast(element, element_type)
+    for element in value:
+        cast_element, error = cast_element_plan(element)
         if error is not None:
             return None, "Cannot cast {} to {}: {}".format(value, type_, error)
 
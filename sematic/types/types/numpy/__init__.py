@@ -0,0 +1,7 @@
+try:
+    import numpy  # noqa: F401
+except ImportError:
+    pass
+else:
+    # Sematic
+    import sematic.types.types.numpy.ndarray  # noqa: F401
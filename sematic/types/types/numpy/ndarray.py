@@ -0,0 +1,174 @@
+# Standard Library
+from typing import Any, Dict, Optional
+
+# Third party
+import cloudpickle
+import numpy
+
+# Sematic
+from sematic.types.registry import (
+    register_from_json_encodable,
+    register_to_json_encodable,
+    register_to_json_encodable_summary,
+)
+from sematic.types.serialization import (
+    binary_from_json_encodable,
+    binary_to_json_encodable,
+)
+
+# Statistics are computed over chunks of this many elements, so that summaries of
+# large arrays do not allocate temporaries of the array's size.
+_CHUNK_SIZE = 1024 * 1024
+
+# Unique values are only listed for arrays with fewer distinct values
+_MAX_UNIQUE_VALUES = 300
+
+# Kinds of dtypes whose values can be summarized: bool, integers and floats
+_SUMMARIZED_KINDS = "biuf"
+
+
+@register_to_json_encodable(numpy.ndarray)
+def _ndarray_to_json_encodable(value: numpy.ndarray, _) -> Any:
+    """
+    Arrays are serialized as their raw buffer, with their dtype and shape, so
+    that they can be read from memory-mapped artifacts without copies. Arrays of
+    objects or structured dtypes, and subclasses of ndarray (e.g. masked arrays),
+    are pickled.
+    """
+    if (
+        type(value) is not numpy.ndarray
+        or value.dtype.hasobject
+        or value.dtype.fields is not None
+    ):
+        return {"pickle": binary_to_json_encodable(cloudpickle.dumps(value))}
+
+    fortran_order = value.flags.f_contiguous and not value.flags.c_contiguous
+
+    if not (value.flags.c_contiguous or value.flags.f_contiguous):
+        value = numpy.ascontiguousarray(value)
+
+    # Raveling a contiguous array in its own order does not copy it
+    data = value.ravel(order="F" if fortran_order else "C").view(numpy.uint8)
+
+    return {
+        "dtype": value.dtype.str,
+        "shape": list(value.shape),
+        "fortran_order": bool(fortran_order),
+        "data": binary_to_json_encodable(data.data),
+    }
+
+
+@register_from_json_encodable(numpy.ndarray)
+def _ndarray_from_json_encodable(value: Any, _) -> numpy.ndarray:
+    if "pickle" in value:
+        return cloudpickle.loads(binary_from_json_encodable(value["pickle"]))
+
+    array = numpy.frombuffer(
+        binary_from_json_encodable(value["data"]), dtype=numpy.dtype(value["dtype"])
+    ).reshape(value["shape"], order="F" if value["fortran_order"] else "C")
+
+    # Buffers of memory-mapped artifacts are copied on write, others may be
+    # read-only.
+    if not array.flags.writeable:
+        array = array.copy(order="K")
+
+    return array
+
+
+@register_to_json_encodable_summary(numpy.ndarray)
+def _ndarray_to_json_encodable_summary(value: numpy.ndarray, _) -> Any:
+    summary: Dict[str, Any] = {
+        "dtype": str(value.dtype),
+        "shape": list(value.shape),
+        "element_size": value.dtype.itemsize,
+        "value_range": None,
+        "unique_values": None,
+        "has_nan": False,
+        "has_inf": False,
+    }
+
+    if value.dtype.kind not in _SUMMARIZED_KINDS or value.size == 0:
+        return summary
+
+    summary.update(_get_statistics(value))
+
+    return summary
+
+
+def _get_statistics(value: numpy.ndarray) -> Dict[str, Any]:
+    """
+    Compute the summary statistics of a non-empty array, one chunk at a time.
+
+    Unique values are those of a strided sample of the array, completed with
+    the values of each chunk missing from the sample. Chunks are never copied
+    if the array is contiguous.
+    """
+    is_float = value.dtype.kind == "f"
+    flat_value = value.ravel(order="K")
+
+    minimum: Any = None
+    maximum: Any = None
+    has_nan = has_inf = False
+
+    sample_step = max(1, flat_value.size // _CHUNK_SIZE)
+    unique_values: Optional[numpy.ndarray] = _get_unique_values(
+        flat_value[::sample_step]
+    )
+
+    for start in range(0, flat_value.size, _CHUNK_SIZE):
+        end = start + _CHUNK_SIZE
+        chunk = flat_value[start:end]
+
+        if is_float:
+            nan_mask = numpy.isnan(chunk)
+            has_nan = has_nan or bool(nan_mask.any())
+            has_inf = has_inf or bool(numpy.isinf(chunk).any())
+
+        chunk_min, chunk_max = chunk.min(), chunk.max()
+
+        if minimum is None or chunk_min < minimum:
+            minimum = chunk_min
+
+        if maximum is None or chunk_max > maximum:
+            maximum = chunk_max
+
+        if unique_values is None or sample_step == 1:
+            continue
+
+        missing_mask = ~numpy.isin(chunk, unique_values)
+        if is_float:
+            missing_mask &= ~nan_mask
+
+        if missing_mask.any():
+            unique_values = _get_unique_values(
+                numpy.concatenate([unique_values, chunk[missing_mask]])
+            )
+
+    # Minimums and maximums of chunks with NaNs are NaN, and NaN compares False
+    # to everything.
+    if has_nan:
+        minimum = maximum = value.dtype.type(numpy.nan)
+
+    return {
+        "value_range": {"min": minimum.item(), "max": maximum.item()},
+        "unique_values": (
+            None if unique_values is None else [item.item() for item in unique_values]
+        ),
+        "has_nan": has_nan,
+        "has_inf": has_inf,
+    }
+
+
+def _get_unique_values(value: numpy.ndarray) -> Optional[numpy.ndarray]:
+    """
+    Unique values other than NaN, None if there are too many.
+    """
+    if value.dtype.kind == "f":
+        value = value[~numpy.isnan(value)]
+
+    unique_values = numpy.unique(value)
+
+    if len(unique_values) >= _MAX_UNIQUE_VALUES:
+        return None
+
+    return unique_values
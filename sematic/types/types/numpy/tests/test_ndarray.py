@@ -0,0 +1,277 @@
+# Standard Library
+import json
+import mmap
+from typing import Any
+
+# Third-party
+import cloudpickle
+import numpy
+import pytest
+
+# Sematic
+from sematic.db.models.factories import (
+    _make_envelope_parts,
+    _read_envelope,
+    get_artifact_value,
+    make_artifact,
+)
+from sematic.storage import LocalStorage, StorageBackend
+from sematic.tests.benchmark import benchmark, measure_peak_memory, measure_time
+from sematic.tests.fixtures import test_storage  # noqa: F401
+from sematic.types.serialization import (
+    binary_from_string,
+    binary_to_string,
+    get_json_encodable_summary,
+    type_from_json_encodable,
+    type_to_json_encodable,
+    value_from_json_encodable_and_segments,
+    value_to_json_encodable_and_segments,
+)
+from sematic.types.types.numpy import ndarray
+
+
+@pytest.fixture
+def local_storage(tmp_path):
+    return LocalStorage(str(tmp_path))
+
+
+def _store(array: numpy.ndarray, storage: StorageBackend) -> None:
+    """
+    Store an array like `make_artifact`, without computing its summary.
+    """
+    value_serialization, segments = value_to_json_encodable_and_segments(
+        array, numpy.ndarray
+    )
+    value_payload = json.dumps(value_serialization).encode("utf-8")
+
+    with storage.open_writer("artifacts/123") as writer:
+        for part in _make_envelope_parts(value_payload, segments):
+            writer.write(part)
+
+
+def _load(storage: StorageBackend) -> Any:
+    """
+    Load an array like `get_artifact_value`.
+    """
+    value_payload, segments = _read_envelope(storage.get_buffer("artifacts/123"))
+
+    return value_from_json_encodable_and_segments(
+        json.loads(value_payload), numpy.ndarray, segments
+    )
+
+
+def _round_trip(array: numpy.ndarray, storage: StorageBackend) -> Any:
+    _store(array, storage)
+    return _load(storage)
+
+
+_MATRIX = numpy.arange(12, dtype="float32").reshape(3, 4)
+
+
+@pytest.mark.parametrize(
+    "array",
+    (
+        _MATRIX,
+        # Fortran-ordered
+        _MATRIX.T,
+        # Not contiguous
+        _MATRIX[:, ::2],
+        numpy.array(3),
+        numpy.array([], dtype="int8"),
+        numpy.zeros((2, 0, 3)),
+        numpy.array([True, False]),
+        numpy.array([1, 2], dtype=">i8"),
+        numpy.array([1 + 2j]),
+        numpy.array(["a", "bc"]),
+        numpy.array(["2020-01-01"], dtype="datetime64[D]"),
+        # Pickled
+        numpy.array([1, None]),
+        numpy.array([(1, 2.0)], dtype=[("a", "i4"), ("b", "f8")]),
+    ),
+)
+def test_ndarray_round_trip(array: numpy.ndarray, local_storage):
+    loaded = _round_trip(array, local_storage)
+
+    assert loaded.dtype == array.dtype
+    numpy.testing.assert_array_equal(loaded, array)
+
+
+@pytest.mark.parametrize(
+    "array",
+    (
+        numpy.ma.masked_array([1, 2], mask=[False, True]),
+        numpy.matrix([[1, 2], [3, 4]]),
+    ),
+)
+def test_ndarray_subclass_round_trip(array: numpy.ndarray, local_storage):
+    loaded = _round_trip(array, local_storage)
+
+    # Subclasses are pickled
+    assert type(loaded) is type(array)
+    numpy.testing.assert_array_equal(loaded, array)
+    numpy.testing.assert_array_equal(numpy.ma.getmask(loaded), numpy.ma.getmask(array))
+
+
+def test_ndarray_raw_buffer():
+    json_encodable, segments = value_to_json_encodable_and_segments(
+        _MATRIX.T, numpy.ndarray
+    )
+
+    assert json_encodable == {
+        "dtype": "<f4",
+        "shape": [4, 3],
+        "fortran_order": True,
+        "data": {"segment": 0},
+    }
+    assert segments == [_MATRIX.tobytes()]
+
+
+def test_ndarray_memory_mapped(local_storage):
+    _store(_MATRIX, local_storage)
+
+    loaded = _load(local_storage)
+
+    base = loaded
+    while isinstance(base, numpy.ndarray):
+        base = base.base
+
+    # The array is a view of the memory-mapped artifact
+    assert isinstance(base.obj, mmap.mmap)
+    assert loaded.ctypes.data % numpy.dtype("float32").alignment == 0
+
+    # Pages are copied on write, the artifact is not modified
+    loaded[0, 0] = 100
+    numpy.testing.assert_array_equal(_load(local_storage), _MATRIX)
+
+
+def test_ndarray_artifact(test_storage):  # noqa: F811
+    artifact = make_artifact(_MATRIX, numpy.ndarray, store=True)
+    loaded = get_artifact_value(artifact)
+
+    numpy.testing.assert_array_equal(loaded, _MATRIX)
+    # Artifacts of read-only buffers are copied
+    assert loaded.flags.writeable
+
+
+def test_ndarray_pickle():
+    """
+    Arrays serialized with the pickle fallback can still be read.
+    """
+    json_encodable = {"pickle": binary_to_string(cloudpickle.dumps(_MATRIX))}
+
+    loaded = value_from_json_encodable_and_segments(json_encodable, numpy.ndarray, [])
+
+    numpy.testing.assert_array_equal(loaded, _MATRIX)
+
+
+def test_type_from_json_encodable():
+    json_encodable = type_to_json_encodable(numpy.ndarray)
+    assert type_from_json_encodable(json_encodable) is numpy.ndarray
+
+
+@pytest.mark.parametrize(
+    "array, value_range, unique_values",
+    (
+        (numpy.array([3, 1, 3]), {"min": 1, "max": 3}, [1, 3]),
+        (numpy.array([True]), {"min": True, "max": True}, [True]),
+        (numpy.arange(1000), {"min": 0, "max": 999}, None),
+        (numpy.array(["a"]), None, None),
+        (numpy.array([], dtype="float32"), None, None),
+    ),
+)
+def test_ndarray_summary_values(array, value_range, unique_values):
+    summary = get_json_encodable_summary(array, numpy.ndarray)
+
+    assert summary["value_range"] == value_range
+    assert summary["unique_values"] == unique_values
+    json.dumps(summary)
+
+
+def test_ndarray_summary_nan():
+    array = numpy.array([[1.0, numpy.nan], [numpy.inf, 1.0]], dtype="float32")
+
+    summary = get_json_encodable_summary(array, numpy.ndarray)
+
+    assert numpy.isnan(summary["value_range"]["min"])
+    assert numpy.isnan(summary["value_range"]["max"])
+    # NaN is reported by has_nan, not as a unique value
+    assert summary["unique_values"] == [1.0, numpy.inf]
+    assert summary["has_nan"] and summary["has_inf"]
+
+
+def test_ndarray_summary_chunked():
+    # Values missing from the strided sample are found in the chunks
+    array = numpy.zeros(3 * ndarray._CHUNK_SIZE + 5, dtype="int16")
+    array[1] = -1
+    array[-1] = 7
+
+    summary = get_json_encodable_summary(array, numpy.ndarray)
+
+    assert summary["value_range"] == {"min": -1, "max": 7}
+    assert summary["unique_values"] == [-1, 0, 7]
+
+    array[: ndarray._MAX_UNIQUE_VALUES] = numpy.arange(ndarray._MAX_UNIQUE_VALUES)
+
+    assert get_json_encodable_summary(array, numpy.ndarray)["unique_values"] is None
+
+
+def _pickle_round_trip(array: numpy.ndarray, storage: StorageBackend) -> Any:
+    """
+    Round trip of the previous pickled and base64-encoded serialization.
+    """
+    payload = json.dumps({"pickle": binary_to_string(cloudpickle.dumps(array))}).encode(
+        "utf-8"
+    )
+    storage.set("artifacts/pickle", payload)
+    json_encodable = json.loads(storage.get("artifacts/pickle"))
+    return cloudpickle.loads(binary_from_string(json_encodable["pickle"]))
+
+
+def test_ndarray_raw_size(local_storage):
+    """
+    Arrays serialized as raw buffers against the previous pickled and
+    base64-encoded serialization.
+    """
+    array = numpy.random.default_rng(0).standard_normal((10000, 512))
+
+    numpy.testing.assert_array_equal(_pickle_round_trip(array, local_storage), array)
+    numpy.testing.assert_array_equal(_round_trip(array, local_storage), array)
+
+    pickle_size = len(local_storage.get("artifacts/pickle"))
+    raw_size = len(local_storage.get("artifacts/123"))
+
+    assert raw_size < 0.76 * pickle_size
+    # Loading maps the artifact rather than reading it
+    assert measure_peak_memory(lambda: _load(local_storage)) < array.nbytes / 100
+
+
+@benchmark
+def test_ndarray_benchmark(local_storage):
+    """
+    Benchmark of arrays serialized as raw buffers, against the previous pickled
+    and base64-encoded serialization.
+    """
+    array = numpy.random.default_rng(0).standard_normal((10000, 512))
+
+    pickle_time = measure_time(lambda: _pickle_round_trip(array, local_storage))
+    raw_time = measure_time(lambda: _round_trip(array, local_storage))
+
+    assert raw_time < pickle_time / 2
+
+
+def test_ndarray_summary_memory():
+    """
+    The chunked summary against full-array reductions.
+    """
+    array = numpy.random.default_rng(0).integers(0, 100, 20 * ndarray._CHUNK_SIZE)
+
+    def _full_summary():
+        unique_values = numpy.unique(array)
+        return array.min(), array.max(), unique_values
+
+    full_memory = measure_peak_memory(_full_summary)
+    memory = measure_peak_memory(
+        lambda: get_json_encodable_summary(array, numpy.ndarray)
+    )
+
+    assert memory < full_memory / 5
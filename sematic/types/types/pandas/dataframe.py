@@ -1,26 +1,178 @@
 # Standard Library
+import contextlib
+import contextvars
 import json
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Sequence
 
 # Third party
+import cloudpickle
+import numpy
 import pandas
 
+try:
+    import pyarrow  # type: ignore
+    import pyarrow.ipc  # type: ignore
+except ImportError:
+    pyarrow = None
+
 # Sematic
-from sematic.types.registry import register_to_json_encodable_summary
+from sematic.types.registry import (
+    register_from_json_encodable,
+    register_to_json_encodable,
+    register_to_json_encodable_summary,
+)
+from sematic.types.serialization import (
+    Binary,
+    binary_from_json_encodable,
+    binary_to_json_encodable,
+)
 
 _PAYLOAD_CUTOFF = 3000
 
+# Columns to read from DataFrames being deserialized, all if None
+_read_columns: contextvars.ContextVar[Optional[Sequence[Any]]] = contextvars.ContextVar(
+    "read_columns", default=None
+)
+
+
+@contextlib.contextmanager
+def read_columns(columns: Sequence[Any]) -> Iterator[None]:
+    """
+    Only read `columns` (and the index) of DataFrames deserialized within this
+    context, e.g.:
+
+    ```
+    with read_columns(["a", "b"]):
+        dataframe = get_artifact_value(artifact)
+    ```
+
+    Unselected columns of DataFrames stored in the Arrow format are not read at
+    all. Other DataFrames are read entirely, then projected.
+    """
+    token = _read_columns.set(list(columns))
+
+    try:
+        yield
+    finally:
+        _read_columns.reset(token)
+
+
+@register_to_json_encodable(pandas.DataFrame)
+def _dataframe_to_json_encodable(value: pandas.DataFrame, _) -> Any:
+    """
+    DataFrames are serialized in the Arrow IPC file format, which can be
+    memory-mapped and read column by column. DataFrames Arrow cannot represent
+    (e.g. columns of arbitrary objects) are pickled.
+    """
+    if pyarrow is not None and _is_arrow_compatible(value):
+        try:
+            return {"arrow": binary_to_json_encodable(_to_arrow_ipc(value))}
+        except (pyarrow.ArrowException, ValueError, TypeError, OverflowError):
+            pass
+
+    return {"pickle": binary_to_json_encodable(cloudpickle.dumps(value))}
+
+
+@register_from_json_encodable(pandas.DataFrame)
+def _dataframe_from_json_encodable(value: Any, _) -> pandas.DataFrame:
+    columns = _read_columns.get()
+
+    if "arrow" not in value:
+        dataframe = cloudpickle.loads(binary_from_json_encodable(value["pickle"]))
+        return dataframe if columns is None else dataframe[columns]
+
+    if pyarrow is None:
+        raise ImportError("pyarrow is required to read this DataFrame")
+
+    return _from_arrow_ipc(binary_from_json_encodable(value["arrow"]), columns)
+
+
+# Values of object columns Arrow converts back to the same types. Others, e.g.
+# lists or tuples read back as arrays, are pickled.
+_ARROW_OBJECT_TYPES = frozenset(
+    (
+        "string",
+        "bytes",
+        "decimal",
+        "date",
+        "datetime",
+        "boolean",
+        "integer",
+        "floating",
+        "empty",
+    )
+)
+
+
+def _is_arrow_compatible(value: pandas.DataFrame) -> bool:
+    # Arrow does not store attrs, and converts column names of mixed types to str
+    if len(value.attrs) > 0:
+        return False
+
+    if isinstance(value.columns, pandas.MultiIndex):
+        levels = list(value.columns.levels)
+    else:
+        levels = [value.columns]
+
+    if any(level.inferred_type.startswith("mixed") for level in levels):
+        return False
+
+    return all(
+        pandas.api.types.infer_dtype(value.iloc[:, index], skipna=True)
+        in _ARROW_OBJECT_TYPES
+        for index, dtype in enumerate(value.dtypes)
+        if dtype == object
+    )
+
+
+def _to_arrow_ipc(value: pandas.DataFrame) -> memoryview:
+    table = pyarrow.Table.from_pandas(value)
+    sink = pyarrow.BufferOutputStream()
+
+    with pyarrow.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    return memoryview(sink.getvalue())
+
+
+def _from_arrow_ipc(
+    binary: Binary, columns: Optional[Sequence[Any]]
+) -> pandas.DataFrame:
+    # Reading does not copy the binary, which may be memory-mapped: only the
+    # selected columns are read when converted to pandas.
+    table = pyarrow.ipc.open_file(pyarrow.py_buffer(binary)).read_all()
+
+    if columns is not None:
+        pandas_metadata = table.schema.pandas_metadata or {}
+        # Non-range indexes are stored as columns
+        index_columns = [
+            column
+            for column in pandas_metadata.get("index_columns", [])
+            if isinstance(column, str)
+        ]
+        table = table.select([str(column) for column in columns] + index_columns)
+
+    return table.to_pandas()
+
 
 @register_to_json_encodable_summary(pandas.DataFrame)
 def _dataframe_json_encodable_summary(value: pandas.DataFrame, _) -> Any:
-    truncated = False
-    payload: Any = value.to_dict()
-    index = list(value.index)
+    """
+    Summaries take bounded time and memory regardless of the size of the frame:
+    only the head of the frame is converted, and statistics are computed column
+    by column, with quantiles computed on a sample of at most
+    `SUMMARY_MAX_ROWS` rows.
+    """
+    truncated = True
+    preview = value.head()
+
+    # Each cell takes at least _MIN_CELL_CHARS, larger frames are never below
+    # the cutoff and are not converted.
+    if value.size <= _PAYLOAD_CUTOFF // _MIN_CELL_CHARS:
+        payload: Any = value.to_dict()
 
-    if len(json.dumps(payload, default=str)) > _PAYLOAD_CUTOFF:
-        payload = value.head().to_dict()
-        index = index[: len(value.head())]
-        truncated = True
+        if len(json.dumps(payload, default=str)) <= _PAYLOAD_CUTOFF:
+            preview, truncated = value, False
 
     # We want to preserve the order of the columns
     dtypes = [
@@ -29,16 +181,72 @@ def _dataframe_json_encodable_summary(value: pandas.DataFrame, _) -> Any:
 
     describe: List[Dict[str, Any]] = []
     try:
-        describe = value.describe().to_dict()  # type: ignore  # (pandas stubs bug)
+        describe = _describe(value)
     except ValueError:
         pass
 
     return dict(
-        dataframe=payload,
-        index=index,
+        dataframe=preview.to_dict(),
+        index=list(preview.index),
         dtypes=dtypes,
         truncated=truncated,
         shape=value.shape,
         describe=describe,
-        isna=value.isna().sum().to_dict(),
+        isna=_count_na(value),
     )
+
+
+# Minimum length of a cell in a JSON-encoded `DataFrame.to_dict()`, e.g. `"0": 1, `
+_MIN_CELL_CHARS = 8
+
+# Maximum number of rows quantiles are computed on, `None` to compute them on all
+# rows.
+SUMMARY_MAX_ROWS: Optional[int] = 100000
+
+# Statistics of `DataFrame.describe()` which are computed exactly on large frames
+_EXACT_STATISTICS = ("count", "mean", "std", "min", "max")
+
+
+def _describe(value: pandas.DataFrame) -> Any:
+    if SUMMARY_MAX_ROWS is None or len(value) <= SUMMARY_MAX_ROWS:
+        return value.describe().to_dict()  # type: ignore  # (pandas stubs bug)
+
+    describe = _sample(value, SUMMARY_MAX_ROWS).describe()
+
+    # Statistics other than quantiles are vectorized reductions, which do not
+    # copy the frame.
+    for column in describe.columns:
+        series = value[column]
+
+        # Duplicate column names
+        if isinstance(series, pandas.DataFrame):
+            continue
+
+        for statistic in _EXACT_STATISTICS:
+            # Some statistics are not defined for some dtypes, e.g. `std` of
+            # datetimes
+            if statistic in describe.index and pandas.notna(
+                describe.at[statistic, column]
+            ):
+                describe.at[statistic, column] = getattr(series, statistic)()
+
+    return describe.to_dict()
+
+
+def _sample(value: pandas.DataFrame, size: int) -> pandas.DataFrame:
+    """
+    Uniformly sample rows, deterministically so that the summaries of equal
+    frames are equal.
+    """
+    positions = numpy.random.default_rng(0).choice(len(value), size, replace=False)
+    positions.sort()
+
+    return value.iloc[positions]
+
+
+def _count_na(value: pandas.DataFrame) -> Dict[Any, int]:
+    # Column by column, `value.isna()` would allocate a mask of the entire frame
+    return {
+        name: int(value.iloc[:, position].isna().sum())
+        for position, name in enumerate(value.columns)
+    }
@@ -3,16 +3,35 @@
 import datetime
 import json
 import os
+from typing import Any
+from unittest import mock
 
+import cloudpickle
+import numpy
 import pandas
+import pytest
 
 # Sematic
-from sematic.db.models.factories import make_artifact
+from sematic.db.models.factories import (
+    _make_envelope_parts,
+    _read_envelope,
+    get_artifact_value,
+    make_artifact,
+)
+from sematic.storage import LocalStorage, StorageBackend
+from sematic.tests.benchmark import benchmark, measure_peak_memory, measure_time
 from sematic.types.serialization import (
+    binary_from_string,
+    binary_to_string,
     get_json_encodable_summary,
     type_from_json_encodable,
     type_to_json_encodable,
+    value_from_json_encodable,
+    value_from_json_encodable_and_segments,
+    value_to_json_encodable,
+    value_to_json_encodable_and_segments,
 )
+from sematic.types.types.pandas.dataframe import read_columns
 
 
 def test_dataframe_summary():
@@ -43,3 +62,349 @@ def test_dataframe_datetime():
 def test_type_from_json_encodable():
     json_encodable = type_to_json_encodable(pandas.DataFrame)
     assert type_from_json_encodable(json_encodable) is pandas.DataFrame
+
+
+@pytest.fixture
+def local_storage(tmp_path):
+    return LocalStorage(str(tmp_path))
+
+
+def _store(dataframe: pandas.DataFrame, storage: StorageBackend) -> None:
+    """
+    Store a DataFrame like `make_artifact`, without computing its summary.
+    """
+    value_serialization, segments = value_to_json_encodable_and_segments(
+        dataframe, pandas.DataFrame
+    )
+    value_payload = json.dumps(value_serialization).encode("utf-8")
+
+    with storage.open_writer("artifacts/123") as writer:
+        for part in _make_envelope_parts(value_payload, segments):
+            writer.write(part)
+
+
+def _load(storage: StorageBackend) -> Any:
+    """
+    Load a DataFrame like `get_artifact_value`.
+    """
+    value_payload, segments = _read_envelope(storage.get_buffer("artifacts/123"))
+
+    return value_from_json_encodable_and_segments(
+        json.loads(value_payload), pandas.DataFrame, segments
+    )
+
+
+def _round_trip(dataframe: pandas.DataFrame, storage: StorageBackend) -> Any:
+    _store(dataframe, storage)
+    return _load(storage)
+
+
+@pytest.mark.parametrize(
+    "dataframe",
+    (
+        pandas.DataFrame({"a": [1, 2], "b": ["x", None], "c": [0.5, float("nan")]}),
+        pandas.DataFrame({1: [1], 2: [2]}),
+        pandas.DataFrame({"a": pandas.Categorical(["x", "y"])}),
+        pandas.DataFrame({"a": pandas.date_range("2020", periods=2, tz="UTC")}),
+        pandas.DataFrame({"a": [1, 2]}, index=pandas.Index(["x", "y"], name="i")),
+        pandas.DataFrame(
+            [[1, 2]], columns=pandas.MultiIndex.from_tuples([("a", "b"), ("a", "c")])
+        ),
+        pandas.DataFrame(),
+        # Not supported by Arrow, pickled
+        pandas.DataFrame({"a": [1, "x"]}),
+        pandas.DataFrame({1: [1], "a": [2]}),
+        pandas.DataFrame([[1, 2]], columns=["a", "a"]),
+        pandas.DataFrame({"a": [[1, 2], [3]]}),
+        pandas.DataFrame({"a": pandas.Series([1, 2**70], dtype=object)}),
+    ),
+)
+def test_dataframe_round_trip(dataframe, local_storage):
+    pandas.testing.assert_frame_equal(_round_trip(dataframe, local_storage), dataframe)
+
+
+def test_dataframe_arrow():
+    dataframe = pandas.DataFrame({"a": [1, 2]})
+
+    assert set(value_to_json_encodable(dataframe, pandas.DataFrame)) == {"arrow"}
+    assert set(
+        value_to_json_encodable(pandas.DataFrame({"a": [1, "x"]}), pandas.DataFrame)
+    ) == {"pickle"}
+
+
+@pytest.mark.parametrize(
+    "values, element_type",
+    (
+        ([[1, 2], [3]], list),
+        ([(1, 2), (3,)], tuple),
+        ([{"b": 1}, None], dict),
+    ),
+)
+def test_dataframe_object_elements(values, element_type, local_storage):
+    dataframe = pandas.DataFrame({"a": values})
+
+    # Arrow would read these elements back as arrays or with missing keys
+    assert set(value_to_json_encodable(dataframe, pandas.DataFrame)) == {"pickle"}
+
+    loaded = _round_trip(dataframe, local_storage)
+
+    assert type(loaded["a"][0]) is element_type
+    assert loaded["a"].tolist() == values
+
+
+def test_dataframe_pickled(local_storage):
+    """
+    DataFrames stored pickled before being serialized with Arrow can still be
+    read.
+    """
+    dataframe = pandas.DataFrame({"a": [1, 2]})
+    json_encodable = {"pickle": binary_to_string(cloudpickle.dumps(dataframe))}
+
+    value = value_from_json_encodable(json_encodable, pandas.DataFrame)
+
+    pandas.testing.assert_frame_equal(value, dataframe)
+
+    with read_columns(["a"]):
+        value = value_from_json_encodable(json_encodable, pandas.DataFrame)
+
+    pandas.testing.assert_frame_equal(value, dataframe[["a"]])
+
+
+@pytest.mark.parametrize(
+    "dataframe",
+    (
+        pandas.DataFrame({"a": [1, 2], "b": [3, 4], "c": [5, 6]}),
+        pandas.DataFrame({"a": [1, 2], "b": [3, 4], "c": [5, 6]}, index=["x", "y"]),
+        pandas.DataFrame({"a": [1, "x"], "b": [3, 4], "c": [5, 6]}),
+    ),
+)
+def test_read_columns(dataframe, local_storage):
+    artifact = make_artifact(
+        dataframe, pandas.DataFrame, store=True, storage_backend=local_storage
+    )
+
+    with read_columns(["c", "a"]):
+        value = get_artifact_value(artifact, local_storage)
+
+    pandas.testing.assert_frame_equal(value, dataframe[["c", "a"]])
+
+    # Outside of the context, all columns are read
+    pandas.testing.assert_frame_equal(
+        get_artifact_value(artifact, local_storage), dataframe
+    )
+
+
+def _make_large_dataframe() -> pandas.DataFrame:
+    size = 500000
+
+    return pandas.DataFrame(
+        {
+            "id": range(size),
+            "category": [str(i % 100) for i in range(size)],
+            "value": [i / 3 for i in range(size)],
+            "timestamp": pandas.date_range("2020", periods=size, freq="s"),
+        }
+    )
+
+
+def _pickle_round_trip(
+    dataframe: pandas.DataFrame, storage: StorageBackend
+) -> pandas.DataFrame:
+    """
+    Round trip of the previous pickled and base64-encoded serialization.
+    """
+    payload = json.dumps(
+        {"pickle": binary_to_string(cloudpickle.dumps(dataframe))}
+    ).encode("utf-8")
+    storage.set("artifacts/pickle", payload)
+    json_encodable = json.loads(storage.get("artifacts/pickle"))
+    return cloudpickle.loads(binary_from_string(json_encodable["pickle"]))
+
+
+def test_dataframe_arrow_size(local_storage):
+    dataframe = _make_large_dataframe()
+
+    pandas.testing.assert_frame_equal(
+        _pickle_round_trip(dataframe, local_storage), dataframe
+    )
+    pandas.testing.assert_frame_equal(_round_trip(dataframe, local_storage), dataframe)
+
+    pickle_size = len(local_storage.get("artifacts/pickle"))
+    arrow_size = len(local_storage.get("artifacts/123"))
+
+    assert arrow_size < pickle_size
+
+
+@benchmark
+def test_dataframe_benchmark(local_storage):
+    """
+    Benchmark of DataFrames serialized with Arrow, against the previous pickled
+    and base64-encoded serialization.
+    """
+    dataframe = _make_large_dataframe()
+
+    pickle_time = measure_time(lambda: _pickle_round_trip(dataframe, local_storage))
+    arrow_time = measure_time(lambda: _round_trip(dataframe, local_storage))
+    load_time = measure_time(lambda: _load(local_storage))
+
+    with read_columns(["value"]):
+        column_time = measure_time(lambda: _load(local_storage))
+
+    assert arrow_time < pickle_time
+    assert column_time < load_time
+
+
+def _previous_summary(value: pandas.DataFrame) -> Any:
+    """
+    Previous implementation of the summary, which converted the entire frame.
+    """
+    truncated = False
+    payload: Any = value.to_dict()
+    index = list(value.index)
+
+    if len(json.dumps(payload, default=str)) > 3000:
+        payload = value.head().to_dict()
+        index = index[: len(value.head())]
+        truncated = True
+
+    dtypes = [
+        (name, dtype.name) for name, dtype in zip(value.dtypes.index, value.dtypes)
+    ]
+
+    describe: Any = []
+    try:
+        describe = value.describe().to_dict()
+    except ValueError:
+        pass
+
+    return dict(
+        dataframe=payload,
+        index=index,
+        dtypes=dtypes,
+        truncated=truncated,
+        shape=value.shape,
+        describe=describe,
+        isna=value.isna().sum().to_dict(),
+    )
+
+
+@pytest.mark.parametrize(
+    "dataframe",
+    (
+        pandas.DataFrame({"a": [1, 2], "b": ["x", None], "c": [0.5, float("nan")]}),
+        pandas.DataFrame({"a": range(100), "b": [str(i) for i in range(100)]}),
+        pandas.DataFrame({"a": range(1000)}),
+        pandas.DataFrame({"a": ["x", "y"]}),
+        pandas.DataFrame(),
+        pandas.read_csv(
+            os.path.join(os.path.dirname(os.path.realpath(__file__)), "cirrhosis.csv"),
+            index_col=["ID"],
+        ),
+    ),
+)
+def test_dataframe_summary_unchanged(dataframe):
+    summary = get_json_encodable_summary(dataframe, pandas.DataFrame)
+
+    assert json.dumps(summary, default=str, sort_keys=True) == json.dumps(
+        _previous_summary(dataframe), default=str, sort_keys=True
+    )
+
+
+def _make_wide_dataframe(size: int) -> pandas.DataFrame:
+    random = numpy.random.default_rng(0)
+    values = random.random(size)
+    values[::10] = float("nan")
+
+    return pandas.DataFrame(
+        {
+            "id": range(size),
+            "value": values,
+            "category": random.integers(0, 10, size).astype(str),
+            "timestamp": pandas.date_range("2020", periods=size, freq="s"),
+        }
+    )
+
+
+def test_dataframe_summary_sampled():
+    dataframe = _make_wide_dataframe(300000)
+
+    summary = get_json_encodable_summary(dataframe, pandas.DataFrame)
+    expected_summary = _previous_summary(dataframe.head(1000))
+
+    for key in ("dataframe", "index", "dtypes"):
+        # NaNs are only equal once encoded
+        assert json.dumps(summary[key], default=str) == json.dumps(
+            expected_summary[key], default=str
+        )
+
+    assert summary["truncated"]
+    assert summary["shape"] == dataframe.shape
+    assert summary["isna"] == dataframe.isna().sum().to_dict()
+
+    expected_describe = dataframe.describe().to_dict()
+
+    assert summary["describe"].keys() == expected_describe.keys()
+
+    for column in ("id", "value"):
+        for statistic in ("count", "mean", "std", "min", "max"):
+            assert summary["describe"][column][statistic] == pytest.approx(
+                expected_describe[column][statistic]
+            )
+
+        # Quantiles are computed on a sample
+        for statistic in ("25%", "50%", "75%"):
+            assert summary["describe"][column][statistic] == pytest.approx(
+                expected_describe[column][statistic], rel=0.02
+            )
+
+    # Samples are deterministic
+    assert json.dumps(
+        get_json_encodable_summary(dataframe, pandas.DataFrame), default=str
+    ) == json.dumps(summary, default=str)
+
+
+def test_dataframe_summary_max_rows():
+    dataframe = _make_wide_dataframe(300000)
+
+    with mock.patch("sematic.types.types.pandas.dataframe.SUMMARY_MAX_ROWS", None):
+        summary = get_json_encodable_summary(dataframe, pandas.DataFrame)
+
+    assert summary["describe"] == dataframe.describe().to_dict()
+
+
+def test_dataframe_summary_memory():
+    """
+    The summary's memory against the previous implementation, which converted
+    the entire frame.
+    """
+    dataframe = _make_wide_dataframe(50000)
+
+    previous_memory = measure_peak_memory(lambda: _previous_summary(dataframe))
+    memory = measure_peak_memory(
+        lambda: get_json_encodable_summary(dataframe, pandas.DataFrame)
+    )
+
+    assert memory < previous_memory / 10
+
+    # Memory does not grow with the number of rows beyond one column at a time
+    large_dataframe = _make_wide_dataframe(500000)
+    large_memory = measure_peak_memory(
+        lambda: get_json_encodable_summary(large_dataframe, pandas.DataFrame)
+    )
+
+    assert large_memory < previous_memory / 2
+
+
+@benchmark
+def test_dataframe_summary_benchmark():
+    """
+    Benchmark of the summary against the previous implementation.
+    """
+    dataframe = _make_wide_dataframe(50000)
+
+    previous_time = measure_time(lambda: _previous_summary(dataframe), repeat=1)
+    time_ = measure_time(
+        lambda: get_json_encodable_summary(dataframe, pandas.DataFrame), repeat=1
+    )
+
+    assert time_ < previous_time / 10
@@ -6,3 +6,4 @@ else:
     # Sematic
     import sematic.types.types.pytorch.dataloader  # noqa: F401
     import sematic.types.types.pytorch.module  # noqa: F401
+    import sematic.types.types.pytorch.tensor  # noqa: F401
@@ -1,5 +1,9 @@
 # Standard Library
-from typing import Any
+import contextlib
+import contextvars
+import io
+import pickle
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 # Third-party
 import cloudpickle
@@ -10,15 +14,175 @@ from sematic.types.registry import (
     register_from_json_encodable,
     register_to_json_encodable,
 )
-from sematic.types.serialization import binary_from_string, binary_to_string
+from sematic.types.serialization import (
+    binary_from_json_encodable,
+    binary_to_json_encodable,
+)
+from sematic.types.types.pytorch.tensor import (
+    _tensor_from_json_encodable,
+    _tensor_to_json_encodable,
+)
+
+# Device to load the tensors of modules deserialized in the current context to,
+# the device they were stored from (always CPU) if None
+_map_location: contextvars.ContextVar[Optional[torch.device]] = contextvars.ContextVar(
+    "map_location", default=None
+)
+
+
+@contextlib.contextmanager
+def map_location(device: Union[str, torch.device]) -> Iterator[None]:
+    """
+    Load the parameters and buffers of modules deserialized within this context
+    directly to `device`, e.g.:
+
+    ```
+    with map_location("cuda:0"):
+        model = get_artifact_value(artifact)
+    ```
+    """
+    token = _map_location.set(torch.device(device))
+
+    try:
+        yield
+    finally:
+        _map_location.reset(token)
+
+
+# Persistent IDs of tensors in pickled modules:
+# (kind, index of the tensor in the serialization's tensors, requires_grad)
+_PersistentId = Tuple[str, int, bool]
+
+_PARAMETER = "parameter"
+_TENSOR = "tensor"
 
 
 @register_to_json_encodable(torch.nn.Module)
 def _nn_module_to_json_encodable(value: torch.nn.Module, _: Any) -> Any:
-    value.cpu()
-    return binary_to_string(cloudpickle.dumps(value))
+    """
+    The tensors of a module's `state_dict()` are serialized as raw buffers, next
+    to a pickle of the module in which they are replaced by references. Tensors
+    sharing memory, e.g. tied weights, are stored once.
+
+    The module is not modified, and tensors are copied to CPU only if they are
+    on another device.
+    """
+    tensors: List[torch.Tensor] = []
+    state_dict: Dict[str, int] = {}
+    indices: Dict[Tuple[Any, ...], int] = {}
+
+    for name, tensor in value.state_dict().items():
+        # Other layouts and empty tensors are pickled with the module
+        if not _is_stored_separately(tensor):
+            continue
+
+        key = _get_tensor_key(tensor)
+
+        if key not in indices:
+            indices[key] = len(tensors)
+            tensors.append(tensor)
+
+        state_dict[name] = indices[key]
+
+    module = io.BytesIO()
+    _ModulePickler(module, indices).dump(value)
+
+    return {
+        "class": "{}.{}".format(type(value).__module__, type(value).__qualname__),
+        "state_dict": state_dict,
+        "tensors": [
+            _tensor_to_json_encodable(tensor, torch.Tensor) for tensor in tensors
+        ],
+        "module": binary_to_json_encodable(module.getbuffer()),
+    }
 
 
 @register_from_json_encodable(torch.nn.Module)
-def _nn_module_from_json_encodable(value: str, _: Any) -> torch.nn.Module:
-    return cloudpickle.loads(binary_from_string(value))
+def _nn_module_from_json_encodable(value: Any, _: Any) -> torch.nn.Module:
+    # Modules stored before state_dict serialization were entirely pickled
+    if not (isinstance(value, dict) and "state_dict" in value):
+        return cloudpickle.loads(binary_from_json_encodable(value))
+
+    device = _map_location.get()
+
+    tensors = []
+    for tensor_serialization in value["tensors"]:
+        tensor = _tensor_from_json_encodable(tensor_serialization, torch.Tensor)
+        tensors.append(tensor if device is None else tensor.to(device))
+
+    module = io.BytesIO(binary_from_json_encodable(value["module"]))
+
+    return _ModuleUnpickler(module, tensors).load()
+
+
+def _is_strided(obj: Any) -> bool:
+    return isinstance(obj, torch.Tensor) and obj.layout == torch.strided
+
+
+def _is_stored_separately(obj: Any) -> bool:
+    # Empty tensors all have a null data pointer, they would share a key
+    return _is_strided(obj) and obj.numel() > 0
+
+
+def _get_tensor_key(tensor: torch.Tensor) -> Tuple[Any, ...]:
+    """
+    Tensors with equal keys are views of the same memory.
+    """
+    return (
+        tensor.device,
+        tensor.data_ptr(),
+        tensor.dtype,
+        tuple(tensor.shape),
+        tensor.stride(),
+    )
+
+
+class _ModulePickler(cloudpickle.CloudPickler):
+    """
+    Pickles tensors of the module's `state_dict()` as references.
+    """
+
+    def __init__(self, file: io.BytesIO, indices: Dict[Tuple[Any, ...], int]):
+        super().__init__(file)
+        self._indices = indices
+
+    def persistent_id(self, obj: Any) -> Optional[_PersistentId]:
+        if not _is_stored_separately(obj):
+            return None
+
+        index = self._indices.get(_get_tensor_key(obj))
+
+        if index is None:
+            return None
+
+        kind = _PARAMETER if isinstance(obj, torch.nn.Parameter) else _TENSOR
+
+        return kind, index, obj.requires_grad
+
+
+class _ModuleUnpickler(pickle.Unpickler):
+    """
+    Resolves references to the module's tensors.
+
+    References to the same tensor resolve to the same object, and parameters
+    referencing the same tensor share its memory.
+    """
+
+    def __init__(self, file: io.BytesIO, tensors: List[torch.Tensor]):
+        super().__init__(file)
+        self._tensors = tensors
+        self._objects: Dict[_PersistentId, torch.Tensor] = {}
+
+    def persistent_load(self, persistent_id: Any) -> torch.Tensor:
+        persistent_id = tuple(persistent_id)
+
+        if persistent_id not in self._objects:
+            kind, index, requires_grad = persistent_id
+            tensor = self._tensors[index]
+
+            if kind == _PARAMETER:
+                tensor = torch.nn.Parameter(tensor, requires_grad=requires_grad)
+
+            self._objects[persistent_id] = tensor
+
+        return self._objects[persistent_id]
@@ -1,29 +1,176 @@
 # Standard Library
-from typing import Any
+from typing import Any, Dict, Optional
 
 # Third-party
+import cloudpickle
 import torch
 
 # Sematic
-from sematic.types.registry import register_to_json_encodable_summary
+from sematic.types.registry import (
+    register_from_json_encodable,
+    register_to_json_encodable,
+    register_to_json_encodable_summary,
+)
+from sematic.types.serialization import (
+    binary_from_json_encodable,
+    binary_to_json_encodable,
+)
 
+# Statistics are computed over chunks of this many elements, so that summaries of
+# large tensors do not allocate temporaries of the tensor's size.
+_CHUNK_SIZE = 1024 * 1024
 
-@register_to_json_encodable_summary(torch.Tensor)
-def _torch_tensor_to_json_encodable_summary(value: torch.Tensor, type_: Any) -> Any:
-    unique_values = value.unique()
-    if len(unique_values) < 300:
-        unique_values = [i.item() for i in unique_values]
-    else:
-        unique_values = None
+# Unique values are only listed for tensors with fewer distinct values
+_MAX_UNIQUE_VALUES = 300
+
+# Integer dtypes used to get the raw bytes of dtypes numpy does not support, e.g.
+# bfloat16, by element size.
+_RAW_DTYPES = {1: torch.uint8, 2: torch.int16, 4: torch.int32, 8: torch.int64}
+
+
+@register_to_json_encodable(torch.Tensor)
+def _tensor_to_json_encodable(value: torch.Tensor, _: Any) -> Any:
+    """
+    Tensors are serialized as their raw buffer, with their dtype and shape, so
+    that they can be read from memory-mapped artifacts without copies. Sparse and
+    quantized tensors are pickled.
+    """
+    if value.layout != torch.strided or value.is_quantized:
+        return {"pickle": binary_to_json_encodable(cloudpickle.dumps(value))}
+
+    # Does not copy tensors which are already contiguous and on CPU
+    tensor = value.detach().cpu().contiguous()
+
+    if tensor.element_size() in _RAW_DTYPES:
+        tensor = tensor.view(_RAW_DTYPES[tensor.element_size()])
+
+    data = tensor.numpy().reshape(-1).view("uint8")
 
     return {
+        "dtype": str(value.dtype).split(".")[-1],
+        "shape": list(value.shape),
+        "requires_grad": value.requires_grad,
+        "data": binary_to_json_encodable(data.data),
+    }
+
+
+@register_from_json_encodable(torch.Tensor)
+def _tensor_from_json_encodable(value: Any, _: Any) -> torch.Tensor:
+    if "pickle" in value:
+        return cloudpickle.loads(binary_from_json_encodable(value["pickle"]))
+
+    dtype = getattr(torch, value["dtype"])
+    data = memoryview(binary_from_json_encodable(value["data"]))
+
+    if data.nbytes == 0:
+        tensor = torch.empty(value["shape"], dtype=dtype)
+    else:
+        # Buffers of memory-mapped artifacts are copied on write, others may be
+        # read-only.
+        if data.readonly:
+            data = memoryview(bytearray(data))
+
+        tensor = torch.frombuffer(data, dtype=dtype).reshape(value["shape"])
+
+    return tensor.requires_grad_(value["requires_grad"])
+
+
+@register_to_json_encodable_summary(torch.Tensor)
+def _torch_tensor_to_json_encodable_summary(value: torch.Tensor, type_: Any) -> Any:
+    summary: Dict[str, Any] = {
         "dtype": str(value.dtype),
         "shape": list(value.shape),
         "is_cuda": value.is_cuda,
         "element_size": value.element_size(),
         "is_inference": value.is_inference(),
-        "value_range": {"min": value.min().item(), "max": value.max().item()},
-        "unique_values": unique_values,
-        "has_nan": True in value.isnan(),
-        "has_inf": True in value.isinf(),
+        "value_range": None,
+        "unique_values": None,
+        "has_nan": False,
+        "has_inf": False,
+    }
+
+    if value.layout != torch.strided or value.is_complex() or value.numel() == 0:
+        return summary
+
+    summary.update(_get_statistics(value.detach()))
+
+    return summary
+
+
+def _get_statistics(value: torch.Tensor) -> Dict[str, Any]:
+    """
+    Compute the summary statistics of a non-empty tensor, one chunk at a time.
+
+    Unique values are those of a strided sample of the tensor, completed with
+    the values of each chunk missing from the sample. Chunks are never copied
+    if the tensor is contiguous.
+    """
+    is_float = value.is_floating_point()
+    flat_value = value.reshape(-1)
+
+    minimum: Optional[torch.Tensor] = None
+    maximum: Optional[torch.Tensor] = None
+    has_nan = has_inf = False
+
+    sample_step = max(1, flat_value.numel() // _CHUNK_SIZE)
+    unique_values = _get_unique_values(flat_value[::sample_step])
+
+    for start in range(0, flat_value.numel(), _CHUNK_SIZE):
+        end = start + _CHUNK_SIZE
+        chunk = flat_value[start:end]
+
+        if is_float:
+            nan_mask = chunk.isnan()
+            has_nan = has_nan or bool(nan_mask.any())
+            has_inf = has_inf or bool(chunk.isinf().any())
+
+        chunk_min, chunk_max = chunk.min(), chunk.max()
+
+        if minimum is None or chunk_min < minimum:
+            minimum = chunk_min
+
+        if maximum is None or chunk_max > maximum:
+            maximum = chunk_max
+
+        if unique_values is None or sample_step == 1:
+            continue
+
+        missing_mask = ~torch.isin(chunk, unique_values)
+        if is_float:
+            missing_mask &= ~nan_mask
+
+        if missing_mask.any():
+            unique_values = _get_unique_values(
+                torch.cat([unique_values, chunk[missing_mask]])
+            )
+
+    assert minimum is not None and maximum is not None
+
+    # Minimums and maximums of chunks with NaNs are NaN, and NaN compares False
+    # to everything.
+    if has_nan:
+        minimum = maximum = torch.tensor(float("nan"))
+
+    return {
+        "value_range": {"min": minimum.item(), "max": maximum.item()},
+        "unique_values": (
+            None if unique_values is None else [item.item() for item in unique_values]
+        ),
+        "has_nan": has_nan,
+        "has_inf": has_inf,
     }
+
+
+def _get_unique_values(value: torch.Tensor) -> Optional[torch.Tensor]:
+    """
+    Unique values other than NaN, None if there are too many.
+    """
+    if value.is_floating_point():
+        value = value[~value.isnan()]
+
+    unique_values = value.unique()
+
+    if len(unique_values) >= _MAX_UNIQUE_VALUES:
+        return None
+
+    return unique_values
@@ -0,0 +1,132 @@
+# Standard Library
+import json
+
+# Third-party
+import cloudpickle
+import pytest
+
+# Sematic
+from sematic.db.models.factories import get_artifact_value, make_artifact
+from sematic.tests.fixtures import test_storage  # noqa: F401
+from sematic.types.serialization import (
+    binary_to_string,
+    value_from_json_encodable,
+    value_from_json_encodable_and_segments,
+    value_to_json_encodable_and_segments,
+)
+
+torch = pytest.importorskip("torch")
+
+
+class TiedModel(torch.nn.Module):  # type: ignore
+    def __init__(self, size: int):
+        super().__init__()
+        self.embedding = torch.nn.Embedding(10, size)
+        self.decoder = torch.nn.Linear(size, 10)
+        self.decoder.weight = self.embedding.weight
+        self.norm = torch.nn.BatchNorm1d(size)
+        self.norm.weight.requires_grad_(False)
+
+
+def _round_trip(model):
+    json_encodable, segments = value_to_json_encodable_and_segments(
+        model, torch.nn.Module
+    )
+
+    return value_from_json_encodable_and_segments(
+        json.loads(json.dumps(json_encodable)), torch.nn.Module, segments
+    )
+
+
+def _assert_state_dict_equal(model, loaded):
+    assert type(loaded) is type(model)
+    assert loaded.state_dict().keys() == model.state_dict().keys()
+
+    for name, tensor in model.state_dict().items():
+        assert torch.equal(loaded.state_dict()[name], tensor)
+
+
+def test_module_round_trip():
+    model = TiedModel(4)
+    loaded = _round_trip(model)
+
+    _assert_state_dict_equal(model, loaded)
+
+    # Tied weights are stored once and remain tied
+    assert loaded.decoder.weight is loaded.embedding.weight
+    assert loaded.embedding.weight.requires_grad
+    assert not loaded.norm.weight.requires_grad
+
+
+def test_module_state_dict_serialization():
+    model = TiedModel(4)
+
+    json_encodable, segments = value_to_json_encodable_and_segments(
+        model, torch.nn.Module
+    )
+
+    assert json_encodable["class"] == "{}.TiedModel".format(__name__)
+    assert (
+        json_encodable["state_dict"]["embedding.weight"]
+        == json_encodable["state_dict"]["decoder.weight"]
+    )
+    # One segment per distinct tensor, and one for the module
+    assert len(segments) == len(json_encodable["tensors"]) + 1
+    assert len(json_encodable["tensors"]) == len(model.state_dict()) - 1
+
+
+def test_module_empty_tensors():
+    model = torch.nn.Module()
+    model.register_buffer("a", torch.zeros(0))
+    model.register_buffer("b", torch.zeros(0, 3))
+
+    json_encodable, _ = value_to_json_encodable_and_segments(model, torch.nn.Module)
+    loaded = _round_trip(model)
+
+    # Empty tensors are not mistaken for views of the same memory
+    assert json_encodable["state_dict"] == {}
+    assert loaded.a.shape == (0,)
+    assert loaded.b.shape == (0, 3)
+
+
+def test_module_not_modified():
+    model = TiedModel(4)
+    weight = model.embedding.weight
+
+    value_to_json_encodable_and_segments(model, torch.nn.Module)
+
+    assert model.embedding.weight is weight
+
+
+def test_module_pickle():
+    """
+    Modules pickled before state_dict serialization can still be read.
+    """
+    model = TiedModel(4)
+
+    loaded = value_from_json_encodable(
+        binary_to_string(cloudpickle.dumps(model)), torch.nn.Module
+    )
+
+    _assert_state_dict_equal(model, loaded)
+
+
+def test_module_artifact(test_storage):  # noqa: F811
+    model = TiedModel(4)
+
+    loaded = get_artifact_value(make_artifact(model, torch.nn.Module, store=True))
+
+    _assert_state_dict_equal(model, loaded)
+
+
+def test_map_location():
+    # Sematic
+    from sematic.types.types.pytorch.module import map_location
+
+    model = TiedModel(4)
+
+    with map_location("cpu"):
+        loaded = _round_trip(model)
+
+    assert loaded.embedding.weight.device == torch.device("cpu")
+    assert loaded.decoder.weight is loaded.embedding.weight
@@ -0,0 +1,116 @@
+# Standard Library
+import json
+
+# Third-party
+import pytest
+
+# Sematic
+from sematic.db.models.factories import (
+    _make_envelope_parts,
+    _read_envelope,
+    get_artifact_value,
+    make_artifact,
+)
+from sematic.storage import LocalStorage
+from sematic.tests.fixtures import test_storage  # noqa: F401
+from sematic.types.serialization import (
+    get_json_encodable_summary,
+    value_from_json_encodable_and_segments,
+    value_to_json_encodable_and_segments,
+)
+
+torch = pytest.importorskip("torch")
+
+
+@pytest.fixture
+def local_storage(tmp_path):
+    return LocalStorage(str(tmp_path))
+
+
+def _round_trip(tensor, storage):
+    value_serialization, segments = value_to_json_encodable_and_segments(
+        tensor, torch.Tensor
+    )
+    value_payload = json.dumps(value_serialization).encode("utf-8")
+
+    with storage.open_writer("artifacts/123") as writer:
+        for part in _make_envelope_parts(value_payload, segments):
+            writer.write(part)
+
+    value_payload, segments = _read_envelope(storage.get_buffer("artifacts/123"))
+
+    return value_from_json_encodable_and_segments(
+        json.loads(value_payload), torch.Tensor, segments
+    )
+
+
+@pytest.mark.parametrize(
+    "make_tensor",
+    (
+        lambda: torch.arange(12, dtype=torch.float32).reshape(3, 4),
+        # Not contiguous
+        lambda: torch.arange(12).reshape(3, 4).t(),
+        lambda: torch.tensor(3.0),
+        lambda: torch.zeros((2, 0)),
+        lambda: torch.tensor([True, False]),
+        lambda: torch.tensor([1.5, 2.5], dtype=torch.bfloat16),
+        lambda: torch.tensor([1 + 2j]),
+        # Pickled
+        lambda: torch.eye(3).to_sparse(),
+    ),
+)
+def test_tensor_round_trip(make_tensor, local_storage):
+    tensor = make_tensor()
+    loaded = _round_trip(tensor, local_storage)
+
+    assert loaded.dtype == tensor.dtype
+    assert torch.equal(loaded.to_dense(), tensor.to_dense())
+
+
+def test_tensor_requires_grad(local_storage):
+    tensor = torch.ones(3, requires_grad=True)
+
+    assert _round_trip(tensor, local_storage).requires_grad
+
+
+def test_tensor_memory_mapped(local_storage):
+    tensor = torch.arange(12, dtype=torch.float32)
+
+    loaded = _round_trip(tensor, local_storage)
+
+    # Pages of the memory-mapped artifact are copied on write
+    loaded[0] = 100
+    assert torch.equal(_round_trip(tensor, local_storage), tensor)
+
+
+def test_tensor_artifact(test_storage):  # noqa: F811
+    tensor = torch.arange(12, dtype=torch.float32)
+
+    assert torch.equal(
+        get_artifact_value(make_artifact(tensor, torch.Tensor, store=True)), tensor
+    )
+
+
+def test_tensor_summary():
+    tensor = torch.tensor([[1.0, float("nan")], [float("inf"), 1.0]])
+
+    summary = get_json_encodable_summary(tensor, torch.Tensor)
+
+    assert summary["shape"] == [2, 2]
+    assert summary["unique_values"] == [1.0, float("inf")]
+    assert summary["has_nan"] and summary["has_inf"]
+
+
+def test_tensor_summary_chunked():
+    # Imported after torch is known to be available
+    # Sematic
+    from sematic.types.types.pytorch import tensor as tensor_module
+
+    tensor = torch.zeros(3 * tensor_module._CHUNK_SIZE + 5, dtype=torch.int16)
+    tensor[1] = -1
+    tensor[-1] = 7
+
+    summary = get_json_encodable_summary(tensor, torch.Tensor)
+
+    assert summary["value_range"] == {"min": -1, "max": 7}
+    assert summary["unique_values"] == [-1, 0, 7]
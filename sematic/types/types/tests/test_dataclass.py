@@ -1,11 +1,13 @@
 # Standard Library
 from dataclasses import dataclass
+from typing import List
+from unittest import mock
 
 # Third-party
 import pytest
 
 # Sematic
-from sematic.types.casting import can_cast_type, safe_cast
+from sematic.types.casting import _compile_cast_plan, can_cast_type, safe_cast
 from sematic.types.serialization import (
     type_from_json_encodable,
     type_to_json_encodable,
@@ -113,6 +115,58 @@ def test_safe_cast(value, type_, expected_type, expected_value, expected_error):
     assert error == expected_error
 
 
+def test_safe_cast_identity():
+    value = A(a=1)
+
+    cast_value, error = safe_cast(value, A)
+
+    assert cast_value is value
+    assert error is None
+
+
+def test_safe_cast_subclass_shallow_copy():
+    value = D(a=1.0, d=2.3)  # type: ignore
+
+    cast_value, error = safe_cast(value, A)
+
+    assert error is None
+    assert cast_value is not value
+    assert type(cast_value) is D
+    assert type(cast_value.a) is int
+    assert cast_value == D(a=1, d=2.3)
+    assert type(value.a) is float
+
+
+@dataclass
+class Row:
+    name: str
+    value: float
+
+
+def test_safe_cast_list_of_dataclasses():
+    """
+    Casting a large list of dataclasses.
+
+    Casting plans are compiled once per pair of types, regardless of the number
+    of rows, and rows which already have the right field types are not copied.
+    """
+    rows = [Row(name=str(i), value=float(i)) for i in range(100000)]
+
+    # Compiles the casting plans
+    safe_cast(rows[:10], List[Row])
+
+    with mock.patch(
+        "sematic.types.casting._compile_cast_plan",
+        wraps=_compile_cast_plan,
+    ) as mock_compile_cast_plan, mock.patch("copy.deepcopy") as mock_deepcopy:
+        cast_rows, error = safe_cast(rows, List[Row])
+
+    assert error is None
+    assert all(cast_row is row for cast_row, row in zip(cast_rows, rows))
+    assert mock_compile_cast_plan.call_count == 0
+    mock_deepcopy.assert_not_called()
+
+
 def test_type_to_json_encodable():
     assert type_to_json_encodable(A) == {
         "type": (
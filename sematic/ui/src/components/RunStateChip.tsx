@@ -42,6 +42,10 @@ function RunStateChip(props: { state?: string; variant?: string }) {
     toolTipMessage = "Created";
   }
 
+  if (state === "QUEUED") {
+    toolTipMessage = "Queued";
+  }
+
   if (variant === "mini") {
     return <Pin color={color} />;
   }
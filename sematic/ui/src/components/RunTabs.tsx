@@ -52,7 +52,9 @@ export default function RunTabs(props: {
           {artifacts && <ArtifactList artifacts={artifacts.input} />}
         </TabPanel>
         <TabPanel value="output" sx={{ pt: 5 }}>
-          {["CREATED", "SCHEDULED", "RAN"].includes(run.future_state) && (
+          {["CREATED", "QUEUED", "SCHEDULED", "RAN"].includes(
+            run.future_state
+          ) && (
             <Alert severity="info">No output yet. Run has not completed</Alert>
           )}
           {["FAILED", "NESTED_FAILED"].includes(run.future_state) && (
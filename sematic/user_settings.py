@@ -66,6 +66,10 @@ class SettingsVar(enum.Enum):
     SEMATIC_API_KEY = "SEMATIC_API_KEY"
     SEMATIC_AUTHENTICATE = "SEMATIC_AUTHENTICATE"
     SEMATIC_AUTHORIZED_EMAIL_DOMAIN = "SEMATIC_AUTHORIZED_EMAIL_DOMAIN"
+    SEMATIC_STORAGE = "SEMATIC_STORAGE"
+    SEMATIC_STORAGE_COMPRESSION = "SEMATIC_STORAGE_COMPRESSION"
+    SEMATIC_WORKER_POOL_SIZE = "SEMATIC_WORKER_POOL_SIZE"
+    SEMATIC_MAX_IN_FLIGHT_RUNS = "SEMATIC_MAX_IN_FLIGHT_RUNS"
 
     # Google
     GOOGLE_OAUTH_CLIENT_ID = "GOOGLE_OAUTH_CLIENT_ID"
@@ -75,6 +79,7 @@ class SettingsVar(enum.Enum):
 
     # Kubernetes
     KUBERNETES_NAMESPACE = "KUBERNETES_NAMESPACE"
+    KUBERNETES_API_QPS = "KUBERNETES_API_QPS"
 
     # Snowflake
     SNOWFLAKE_USER = "SNOWFLAKE_USER"
@@ -0,0 +1,74 @@
+"""
+Rate limiting of requests to external APIs.
+"""
+# Standard Library
+import threading
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    Tokens are added at `rate` per second, up to `capacity`, and each call to
+    `acquire` takes one, waiting for it if there is none. This allows bursts of
+    up to `capacity` calls, and `rate` calls per second on average.
+
+    Parameters
+    ----------
+    rate: float
+        Number of tokens added per second.
+    capacity: int
+        Maximum number of tokens. The bucket starts full.
+    clock: Callable[[], float]
+        Defaults to `time.monotonic`.
+    sleep: Callable[[float], None]
+        Defaults to `time.sleep`.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive, got: {}".format(repr(rate)))
+
+        if capacity < 1:
+            raise ValueError(
+                "capacity must be a positive integer, got: {}".format(repr(capacity))
+            )
+
+        self._rate = rate
+        self._capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+
+        self._lock = threading.Lock()
+        self._tokens = float(capacity)
+        self._updated_at = clock()
+
+    def acquire(self) -> float:
+        """
+        Take a token, waiting until one is available. Returns the number of
+        seconds waited.
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self._capacity, self._tokens + (now - self._updated_at) * self._rate
+            )
+            self._updated_at = now
+
+            # Tokens are reserved before waiting for them, so that concurrent
+            # callers wait in turn.
+            self._tokens -= 1
+            delay = max(0.0, -self._tokens / self._rate)
+
+        if delay > 0:
+            self._sleep(delay)
+
+        return delay
@@ -0,0 +1,47 @@
+# Standard Library
+from typing import List
+
+# Third-party
+import pytest
+
+# Sematic
+from sematic.utils.rate_limit import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket():
+    clock = FakeClock()
+    token_bucket = TokenBucket(rate=2, capacity=3, clock=clock, sleep=clock.sleep)
+
+    # A burst of up to capacity calls does not wait
+    assert [token_bucket.acquire() for _ in range(3)] == [0, 0, 0]
+
+    # Then calls wait for tokens to be added
+    assert token_bucket.acquire() == 0.5
+    assert token_bucket.acquire() == 0.5
+    assert clock.sleeps == [0.5, 0.5]
+
+    # Tokens are added up to capacity
+    clock.now += 10
+    assert [token_bucket.acquire() for _ in range(3)] == [0, 0, 0]
+    assert token_bucket.acquire() == 0.5
+
+
+def test_token_bucket_invalid():
+    with pytest.raises(ValueError, match="rate"):
+        TokenBucket(rate=0, capacity=1)
+
+    with pytest.raises(ValueError, match="capacity"):
+        TokenBucket(rate=1, capacity=0)